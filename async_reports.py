@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from conf.async_db import AsyncSessionLocal, async_engine
+from conf.db import pool_stats
+from models.models import Group, Subject, Teacher
+from my_select import *
+from reports import REPORTS, STATS_REPORTS
+
+# Асинхронні версії звітів my_select: ті самі готові запити REPORT_STATEMENTS, ті самі типи рядків.
+# asyncpg сам готує їх на сервері і кешує prepared statements на кожному з'єднанні.
+
+async def select_1(session: AsyncSession, use_stats: bool = False):
+    return [StudentAverage._make(row) for row in await session.execute(REPORT_STATEMENTS[1, use_stats])]
+
+async def select_2(session: AsyncSession, subject_id: int, use_stats: bool = False):
+    return [SubjectBestStudent._make(row) for row in await session.execute(REPORT_STATEMENTS[2, use_stats], {"subject_id": subject_id})]
+
+async def select_3(session: AsyncSession, subject_id: int, use_stats: bool = False):
+    return [GroupAverage._make(row) for row in await session.execute(REPORT_STATEMENTS[3, use_stats], {"subject_id": subject_id})]
+
+async def select_4(session: AsyncSession, use_stats: bool = False):
+    return [OverallAverage((await session.execute(REPORT_STATEMENTS[4, use_stats])).scalar())]
+
+async def select_5(session: AsyncSession, teacher_id: int):
+    return [TeacherCourse._make(row) for row in await session.execute(REPORT_STATEMENTS[5, False], {"teacher_id": teacher_id})]
+
+async def select_6(session: AsyncSession, group_id: int):
+    return [GroupStudent._make(row) for row in await session.execute(REPORT_STATEMENTS[6, False], {"group_id": group_id})]
+
+async def select_7(session: AsyncSession, group_id: int, subject_id: int):
+    return [GroupGrade._make(row) for row in await session.execute(
+        REPORT_STATEMENTS[7, False], {"group_id": group_id, "subject_id": subject_id})]
+
+async def select_8(session: AsyncSession, teacher_id: int, use_stats: bool = False):
+    return [TeacherAverage._make(row) for row in await session.execute(REPORT_STATEMENTS[8, use_stats], {"teacher_id": teacher_id})]
+
+async def select_9(session: AsyncSession, student_id: int):
+    return [StudentCourse._make(row) for row in await session.execute(REPORT_STATEMENTS[9, False], {"student_id": student_id})]
+
+async def select_10(session: AsyncSession, student_id: int, teacher_id: int):
+    return [StudentTeacherCourse._make(row) for row in await session.execute(
+        REPORT_STATEMENTS[10, False], {"student_id": student_id, "teacher_id": teacher_id})]
+
+async def select_11(session: AsyncSession, teacher_id: int, student_id: int, use_stats: bool = False):
+    return [TeacherStudentAverage._make(row) for row in await session.execute(
+        REPORT_STATEMENTS[11, use_stats], {"teacher_id": teacher_id, "student_id": student_id})]
+
+async def select_12(session: AsyncSession, group_id: int, subject_id: int):
+    rows = await session.execute(REPORT_STATEMENTS[12, False], {"group_id": group_id, "subject_id": subject_id})
+    return [LastLessonGrade._make(row[2:]) for row in rows]
+
+ASYNC_REPORTS = {
+    1: select_1, 2: select_2, 3: select_3, 4: select_4, 5: select_5, 6: select_6,
+    7: select_7, 8: select_8, 9: select_9, 10: select_10, 11: select_11, 12: select_12,
+}
+
+# Звіти нічного прогону: всі, параметри яких - лише групи, предмети та викладачі
+NIGHTLY_REPORTS = [num for num, (_, _, params) in REPORTS.items()
+                   if set(params) <= {"group_id", "subject_id", "teacher_id"}]
+
+PARAM_SOURCES = {
+    "group_id": Group.id,
+    "subject_id": Subject.id,
+    "teacher_id": Teacher.id,
+}
+
+async def nightly_invocations(session: AsyncSession, report_nums=NIGHTLY_REPORTS):
+    """Повертає список (номер звіту, параметри) для всіх груп, предметів і викладачів"""
+    ids = {}
+    for param, column in PARAM_SOURCES.items():
+        ids[param] = (await session.execute(select(column).order_by(column))).scalars().all()
+
+    invocations = []
+    for num in report_nums:
+        _, _, params = REPORTS[num]
+        combinations = [[]]
+        for param in params:
+            combinations = [values + [value] for values in combinations for value in ids[param]]
+        invocations.extend((num, values) for values in combinations)
+    return invocations
+
+async def run_reports(invocations, concurrency=5, use_stats=False):
+    """Виконує звіти конкурентно, не більше ніж concurrency одночасно.
+
+    Кожен звіт отримує власну AsyncSession (і з'єднання з пулу), тож з
+    concurrency, що не перевищує розмір пулу, прогін масштабується з кількістю
+    з'єднань. Повертає список (номер звіту, параметри, рядки) у порядку invocations.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(report_num, param_values):
+        options = {"use_stats": True} if use_stats and report_num in STATS_REPORTS else {}
+        async with semaphore:
+            async with AsyncSessionLocal() as session:
+                rows = await ASYNC_REPORTS[report_num](session, *param_values, **options)
+        return report_num, param_values, rows
+
+    return await asyncio.gather(*(run_one(num, values) for num, values in invocations))
+
+async def run_nightly(concurrency, use_stats, report_nums):
+    async with AsyncSessionLocal() as session:
+        invocations = await nightly_invocations(session, report_nums)
+
+    started = time.perf_counter()
+    results = await run_reports(invocations, concurrency, use_stats)
+    elapsed = time.perf_counter() - started
+
+    total_rows = sum(len(rows) for _, _, rows in results)
+    print(f"Виконано {len(results)} звітів ({total_rows} рядків) за {elapsed:.2f} с, "
+          f"конкурентність {concurrency}")
+    stats = pool_stats.snapshot()
+    print(f"Пул з'єднань: {async_engine.pool.status()}; нових з'єднань {stats['connects']}, "
+          f"очікування з'єднання: середнє {stats['wait_avg_ms']:.2f} мс, максимум {stats['wait_max_ms']:.2f} мс")
+    await async_engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Конкурентний прогін звітів для всіх груп, предметів і викладачів")
+    parser.add_argument("--concurrency", type=int, default=5,
+                        help="Максимум одночасних звітів (не більше розміру пулу з'єднань)")
+    parser.add_argument("--reports", type=lambda value: [int(num) for num in value.split(",")],
+                        default=NIGHTLY_REPORTS, help="Номери звітів через кому")
+    parser.add_argument("--stats", action="store_true", help="Читати середні бали з таблиці grade_stats")
+    args = parser.parse_args()
+
+    unknown = [num for num in args.reports if num not in NIGHTLY_REPORTS]
+    if unknown:
+        parser.error(f"Звіти {unknown} потребують student_id або періоду; доступні: {NIGHTLY_REPORTS}")
+
+    asyncio.run(run_nightly(args.concurrency, args.stats, args.reports))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Затримка команд main.py: холодний старт проти постійного сервера.
+
+Запуск з кореня репозиторію:
+
+    python -m benchmarks.bench_daemon --runs 20
+
+Для кожної команди вимірюється:
+- холодний старт: новий процес python main.py ... (імпорти, mappers, нове з'єднання);
+- клієнт: новий процес python client.py ... до запущеного сервера main.py -a serve;
+- запит до сокета з цього процесу: лише обробка команди сервером.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from client import request
+from utils.print_table import print_table
+
+COMMANDS = [
+    ["-a", "list", "-m", "Group"],
+    ["-a", "report", "--report", "4"],
+    ["-a", "report", "--report", "3", "--subject_id", "1"],
+]
+
+
+def timings_ms(runs, func):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summary(timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{statistics.median(timings):.1f}", f"{p95:.1f}"
+
+
+def run_process(argv, env):
+    subprocess.run([sys.executable, *argv], env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def wait_for_socket(path, server, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if server.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("Сервер main.py не запустився")
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Затримка команд main.py: холодний старт проти сервера")
+    parser.add_argument("--runs", type=int, default=10, help="Кількість запусків кожної команди")
+    args = parser.parse_args()
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "main.sock")
+    env = {**os.environ, "DAEMON_SOCKET": socket_path}
+    server = subprocess.Popen(
+        [sys.executable, "main.py", "-a", "serve", "--socket", socket_path],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    rows = []
+    try:
+        wait_for_socket(socket_path, server)
+        for argv in COMMANDS:
+            cold = timings_ms(args.runs, lambda: run_process(["main.py", *argv], env))
+            client = timings_ms(args.runs, lambda: run_process(["client.py", *argv], env))
+            direct = timings_ms(args.runs, lambda: request(argv, socket_path))
+            rows.append((
+                " ".join(argv), *summary(cold), *summary(client), *summary(direct),
+                f"{statistics.median(cold) / statistics.median(client):.1f}x",
+            ))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print_table(rows, [
+        "Команда", "Холодний старт, медіана мс", "p95",
+        "client.py, медіана мс", "p95", "Запит до сокета, медіана мс", "p95", "Прискорення client.py",
+    ])
+
+
+if __name__ == "__main__":
+    main()
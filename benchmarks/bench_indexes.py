@@ -0,0 +1,75 @@
+"""Бенчмарк індексів grades/students/subjects для звітів my_select.
+
+Запуск з кореня репозиторію на заповненій базі (наприклад, після
+``python seed.py --mode copy --students 200000``):
+
+    python -m benchmarks.bench_indexes --runs 3
+
+Кожен з 12 звітів виконується один раз, щоб зібрати його SQL-запити.
+Потім для кожного запиту виконується EXPLAIN ANALYZE: спочатку без індексів
+моделей (вони видаляються в транзакції, яка потім відкочується, тобто стан
+"до міграції"), а потім з індексами.
+"""
+import argparse
+
+from sqlalchemy.schema import DropIndex
+
+from benchmarks.common import collect_statements, sample_params
+from conf.db import SessionLocal, engine
+from models.models import Grade, Student, Subject
+from utils.explain import explain_analyze
+from utils.print_table import print_table
+
+
+def report_indexes():
+    return [
+        index
+        for table in (Grade.__table__, Student.__table__, Subject.__table__)
+        for index in table.indexes
+    ]
+
+
+def measure(conn, statements, runs):
+    timings = {}
+    for num, captured in statements.items():
+        total = 0.0
+        for statement, parameters in captured:
+            plans = [explain_analyze(conn, statement, parameters) for _ in range(runs)]
+            total += min(plan["Planning Time"] + plan["Execution Time"] for plan in plans)
+        timings[num] = total
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE звітів до та після індексів")
+    parser.add_argument("--runs", type=int, default=3, help="Кількість повторів кожного запиту (береться мінімум)")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        sample = sample_params(session)
+        statements = collect_statements(session, sample)
+    finally:
+        session.close()
+
+    print(f"Параметри звітів: {sample}")
+    with engine.connect() as conn:
+        trans = conn.begin()
+        for index in report_indexes():
+            conn.execute(DropIndex(index, if_exists=True))
+        before = measure(conn, statements, args.runs)
+        trans.rollback()
+
+        with conn.begin():
+            after = measure(conn, statements, args.runs)
+
+    rows = [
+        (num, len(statements[num]), f"{before[num]:.2f}", f"{after[num]:.2f}",
+         f"{before[num] / after[num]:.1f}x" if after[num] else "-")
+        for num in statements
+    ]
+    print_table(rows, ["Звіт", "Запитів", "Без індексів, мс", "З індексами, мс", "Прискорення"])
+
+
+if __name__ == "__main__":
+    main()
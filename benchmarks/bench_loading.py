@@ -0,0 +1,98 @@
+"""Бенчмарк N+1: список записів з назвами пов'язаних записів трьома способами.
+
+Запуск з кореня репозиторію:
+
+    python -m benchmarks.bench_loading --runs 5
+
+Для студентів (з групою), предметів (з викладачем), викладачів (з предметами)
+і оцінок (зі студентом і предметом) порівнюються:
+  - ліниве завантаження - ORM-об'єкти і прохід по зв'язках, як без опцій:
+    окремий запит на кожен ще не завантажений пов'язаний запис;
+  - record_options - ті самі об'єкти з joinedload/selectinload з models/loading.py;
+  - list --related - колонки з JOIN, як у commands.get_list_columns.
+Рахуються SQL-запити і найкращий час з --runs прогонів; кожен прогін - нова
+сесія, тож карта ідентичності не зберігає об'єктів між прогонами.
+"""
+import argparse
+import time
+
+from sqlalchemy import select
+
+from commands import get_list_columns, get_model_class, get_table_data
+from conf.db import ReadSessionLocal, engine
+from models.loading import record_options
+from utils.explain import capture_statements
+from utils.print_table import print_table
+
+MODELS = ["Student", "Subject", "Teacher", "Grade"]
+
+
+def lazy_rows(session, model_name):
+    model_class = get_model_class(model_name)
+    records = session.scalars(select(model_class).order_by(model_class.id)).all()
+    return get_table_data(model_name, records, related=True)[1]
+
+
+def eager_rows(session, model_name):
+    model_class = get_model_class(model_name)
+    records = session.scalars(
+        select(model_class).options(*record_options(model_name)).order_by(model_class.id)
+    ).unique().all()
+    return get_table_data(model_name, records, related=True)[1]
+
+
+def joined_rows(session, model_name):
+    _, columns, joins = get_list_columns(model_name, related=True)
+    model_class = get_model_class(model_name)
+    query = select(*columns).select_from(model_class)
+    for relationship in joins:
+        query = query.outerjoin(relationship)
+    return [list(row) for row in session.execute(query.order_by(model_class.id))]
+
+
+def normalized(rows):
+    # Порядок предметів викладача в агрегаті не задано: порівнюються множини назв
+    return [[sorted(str(cell).split(", ")) for cell in row] for row in rows]
+
+
+def measure(load, model_name, runs):
+    """(запитів, найкращий час у мс, рядки)"""
+    best, queries, rows = None, None, None
+    for _ in range(runs):
+        session = ReadSessionLocal()
+        try:
+            with capture_statements(engine) as statements:
+                started = time.perf_counter()
+                rows = load(session, model_name)
+                elapsed = (time.perf_counter() - started) * 1000
+            queries = len(statements)
+        finally:
+            session.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return queries, best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Список з пов'язаними записами: ліниво, з опціями завантаження і JOIN")
+    parser.add_argument("--runs", type=int, default=5, help="Кількість прогонів (береться найкращий)")
+    args = parser.parse_args()
+
+    rows = []
+    for model_name in MODELS:
+        lazy_queries, lazy_ms, expected = measure(lazy_rows, model_name, args.runs)
+        eager_queries, eager_ms, eager = measure(eager_rows, model_name, args.runs)
+        joined_queries, joined_ms, joined = measure(joined_rows, model_name, args.runs)
+        same = normalized(expected) == normalized(eager) == normalized(joined)
+        rows.append((
+            model_name, len(expected), lazy_queries, f"{lazy_ms:.1f}", eager_queries, f"{eager_ms:.1f}",
+            joined_queries, f"{joined_ms:.1f}", "так" if same else "НІ",
+        ))
+
+    print_table(rows, [
+        "Модель", "Рядків", "Ліниво, запитів", "мс", "record_options, запитів", "мс",
+        "list --related, запитів", "мс", "Рядки збігаються",
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Бенчмарк секціонування grades по місяцях: відсікання секцій проти звичайної таблиці.
+
+Запуск з кореня репозиторію:
+
+    python -m benchmarks.bench_partitions --years 3 --grades 1000000 --runs 3
+
+У транзакції, яка потім відкочується, створюються секції на --years років
+назад і додаються випадкові оцінки за цей період. Потім ті самі дані
+копіюються у звичайну таблицю bench_flat.grades з тими ж індексами, і для
+кожного запиту порівнюється EXPLAIN ANALYZE на секціонованій таблиці та на
+копії (через search_path). Для секціонованої таблиці показано, скільки секцій
+план фактично читає.
+"""
+import argparse
+from datetime import date, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from benchmarks.common import sample_params
+from conf.db import engine
+from models.models import Grade, Student
+from my_select import query_7, query_13, query_14, query_15, query_16
+from partitions import ensure_partitions, partition_month
+from utils.explain import explain_analyze
+from utils.print_table import print_table
+
+FLAT_SCHEMA = "bench_flat"
+
+EXTRA_GRADES = text("""
+    INSERT INTO grades (student_id, subject_id, grade, date_received)
+    SELECT
+        (SELECT min(id) FROM students) + floor(random() * (SELECT max(id) - min(id) + 1 FROM students))::int,
+        (SELECT min(id) FROM subjects) + floor(random() * (SELECT max(id) - min(id) + 1 FROM subjects))::int,
+        1 + floor(random() * 100)::int,
+        date_trunc('day', now()) - floor(random() * :days)::int * interval '1 day'
+    FROM generate_series(1, :count)
+""")
+
+
+def create_flat_copy(conn):
+    """Звичайна (несекціонована) копія grades з індексами моделі в схемі bench_flat"""
+    conn.execute(text(f"CREATE SCHEMA {FLAT_SCHEMA}"))
+    conn.execute(text(f"CREATE TABLE {FLAT_SCHEMA}.grades AS SELECT * FROM grades"))
+    conn.execute(text(f"ALTER TABLE {FLAT_SCHEMA}.grades ADD PRIMARY KEY (id)"))
+    conn.execute(text(f"SET LOCAL search_path TO {FLAT_SCHEMA}"))
+    for index in Grade.__table__.indexes:
+        conn.execute(CreateIndex(index))
+    conn.execute(text("RESET search_path"))
+    conn.execute(text(f"ANALYZE {FLAT_SCHEMA}.grades"))
+
+
+def bench_queries(sample, today):
+    """Запити з обмеженням за датою і один без нього для порівняння"""
+    month_ago = today - timedelta(days=30)
+    group_id, subject_id = sample["group_id"], sample["subject_id"]
+    return [
+        ("query_7 за останні 30 днів", query_7(group_id, subject_id).filter(Grade.date_received >= month_ago)),
+        ("query_13: студенти за 30 днів", query_13(month_ago, today)),
+        ("query_14: групи за 30 днів", query_14(month_ago, today)),
+        ("query_15: тижні предметів за 30 днів", query_15(month_ago, today)),
+        ("query_16: ковзне середнє за 30 днів", query_16(subject_id, month_ago, today)),
+        ("Оцінки групи за один день (як select_12)",
+         select(Student.id, Grade.grade)
+         .join(Grade, Grade.student_id == Student.id)
+         .filter(Student.group_id == group_id, Grade.subject_id == subject_id,
+                 Grade.date_received == today - timedelta(days=1))),
+        ("query_7 без обмеження дат", query_7(group_id, subject_id)),
+    ]
+
+
+def scanned_partitions(plan):
+    """Секції grades, які план читає (Relation Name вузлів сканування)"""
+    found = set()
+    nodes = [plan["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        name = node.get("Relation Name", "")
+        if partition_month(name) or name == "grades_default":
+            found.add(name)
+        nodes.extend(node.get("Plans", []))
+    return found
+
+
+def best_plan(conn, statement, runs):
+    compiled = statement.compile(dialect=conn.dialect)
+    plans = [explain_analyze(conn, str(compiled), compiled.params) for _ in range(runs)]
+    return min(plans, key=lambda plan: plan["Planning Time"] + plan["Execution Time"])
+
+
+def total_ms(plan):
+    return plan["Planning Time"] + plan["Execution Time"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Секціонування grades: відсікання секцій проти звичайної таблиці")
+    parser.add_argument("--years", type=int, default=3, help="Глибина історії оцінок, роки")
+    parser.add_argument("--grades", type=int, default=500000, help="Скільки оцінок додати за цей період")
+    parser.add_argument("--runs", type=int, default=3, help="Кількість повторів EXPLAIN ANALYZE (береться найкращий)")
+    args = parser.parse_args()
+
+    today = date.today()
+    days = args.years * 365
+    rows = []
+    with engine.connect() as conn:
+        trans = conn.begin()
+        ensure_partitions(conn, today - timedelta(days=days))
+        conn.execute(EXTRA_GRADES, {"days": days, "count": args.grades})
+        conn.execute(text("ANALYZE grades"))
+        total = conn.execute(select(func.count()).select_from(Grade)).scalar()
+        partitions = conn.execute(text(
+            "SELECT count(*) FROM pg_inherits WHERE inhparent = 'grades'::regclass"
+        )).scalar()
+        sample = sample_params(Session(bind=conn))
+        create_flat_copy(conn)
+
+        for name, statement in bench_queries(sample, today):
+            partitioned = best_plan(conn, statement, args.runs)
+            conn.execute(text(f"SET LOCAL search_path TO {FLAT_SCHEMA}, public"))
+            flat = best_plan(conn, statement, args.runs)
+            conn.execute(text("RESET search_path"))
+            rows.append((
+                name,
+                f"{len(scanned_partitions(partitioned))} з {partitions}",
+                f"{total_ms(flat):.1f}",
+                f"{total_ms(partitioned):.1f}",
+                f"{partitioned['Planning Time']:.1f}",
+                f"{total_ms(flat) / total_ms(partitioned):.1f}x",
+            ))
+        trans.rollback()
+
+    print(f"Оцінок: {total}, секцій: {partitions}, історія: {args.years} р.")
+    print_table(rows, [
+        "Запит", "Секцій у плані", "Звичайна таблиця, мс", "Секціонована, мс",
+        "з них планування, мс", "Прискорення",
+    ])
+
+
+if __name__ == "__main__":
+    main()
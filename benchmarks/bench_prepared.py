@@ -0,0 +1,95 @@
+"""Мікробенчмарк select_2 / select_7: викликів за секунду з різними параметрами.
+
+Запуск з кореня репозиторію:
+
+    python -m benchmarks.bench_prepared --calls 3000 --runs 3
+
+Порівнюються три способи виконати той самий звіт:
+  - query_N щоразу - конструкція select(...).join(...) будується при кожному
+    виклику (як select_N до REPORT_STATEMENTS): SQLAlchemy обходить її заново,
+    щоб обчислити ключ кешу компіляції;
+  - REPORT_STATEMENTS - готовий запит з bindparam, select_N передає лише значення;
+  - + PREPARE - той самий запит, підготовлений на сервері (DB_PREPARE_STATEMENTS):
+    Postgres не розбирає і не планує його при кожному виклику, а EXECUTE іде
+    через exec_driver_sql, тож частина виграшу - обхід шару виконання ORM.
+Параметри перебираються по колу: всі предмети для select_2 і всі пари
+(група, предмет) для select_7. Береться найкращий з --runs прогонів.
+"""
+import argparse
+import itertools
+import time
+
+from sqlalchemy import select
+
+from conf.db import ReadSessionLocal
+from models.models import Group, Subject
+from my_select import GroupGrade, SubjectBestStudent, query_2, query_7, select_2, select_7
+from utils import prepared
+from utils.print_table import print_table
+
+
+def rebuilt_2(session, subject_id):
+    return [SubjectBestStudent._make(row) for row in session.execute(query_2(subject_id))]
+
+
+def rebuilt_7(session, group_id, subject_id):
+    return [GroupGrade._make(row) for row in session.execute(query_7(group_id, subject_id))]
+
+
+def calls_per_second(session, report, params, calls, runs):
+    best = None
+    for _ in range(runs):
+        cycle = itertools.cycle(params)
+        started = time.perf_counter()
+        for _ in range(calls):
+            report(session, *next(cycle))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return calls / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="select_2 / select_7: викликів за секунду до і після готових запитів")
+    parser.add_argument("--calls", type=int, default=3000, help="Викликів звіту в одному прогоні")
+    parser.add_argument("--runs", type=int, default=3, help="Кількість прогонів (береться найкращий)")
+    args = parser.parse_args()
+
+    enabled = prepared.ENABLED
+    session = ReadSessionLocal()
+    try:
+        subject_ids = session.execute(select(Subject.id).order_by(Subject.id)).scalars().all()
+        group_ids = session.execute(select(Group.id).order_by(Group.id)).scalars().all()
+        cases = [
+            ("select_2", [(subject_id,) for subject_id in subject_ids], rebuilt_2, select_2),
+            ("select_7", list(itertools.product(group_ids, subject_ids)), rebuilt_7, select_7),
+        ]
+        rows = []
+        for name, params, rebuilt, report in cases:
+            # Прогрів: кеш компіляції, з'єднання пулу і PREPARE на сервері
+            prepared.ENABLED = True
+            report(session, *params[0])
+            prepared.ENABLED = False
+            report(session, *params[0])
+            rebuilt(session, *params[0])
+
+            before = calls_per_second(session, rebuilt, params, args.calls, args.runs)
+            statement = calls_per_second(session, report, params, args.calls, args.runs)
+            prepared.ENABLED = True
+            server = calls_per_second(session, report, params, args.calls, args.runs)
+            prepared.ENABLED = enabled
+            rows.append((
+                name, len(params), f"{before:.0f}", f"{statement:.0f}", f"{server:.0f}",
+                f"{statement / before:.2f}x", f"{server / before:.2f}x",
+            ))
+    finally:
+        prepared.ENABLED = enabled
+        session.close()
+
+    print_table(rows, [
+        "Звіт", "Наборів параметрів", "query_N щоразу, викл./с", "REPORT_STATEMENTS, викл./с",
+        "+ PREPARE, викл./с", "Прискорення", "з PREPARE",
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Бенчмарк звіту 12 ("оцінки на останньому занятті"): два запити проти одного.
+
+Запуск з кореня репозиторію:
+
+    python -m benchmarks.bench_select_12 --sizes 0,200000,1000000 --pairs 50
+
+Для кожного розміру в таблицю grades додається вказана кількість випадкових
+оцінок (у транзакції, яка потім відкочується), після чого порівнюються:
+попередня версія select_12 (max(date_received), потім окремий запит за цією
+датою), нова однозапитна select_12 з rank() і select_12_many для всіх пар одразу.
+"""
+import argparse
+import time
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from conf.db import engine
+from models.models import Grade, Group, Student, Subject
+from my_select import LastLessonGrade, select_12, select_12_many
+from utils.print_table import print_table
+
+# Випадкові оцінки для наявних студентів і предметів за останні півроку
+EXTRA_GRADES = text("""
+    INSERT INTO grades (student_id, subject_id, grade, date_received)
+    SELECT
+        (SELECT min(id) FROM students) + floor(random() * (SELECT max(id) - min(id) + 1 FROM students))::int,
+        (SELECT min(id) FROM subjects) + floor(random() * (SELECT max(id) - min(id) + 1 FROM subjects))::int,
+        1 + floor(random() * 100)::int,
+        date_trunc('day', now()) - floor(random() * 180)::int * interval '1 day'
+    FROM generate_series(1, :count)
+""")
+
+
+def select_12_two_step(session: Session, group_id: int, subject_id: int):
+    last_lesson_date = session.execute(
+        select(func.max(Grade.date_received))
+        .join(Student, Student.id == Grade.student_id)
+        .filter(Student.group_id == group_id, Grade.subject_id == subject_id)
+    ).scalar()
+    if not last_lesson_date:
+        return []
+    query = (
+        select(Group.name, Subject.name, Student.first_name, Student.last_name, Grade.grade, Grade.date_received)
+        .join(Student, Student.group_id == Group.id)
+        .join(Grade, Grade.student_id == Student.id)
+        .join(Subject, Subject.id == Grade.subject_id)
+        .filter(Group.id == group_id, Subject.id == subject_id, Grade.date_received == last_lesson_date)
+        .order_by(Grade.id)
+    )
+    return [LastLessonGrade._make(row) for row in session.execute(query)]
+
+
+def sample_pairs(session: Session, count):
+    return [
+        tuple(row) for row in session.execute(
+            select(Student.group_id, Grade.subject_id)
+            .join(Student, Student.id == Grade.student_id)
+            .distinct()
+            .order_by(Student.group_id, Grade.subject_id)
+            .limit(count)
+        )
+    ]
+
+
+def best_time(runs, func):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def measure(session: Session, pairs, runs):
+    mismatches = [pair for pair in pairs if select_12_two_step(session, *pair) != select_12(session, *pair)]
+    return {
+        "two_step": best_time(runs, lambda: [select_12_two_step(session, *pair) for pair in pairs]),
+        "single": best_time(runs, lambda: [select_12(session, *pair) for pair in pairs]),
+        "many": best_time(runs, lambda: select_12_many(session, pairs)),
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="select_12: два запити проти одного запиту з rank()")
+    parser.add_argument("--sizes", default="0,100000,500000",
+                        help="Скільки оцінок додати перед кожним вимірюванням, через кому")
+    parser.add_argument("--pairs", type=int, default=20, help="Кількість пар (група, предмет)")
+    parser.add_argument("--runs", type=int, default=3, help="Кількість повторів (береться мінімум)")
+    args = parser.parse_args()
+
+    rows = []
+    with engine.connect() as conn:
+        trans = conn.begin()
+        session = Session(bind=conn)
+        added = 0
+        for size in sorted(int(size) for size in args.sizes.split(",")):
+            if size > added:
+                conn.execute(EXTRA_GRADES, {"count": size - added})
+                added = size
+            conn.execute(text("ANALYZE grades"))
+            total = conn.execute(select(func.count()).select_from(Grade)).scalar()
+            pairs = sample_pairs(session, args.pairs)
+            result = measure(session, pairs, args.runs)
+            if result["mismatches"]:
+                print(f"Розбіжності результатів для {len(result['mismatches'])} пар: {result['mismatches'][:5]}")
+            rows.append((
+                total, len(pairs),
+                f"{result['two_step']:.1f}", f"{result['single']:.1f}", f"{result['many']:.1f}",
+                f"{result['two_step'] / result['single']:.1f}x" if result["single"] else "-",
+            ))
+        session.close()
+        trans.rollback()
+
+    print_table(rows, ["Оцінок", "Пар", "Два запити, мс", "Один запит, мс", "Усі пари разом, мс", "Прискорення"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Бенчмарк звітів 1-12: Postgres проти локального знімка Arrow (snapshot.py).
+
+Запуск з кореня репозиторію:
+
+    python -m benchmarks.bench_snapshot --grades 1000000 --runs 5
+
+У транзакції, яка потім відкочується, додаються --grades випадкових оцінок за
+останній рік. Далі вимірюється підготовка кожного шляху - завантаження
+колонкового знімка з Postgres (COPY), експорт файлів Arrow з кожним видом
+стиснення і їх відкриття через memory map - і час кожного звіту: select_N у
+базі проти того самого звіту над відкритим знімком. Рядки обох шляхів
+звіряються.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from benchmarks.bench_partitions import EXTRA_GRADES
+from benchmarks.common import report_args, sample_params
+from columnar import COLUMNAR_REPORTS, load_snapshot, rows_equal
+from conf.db import engine
+from models.models import Grade
+from partitions import ensure_partitions
+from reports import REPORTS
+from snapshot import COMPRESSIONS, export_snapshot, open_snapshot
+from utils.print_table import print_table
+
+HISTORY_DAYS = 365
+
+
+def best_ms(action, runs):
+    """Найкращий час action() за runs повторів і його результат"""
+    best, result = None, None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = action()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def directory_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Звіти 1-12: Postgres проти знімка Arrow з memory map")
+    parser.add_argument("--grades", type=int, default=1000000, help="Скільки оцінок додати за останній рік")
+    parser.add_argument("--runs", type=int, default=5, help="Кількість повторів (береться найкращий)")
+    args = parser.parse_args()
+
+    preparation, reports = [], []
+    with engine.connect() as conn, tempfile.TemporaryDirectory() as tmp:
+        trans = conn.begin()
+        ensure_partitions(conn, date.today() - timedelta(days=HISTORY_DAYS))
+        conn.execute(EXTRA_GRADES, {"days": HISTORY_DAYS, "count": args.grades})
+        conn.execute(text("ANALYZE grades"))
+        total = conn.execute(select(func.count()).select_from(Grade)).scalar()
+        session = Session(bind=conn)
+        sample = sample_params(session)
+
+        load_ms, _ = best_ms(lambda: load_snapshot(conn), args.runs)
+        preparation.append(("Postgres -> NumPy (COPY)", f"{load_ms:.1f}", "-", "-"))
+
+        snapshots = {}
+        for compression in COMPRESSIONS:
+            directory = os.path.join(tmp, compression)
+            started = time.perf_counter()
+            export_snapshot(conn, directory, compression=compression)
+            export_ms = (time.perf_counter() - started) * 1000
+            open_ms, snapshots[compression] = best_ms(lambda: open_snapshot(directory), args.runs)
+            preparation.append((
+                f"Знімок Arrow, стиснення {compression}", f"{export_ms:.1f}",
+                f"{directory_size(directory) / 2**20:.1f}", f"{open_ms:.1f}",
+            ))
+
+        snapshot = snapshots["none"]
+        for num in sorted(COLUMNAR_REPORTS):
+            _, select_func, params = REPORTS[num]
+            param_values = report_args(params, sample)
+            sql_ms, expected = best_ms(lambda: select_func(session, *param_values), args.runs)
+            snapshot_ms, actual = best_ms(lambda: snapshot.report(num, param_values), args.runs)
+            reports.append((
+                num, f"{sql_ms:.2f}", f"{snapshot_ms:.2f}", f"{sql_ms / snapshot_ms:.1f}x",
+                "так" if rows_equal(expected, actual) else "НІ",
+            ))
+        trans.rollback()
+
+    print(f"Оцінок: {total}")
+    print_table(preparation, ["Підготовка", "Завантаження / експорт, мс", "На диску, МіБ", "Відкриття, мс"])
+    print_table(reports, ["Звіт", "Postgres, мс", "Знімок, мс", "Прискорення", "Рядки збігаються"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Час старту main.py за -X importtime з бюджетом для команд без бази.
+
+Запуск з кореня репозиторію:
+
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 50
+
+Для кожного сценарію процес запускається з -X importtime; сумарний час
+імпортів верхнього рівня порівнюється з порожнім інтерпретатором (python -c pass).
+--help і помилки перевірки аргументів мають вкладатися в --budget-ms;
+якщо ні, скрипт завершується з кодом 1 і показує найважчі імпорти.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from utils.print_table import print_table
+
+# (назва, аргументи main.py, чи діє бюджет)
+SCENARIOS = [
+    ("--help", ["--help"], True),
+    ("помилка argparse", ["-a", "bogus"], True),
+    ("помилка перевірки", ["-a", "create", "-m", "Student"], True),
+    ("list з базою", ["-a", "list", "-m", "Group"], False),
+]
+
+
+def parse_importtime(stderr):
+    """{модуль: кумулятивний час імпорту в мкс} і сума по модулях верхнього рівня"""
+    modules, total = {}, 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return modules, total
+
+
+def run(argv):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        capture_output=True, text=True,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    modules, total = parse_importtime(result.stderr)
+    return elapsed, total / 1000, modules
+
+
+def measure(argv, runs):
+    samples = [run(argv) for _ in range(runs)]
+    wall = statistics.median(sample[0] for sample in samples)
+    imports = statistics.median(sample[1] for sample in samples)
+    return wall, imports, samples[-1][2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Час старту main.py за -X importtime")
+    parser.add_argument("--runs", type=int, default=5, help="Кількість запусків кожного сценарію (береться медіана)")
+    parser.add_argument("--budget-ms", type=float, default=50.0,
+                        help="Бюджет імпортів main.py понад порожній інтерпретатор для команд без бази, мс")
+    args = parser.parse_args()
+
+    base_wall, base_imports, _ = measure(["-c", "pass"], args.runs)
+    rows, over_budget = [], []
+    for name, argv, budgeted in SCENARIOS:
+        wall, imports, modules = measure(["main.py", *argv], args.runs)
+        extra = imports - base_imports
+        status = "-"
+        if budgeted:
+            status = "так" if extra <= args.budget_ms else "НІ"
+            if extra > args.budget_ms:
+                over_budget.append((name, modules))
+        rows.append((name, f"{wall:.0f}", f"{imports:.1f}", f"{extra:.1f}", status))
+
+    print(f"Порожній інтерпретатор: {base_wall:.0f} мс, імпорти {base_imports:.1f} мс")
+    print_table(rows, ["Сценарій", "Час процесу, мс", "Імпорти, мс", "Понад python -c pass, мс",
+                       f"В бюджеті {args.budget_ms:.0f} мс"])
+
+    for name, modules in over_budget:
+        heaviest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+        print(f"\nНайважчі імпорти для '{name}':")
+        print_table([(module, f"{us / 1000:.1f}") for module, us in heaviest], ["Модуль", "Кумулятивно, мс"])
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import io
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from conf.db import engine
+from models.models import Grade, Student, Subject
+from reports import REPORTS
+from utils.explain import capture_statements
+
+
+def sample_params(session: Session):
+    """Підбирає параметри звітів, для яких у базі точно є дані"""
+    subject_id, = session.execute(
+        select(Grade.subject_id).group_by(Grade.subject_id).order_by(func.count().desc()).limit(1)
+    ).one()
+    student_id, = session.execute(
+        select(Grade.student_id).filter(Grade.subject_id == subject_id).limit(1)
+    ).one()
+    group_id = session.execute(select(Student.group_id).filter(Student.id == student_id)).scalar()
+    teacher_id = session.execute(select(Subject.teacher_id).filter(Subject.id == subject_id)).scalar()
+    return {
+        "subject_id": subject_id,
+        "student_id": student_id,
+        "group_id": group_id,
+        "teacher_id": teacher_id,
+        # Звіти за період: останні 30 днів
+        "since": date.today() - timedelta(days=30),
+        "until": date.today(),
+    }
+
+
+def report_args(params, sample):
+    return [sample[param] for param in params]
+
+
+def collect_statements(session: Session, sample):
+    """Виконує кожен звіт один раз і повертає виконані ним SQL-запити"""
+    statements = {}
+    for num, (_, func, params) in REPORTS.items():
+        with capture_statements(engine) as captured, redirect_stdout(io.StringIO()):
+            func(session, *report_args(params, sample))
+        statements[num] = captured
+    return statements
@@ -0,0 +1,130 @@
+import re
+
+from sqlalchemy import and_, delete, func, or_, select, update
+
+from conf.db import SessionLocal
+from importer import MODELS, convert_value
+from models.models import Base
+from reports import report_cache
+
+# Масові update/remove: фільтр --ids/--where перетворюється на одну умову
+# WHERE, а зміна - на один UPDATE ... WHERE або DELETE ... WHERE без
+# завантаження ORM-об'єктів. Залежні записи видаляє сама база (ON DELETE CASCADE).
+
+WHERE_PATTERN = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(.*?)\s*$")
+
+OPERATORS = {
+    "=": lambda column, value: column == value,
+    "!=": lambda column, value: column != value,
+    "<": lambda column, value: column < value,
+    "<=": lambda column, value: column <= value,
+    ">": lambda column, value: column > value,
+    ">=": lambda column, value: column >= value,
+}
+
+
+def parse_where(model_class, conditions):
+    """Умови виду 'поле<оператор>значення' -> вирази SQLAlchemy, об'єднані через AND"""
+    columns = model_class.__table__.columns
+    clauses = []
+    for condition in conditions:
+        match = WHERE_PATTERN.match(condition)
+        if not match:
+            raise ValueError(f"некоректна умова {condition!r}, очікується поле=значення (оператори: {', '.join(OPERATORS)})")
+        name, operator, raw_value = match.groups()
+        if name not in columns:
+            raise ValueError(f"невідоме поле {name} для {model_class.__name__}")
+        column = columns[name]
+        if raw_value.lower() == "null":
+            if operator not in ("=", "!="):
+                raise ValueError(f"NULL можна порівнювати лише через = або != ({condition!r})")
+            clauses.append(column.is_(None) if operator == "=" else column.is_not(None))
+            continue
+        clauses.append(OPERATORS[operator](column, convert_value(column, raw_value)))
+    return clauses
+
+
+def id_condition(model_class, ids):
+    """Пари (початок, кінець) з --ids -> id IN (окремі ID) OR id BETWEEN ... для кожного діапазону"""
+    singles = sorted({start for start, end in ids if start == end})
+    ranges = sorted({(start, end) for start, end in ids if start != end})
+    clauses = [model_class.id.between(start, end) for start, end in ranges]
+    if singles:
+        clauses.insert(0, model_class.id.in_(singles))
+    return or_(*clauses)
+
+
+def build_condition(model_class, ids=None, where=()):
+    clauses = parse_where(model_class, where)
+    if ids:
+        clauses.append(id_condition(model_class, ids))
+    if not clauses:
+        raise ValueError("потрібен хоча б один фільтр --ids або --where")
+    return and_(*clauses)
+
+
+def cascade_counts(session, model_class, condition):
+    """Скільки рядків інших таблиць база видалить каскадно разом із вибраними записами"""
+    selected_ids = select(model_class.id).where(condition)
+    counts = {}
+    for table in Base.metadata.sorted_tables:
+        for fk in table.foreign_keys:
+            if fk.column.table is model_class.__table__ and fk.ondelete == "CASCADE":
+                counts[table.name] = session.execute(
+                    select(func.count()).select_from(table).where(fk.parent.in_(selected_ids))
+                ).scalar()
+    return counts
+
+
+def bulk_update(model_name, values, ids=None, where=(), dry_run=False):
+    model_class = MODELS[model_name]
+    session = SessionLocal()
+    try:
+        condition = build_condition(model_class, ids, where)
+        columns = model_class.__table__.columns
+        unknown = [name for name in values if name not in columns]
+        if unknown:
+            raise ValueError(f"{model_name} не має полів: {', '.join(unknown)}")
+        values = {name: convert_value(columns[name], value) for name, value in values.items()}
+
+        if dry_run:
+            count = session.execute(select(func.count()).select_from(model_class).where(condition)).scalar()
+            print(f"Буде оновлено {count} записів {model_name}: {values}")
+            return
+
+        statement = update(model_class).where(condition).values(**values).execution_options(synchronize_session=False)
+        count = session.execute(statement).rowcount
+        session.commit()
+        # Зміна могла зачепити будь-які звіти, тож кеш звітів скидається повністю
+        report_cache.clear()
+        print(f"Оновлено {count} записів {model_name}")
+    except Exception as e:
+        session.rollback()
+        print(f"Помилка під час масового оновлення {model_name}: {e}")
+    finally:
+        session.close()
+
+
+def bulk_remove(model_name, ids=None, where=(), dry_run=False):
+    model_class = MODELS[model_name]
+    session = SessionLocal()
+    try:
+        condition = build_condition(model_class, ids, where)
+
+        if dry_run:
+            count = session.execute(select(func.count()).select_from(model_class).where(condition)).scalar()
+            print(f"Буде видалено {count} записів {model_name}")
+            for table_name, cascaded in cascade_counts(session, model_class, condition).items():
+                print(f"  каскадно з таблиці {table_name}: {cascaded}")
+            return
+
+        statement = delete(model_class).where(condition).execution_options(synchronize_session=False)
+        count = session.execute(statement).rowcount
+        session.commit()
+        report_cache.clear()
+        print(f"Видалено {count} записів {model_name}")
+    except Exception as e:
+        session.rollback()
+        print(f"Помилка під час масового видалення {model_name}: {e}")
+    finally:
+        session.close()
@@ -0,0 +1,43 @@
+"""Тонкий клієнт сервера main.py (python main.py -a serve).
+
+Передає аргументи серверу і виводить відповідь, тож кожен виклик коштує
+лише старт інтерпретатора без імпорту SQLAlchemy і нового з'єднання з базою:
+
+    python client.py -a list -m Group
+
+Шлях до сокета - змінна середовища DAEMON_SOCKET (як і для сервера).
+Модуль навмисно імпортує лише стандартну бібліотеку.
+"""
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET = os.getenv("DAEMON_SOCKET", "/tmp/goit-hw06.sock")
+
+
+def request(argv, socket_path=DEFAULT_SOCKET):
+    """Надсилає команду серверу; повертає (код виходу, вивід)"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        conn.sendall((json.dumps(argv) + "\n").encode("utf-8"))
+        with conn.makefile("rb") as response:
+            reply = json.loads(response.readline())
+    if not isinstance(reply, dict) or not isinstance(reply.get("status"), int) or not isinstance(reply.get("output"), str):
+        raise ValueError(f"некоректна відповідь сервера: {reply!r}")
+    return reply["status"], reply["output"]
+
+
+def main():
+    try:
+        status, output = request(sys.argv[1:])
+    except (OSError, ValueError) as e:
+        # ValueError - порожня або некоректна відповідь (сервер закрив з'єднання, не відповівши)
+        print(f"Не вдалося з'єднатися з сервером {DEFAULT_SOCKET}: {e}", file=sys.stderr)
+        sys.exit(1)
+    sys.stdout.write(output)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+"""Колонковий рушій звітів 1-12: знімок grades у масивах NumPy.
+
+Для інтерактивного дослідження: таблиця оцінок один раз читається в пам'ять,
+а далі кожен звіт рахується векторизовано (bincount, lexsort, маски) без
+звернення до Postgres. Потрібен numpy (poetry install --extras columnar),
+основний код репозиторію від нього не залежить.
+
+    python main.py -a report --engine columnar
+    python columnar.py --verify
+
+--verify звіряє рядки всіх 12 звітів для всіх комбінацій параметрів з
+відповідними select_N і показує пам'ять знімка та сумарний час обох рушіїв.
+
+Знімок - це 16 байт на оцінку (student_id int32, subject_id int16, grade int16,
+date_received datetime64[us]) плюс невеликі масиви-довідники за id студентів,
+груп, предметів і викладачів. Оцінки лежать у порядку id, тож позиція в масиві
+розв'язує нічиї так само, як ORDER BY grades.id. Порядок імен береться з бази
+(dense_rank() за ORDER BY name), тож сортування збігається з колацією Postgres.
+"""
+import argparse
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy import Connection, func, select
+
+from models.models import Grade, Group, Student, Subject, Teacher
+from my_select import (
+    StudentAverage, SubjectBestStudent, GroupAverage, OverallAverage, TeacherCourse, GroupStudent,
+    GroupGrade, TeacherAverage, StudentCourse, StudentTeacherCourse, TeacherStudentAverage, LastLessonGrade,
+)
+from utils.bulk import supports_copy
+from utils.cache import MISSING
+
+# Бінарний COPY: кожен рядок - кількість полів, потім довжина і значення кожного
+# поля, усе big-endian. timestamp передається як мікросекунди від 2000-01-01.
+COPY_HEADER_SIZE = 19  # сигнатура (11 байт), прапорці (4), довжина розширення заголовка (4)
+PARSE_BYTES = 1 << 20
+PG_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+
+# Колонки оцінок у знімку; типи student_id/subject_id/grade уточнює grade_dtypes
+GRADE_COLUMNS = ["student_id", "subject_id", "grade", "date_received"]
+
+# Довідники знімка: назви колонок у порядку кортежів, які приймає ColumnarSnapshot.
+# name_rank - dense_rank() за іменем у колації бази, з ним сортування збігається з SQL.
+LOOKUP_COLUMNS = {
+    "students": ["id", "first_name", "last_name", "group_id", "name_rank"],
+    "groups": ["id", "name", "name_rank"],
+    "subjects": ["id", "name", "teacher_id", "name_rank"],
+    "teachers": ["id", "first_name", "last_name"],
+}
+LOOKUP_MODELS = {"students": Student, "groups": Group, "subjects": Subject, "teachers": Teacher}
+NAME_ORDER = {"students": Student.full_name, "groups": Group.name, "subjects": Subject.name}
+
+
+def smallest_int(low, high):
+    """int16, якщо значення вміщаються, інакше int32"""
+    info = np.iinfo(np.int16)
+    return np.int16 if info.min <= low and high <= info.max else np.int32
+
+
+def name_rank(table_name):
+    return func.dense_rank().over(order_by=NAME_ORDER[table_name]).label("name_rank")
+
+
+def lookup_query(table_name, columns):
+    """SELECT колонок довідника; name_rank рахується вікном за іменем"""
+    model = LOOKUP_MODELS[table_name]
+    return select(*(name_rank(table_name) if name == "name_rank" else getattr(model, name) for name in columns))
+
+
+class CopyColumns:
+    """Приймач бінарного COPY: розбирає повні рядки одразу в заздалегідь виділені масиви.
+
+    Підтримує колонки integer (int4) і timestamp без NULL - саме такі в grades.
+    """
+
+    def __init__(self, count, dtypes):
+        self.arrays = {name: np.empty(count, dtype=dtype) for name, dtype in dtypes.items()}
+        fields = [("fields", ">i2")]
+        for name, dtype in dtypes.items():
+            wire = ">i8" if np.dtype(dtype).kind == "M" else ">i4"
+            fields += [(f"{name}_len", ">i4"), (name, wire)]
+        self.row = np.dtype(fields)
+        self.count = count
+        self.filled = 0
+        self._buffer = bytearray()
+        self._header_done = False
+
+    def write(self, data):
+        # psycopg2 передає COPY по одному рядку, тож розбір іде пачками по PARSE_BYTES
+        self._buffer += data
+        if len(self._buffer) >= PARSE_BYTES:
+            self._parse()
+
+    def finish(self):
+        self._parse()
+
+    def _parse(self):
+        if not self._header_done:
+            if len(self._buffer) < COPY_HEADER_SIZE:
+                return
+            extension = int.from_bytes(self._buffer[15:19], "big")
+            del self._buffer[:COPY_HEADER_SIZE + extension]
+            self._header_done = True
+        # Після останнього рядка йде лише 2-байтовий трейлер (-1)
+        rows = min(len(self._buffer) // self.row.itemsize, self.count - self.filled)
+        if rows:
+            size = rows * self.row.itemsize
+            chunk = np.frombuffer(bytes(self._buffer[:size]), dtype=self.row)
+            end = self.filled + rows
+            for name, array in self.arrays.items():
+                values = chunk[name]
+                array[self.filled:end] = PG_EPOCH + values.astype(np.int64) if array.dtype.kind == "M" else values
+            self.filled = end
+            del self._buffer[:size]
+
+
+def grade_dtypes(conn: Connection):
+    """Кількість оцінок і найвужчі типи масивів GRADE_COLUMNS для поточних даних"""
+    count, subject_max, grade_min, grade_max = conn.execute(
+        select(func.count(), func.max(Grade.subject_id), func.min(Grade.grade), func.max(Grade.grade))
+    ).one()
+    return count, {
+        "student_id": np.int32,
+        "subject_id": smallest_int(0, subject_max or 0),
+        "grade": smallest_int(grade_min or 0, grade_max or 0),
+        "date_received": "datetime64[us]",
+    }
+
+
+def load_grade_columns(conn: Connection, count, dtypes):
+    """Колонки grades у порядку id: {назва: масив}. Через бінарний COPY, якщо драйвер його підтримує"""
+    columns = CopyColumns(count, dtypes)
+    names = ", ".join(dtypes)
+    if supports_copy(conn):
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY (SELECT {names} FROM grades ORDER BY id) TO STDOUT (FORMAT binary)", columns)
+            columns.finish()
+        finally:
+            cursor.close()
+    else:
+        rows = conn.execute(select(*(getattr(Grade, name) for name in dtypes)).order_by(Grade.id)).all()
+        for array, values in zip(columns.arrays.values(), zip(*rows)):
+            array[:] = values
+        columns.filled = len(rows)
+    if columns.filled != count:
+        raise RuntimeError(f"Знімок оцінок неповний: {columns.filled} з {count}")
+    return columns.arrays
+
+
+def lookup(ids, values, size, fill=-1, dtype=np.int32):
+    """Масив-довідник за id: result[id] = value, відсутні id - fill"""
+    result = np.full(size, fill, dtype=dtype)
+    result[np.asarray(ids, dtype=np.int64)] = values
+    return result
+
+
+@contextmanager
+def snapshot_connection(session):
+    """Окреме з'єднання з бази сесії (репліки для ReadSessionLocal) у транзакції REPEATABLE READ:
+    довідники і оцінки бачать один стан бази.
+
+    Рівень ізоляції діє лише до першого запиту транзакції, тож з'єднання сесії, яка
+    вже читала (shell, serve), для цього не годиться.
+    """
+    with session.get_bind().connect() as conn:
+        conn.execution_options(isolation_level="REPEATABLE READ")
+        with conn.begin():
+            yield conn
+
+
+def load_snapshot(conn: Connection):
+    """Знімок з бази через conn (див. snapshot_connection)"""
+    started = time.perf_counter()
+    lookups = {name: conn.execute(lookup_query(name, columns)).all() for name, columns in LOOKUP_COLUMNS.items()}
+    grades = load_grade_columns(conn, *grade_dtypes(conn))
+    snapshot = ColumnarSnapshot(lookups, grades)
+    snapshot.load_seconds = time.perf_counter() - started
+    return snapshot
+
+
+class ColumnarSnapshot:
+    """Звіти 1-12 над масивами оцінок.
+
+    lookups - {таблиця: [кортежі колонок LOOKUP_COLUMNS]}, grades - {колонка GRADE_COLUMNS: масив}
+    у порядку grades.id. Масиви не копіюються, тож можуть бути відображеними у пам'ять (snapshot.py).
+    """
+
+    def __init__(self, lookups, grades):
+        self.load_seconds = 0.0
+        students, groups = lookups["students"], lookups["groups"]
+        subjects, teachers = lookups["subjects"], lookups["teachers"]
+
+        student_slots = max((row[0] for row in students), default=0) + 1
+        self.students = {row[0]: (row[1], row[2]) for row in students}
+        self.student_group = lookup([row[0] for row in students], [row[3] for row in students], student_slots)
+        self.student_rank = lookup([row[0] for row in students], [row[4] for row in students], student_slots)
+
+        group_slots = max((row[0] for row in groups), default=0) + 1
+        self.group_names = {row[0]: row[1] for row in groups}
+        self.group_rank = lookup([row[0] for row in groups], [row[2] for row in groups], group_slots)
+        self.group_rank_names = {row[2]: row[1] for row in groups}
+
+        subject_slots = max((row[0] for row in subjects), default=0) + 1
+        self.subject_names = {row[0]: row[1] for row in subjects}
+        self.subject_teacher = lookup([row[0] for row in subjects], [row[2] for row in subjects], subject_slots)
+        self.subject_rank = lookup([row[0] for row in subjects], [row[3] for row in subjects], subject_slots)
+        self.subject_rank_names = {row[3]: row[1] for row in subjects}
+
+        self.teachers = {row[0]: (row[1], row[2]) for row in teachers}
+
+        self.student_id = grades["student_id"]
+        self.subject_id = grades["subject_id"]
+        self.grade = grades["grade"]
+        self.date_received = grades["date_received"]
+
+    @property
+    def grade_count(self):
+        return len(self.grade)
+
+    def nbytes(self):
+        grades = sum(array.nbytes for array in (self.student_id, self.subject_id, self.grade, self.date_received))
+        lookups = sum(array.nbytes for array in (
+            self.student_group, self.student_rank, self.group_rank, self.subject_teacher, self.subject_rank,
+        ))
+        return grades, lookups
+
+    # Допоміжні обчислення
+
+    def student_name(self, student_id):
+        first, last = self.students[student_id]
+        return f"{first} {last}"
+
+    def teacher_name(self, teacher_id):
+        first, last = self.teachers[teacher_id]
+        return f"{first} {last}"
+
+    def averages(self, keys, grades):
+        """Середні за ключами (bincount): (ключі, що трапились, середні)"""
+        counts = np.bincount(keys)
+        sums = np.bincount(keys, weights=grades)
+        present = np.flatnonzero(counts)
+        return present, sums[present] / counts[present]
+
+    def top_students(self, positions, limit):
+        """Студенти з найбільшим середнім за оцінками positions (None - всі), нічиї - за id"""
+        students = self.student_id if positions is None else self.student_id[positions]
+        grades = self.grade if positions is None else self.grade[positions]
+        ids, averages = self.averages(students, grades)
+        order = np.lexsort((ids, -averages))[:limit]
+        return ids[order].tolist(), averages[order].tolist()
+
+    def subject_positions(self, subject_id):
+        return np.flatnonzero(self.subject_id == subject_id)
+
+    def group_subject_positions(self, group_id, subject_id):
+        positions = self.subject_positions(subject_id)
+        return positions[self.student_group[self.student_id[positions]] == group_id]
+
+    def student_subjects(self, student_id):
+        return np.unique(self.subject_id[self.student_id == student_id]).astype(np.int64)
+
+    def subject_names_sorted(self, subject_ids):
+        """Різні назви предметів у порядку колації бази"""
+        return [self.subject_rank_names[rank] for rank in np.unique(self.subject_rank[subject_ids]).tolist()]
+
+    def teacher_positions(self, teacher_id):
+        return np.flatnonzero(self.subject_teacher[self.subject_id] == teacher_id)
+
+    # Звіти: ті самі аргументи і типи рядків, що й select_N у my_select
+
+    def select_1(self):
+        ids, averages = self.top_students(None, 5)
+        return [StudentAverage(self.student_name(i), avg) for i, avg in zip(ids, averages)]
+
+    def select_2(self, subject_id):
+        ids, averages = self.top_students(self.subject_positions(subject_id), 1)
+        return [SubjectBestStudent(self.student_name(i), self.subject_names[subject_id], avg)
+                for i, avg in zip(ids, averages)]
+
+    def select_3(self, subject_id):
+        positions = self.subject_positions(subject_id)
+        groups = self.student_group[self.student_id[positions]]
+        ranks, averages = self.averages(self.group_rank[groups], self.grade[positions])
+        order = np.lexsort((ranks, -averages))
+        return [GroupAverage(self.group_rank_names[rank], self.subject_names[subject_id], avg)
+                for rank, avg in zip(ranks[order].tolist(), averages[order].tolist())]
+
+    def select_4(self):
+        return [OverallAverage(float(self.grade.mean()) if self.grade_count else None)]
+
+    def select_5(self, teacher_id):
+        subject_ids = np.flatnonzero(self.subject_teacher == teacher_id).tolist()
+        return [TeacherCourse(self.teacher_name(teacher_id), self.subject_names[i]) for i in subject_ids]
+
+    def select_6(self, group_id):
+        student_ids = np.flatnonzero(self.student_group == group_id)
+        order = np.lexsort((student_ids, self.student_rank[student_ids]))
+        return [GroupStudent(self.group_names[group_id], self.student_name(i)) for i in student_ids[order].tolist()]
+
+    def select_7(self, group_id, subject_id):
+        positions = self.group_subject_positions(group_id, subject_id)
+        order = np.lexsort((positions, -self.date_received[positions].view(np.int64)))
+        positions = positions[order]
+        group_name, subject_name = self.group_names.get(group_id), self.subject_names.get(subject_id)
+        return [
+            GroupGrade(self.student_name(student), grade, group_name, subject_name, date)
+            for student, grade, date in zip(self.student_id[positions].tolist(), self.grade[positions].tolist(),
+                                            self.date_received[positions].tolist())
+        ]
+
+    def select_8(self, teacher_id):
+        positions = self.teacher_positions(teacher_id)
+        if not len(positions):
+            return []
+        return [TeacherAverage(self.teacher_name(teacher_id), float(self.grade[positions].mean()))]
+
+    def select_9(self, student_id):
+        if student_id not in self.students:
+            return []
+        names = self.subject_names_sorted(self.student_subjects(student_id)) or [None]
+        return [StudentCourse(self.student_name(student_id), name) for name in names]
+
+    def select_10(self, student_id, teacher_id):
+        student = self.student_name(student_id) if student_id in self.students else None
+        teacher = self.teacher_name(teacher_id) if teacher_id in self.teachers else None
+        subject_ids = self.student_subjects(student_id)
+        subject_ids = subject_ids[self.subject_teacher[subject_ids] == teacher_id]
+        names = self.subject_names_sorted(subject_ids) or [None]
+        return [StudentTeacherCourse(student, teacher, name) for name in names]
+
+    def select_11(self, teacher_id, student_id):
+        positions = np.flatnonzero(self.student_id == student_id)
+        positions = positions[self.subject_teacher[self.subject_id[positions]] == teacher_id]
+        if not len(positions):
+            return []
+        return [TeacherStudentAverage(*self.teachers[teacher_id], *self.students[student_id],
+                                      float(self.grade[positions].mean()))]
+
+    def select_12(self, group_id, subject_id):
+        positions = self.group_subject_positions(group_id, subject_id)
+        if not len(positions):
+            return []
+        dates = self.date_received[positions]
+        positions = positions[dates == dates.max()]
+        group_name, subject_name = self.group_names[group_id], self.subject_names[subject_id]
+        return [
+            LastLessonGrade(group_name, subject_name, *self.students[student], grade, date)
+            for student, grade, date in zip(self.student_id[positions].tolist(), self.grade[positions].tolist(),
+                                            self.date_received[positions].tolist())
+        ]
+
+    def report(self, report_num, param_values):
+        return getattr(self, f"select_{report_num}")(*param_values)
+
+
+# Звіти, які вміє колонковий рушій; решта (звіти за період) виконується в SQL
+COLUMNAR_REPORTS = set(range(1, 13))
+
+SNAPSHOT_KEY = ("columnar snapshot",)
+
+
+def get_snapshot(session):
+    """Знімок процесу з кешу звітів.
+
+    Запис позначено тегом усіх оцінок, тож будь-яка зміна через main.py, import
+    чи масові операції скидає його разом із кешованими звітами; інакше знімок
+    живе стільки ж, скільки звіти в кеші (REPORT_CACHE_TTL).
+    """
+    from reports import ALL_GRADES_TAG, report_cache
+
+    snapshot = report_cache.get(SNAPSHOT_KEY)
+    if snapshot is MISSING:
+        with snapshot_connection(session) as conn:
+            snapshot = load_snapshot(conn)
+        report_cache.set(SNAPSHOT_KEY, snapshot, {ALL_GRADES_TAG})
+    return snapshot
+
+
+def values_equal(expected, actual):
+    # Середні бали SQL - Decimal, NumPy - float: порівняння з допуском
+    if isinstance(expected, (int, str)) or expected is None or actual is None:
+        return expected == actual
+    try:
+        return abs(float(expected) - float(actual)) < 1e-9
+    except TypeError:
+        return expected == actual
+
+
+def rows_equal(expected, actual):
+    return len(expected) == len(actual) and all(
+        len(e) == len(a) and all(values_equal(x, y) for x, y in zip(e, a)) for e, a in zip(expected, actual)
+    )
+
+
+def verify(session, snapshot):
+    """Звіряє колонковий рушій з select_N для всіх комбінацій параметрів.
+
+    Повертає [(номер звіту, комбінацій, розбіжності, час SQL, час NumPy)].
+    """
+    from report_batch import PARAM_SOURCES
+    from reports import REPORTS
+
+    results = []
+    for report_num in sorted(COLUMNAR_REPORTS):
+        _, func, params = REPORTS[report_num]
+        combinations = [()]
+        for param in params:
+            ids = session.execute(select(PARAM_SOURCES[param]).order_by(PARAM_SOURCES[param])).scalars().all()
+            combinations = [key + (value,) for key in combinations for value in ids]
+        mismatches, sql_time, numpy_time = [], 0.0, 0.0
+        for key in combinations:
+            started = time.perf_counter()
+            expected = func(session, *key)
+            sql_time += time.perf_counter() - started
+            started = time.perf_counter()
+            actual = snapshot.report(report_num, key)
+            numpy_time += time.perf_counter() - started
+            if not rows_equal(expected, actual):
+                mismatches.append(key)
+        results.append((report_num, len(combinations), mismatches, sql_time, numpy_time))
+    return results
+
+
+def main():
+    from conf.db import ReadSessionLocal
+    from utils.print_table import print_table
+
+    parser = argparse.ArgumentParser(description="Колонковий рушій звітів 1-12 на NumPy")
+    parser.add_argument("--verify", action="store_true",
+                        help="Звірити всі 12 звітів з SQL для всіх комбінацій параметрів")
+    args = parser.parse_args()
+
+    session = ReadSessionLocal()
+    try:
+        with snapshot_connection(session) as conn:
+            snapshot = load_snapshot(conn)
+        grades_bytes, lookup_bytes = snapshot.nbytes()
+        per_grade = grades_bytes / snapshot.grade_count if snapshot.grade_count else 0
+        print(f"Знімок: {snapshot.grade_count} оцінок за {snapshot.load_seconds:.2f} с; "
+              f"масиви оцінок {grades_bytes / 2**20:.1f} МіБ ({per_grade:.0f} байт на оцінку), "
+              f"довідники {lookup_bytes / 2**10:.1f} КіБ")
+        if not args.verify:
+            return
+        results = verify(session, snapshot)
+        print_table(
+            [(num, count, len(mismatches) or "-", f"{sql * 1000:.1f}", f"{numpy * 1000:.1f}",
+              f"{sql / numpy:.1f}x" if numpy else "-")
+             for num, count, mismatches, sql, numpy in results],
+            ["Звіт", "Комбінацій", "Розбіжностей", "SQL, мс", "NumPy, мс", "Прискорення"],
+        )
+        failed = [(num, mismatches[:5]) for num, _, mismatches, _, _ in results if mismatches]
+        for num, examples in failed:
+            print(f"Звіт {num}: розбіжності, наприклад для параметрів {examples}")
+        if failed:
+            raise SystemExit(1)
+        print("Усі 12 звітів збігаються з SQL")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
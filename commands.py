@@ -0,0 +1,347 @@
+import sys
+import time
+from itertools import chain
+
+from sqlalchemy import func, select
+
+from conf.db import ReadSessionLocal, SessionLocal
+from grade_stats import check_grade_stats, refresh_grade_stats
+from models.models import Student, Group, Teacher, Subject, Grade
+from models.loading import record_options
+from utils.print_table import print_table
+from utils.render import write_rows
+from reports import PARAM_DEFAULTS, REPORTS, main as reports_main, invalidate_record, report_cache, run_report
+from report_batch import export_batch, verify_batch
+from importer import DEFAULT_CHUNK_SIZE, run_import
+from bulk_actions import bulk_remove, bulk_update
+from leaderboard import DEFAULT_TOP, LeaderboardEntry, get_leaderboards, leaderboard_entries
+
+# Реалізація команд main.py. Модуль імпортується лише після розбору і перевірки
+# аргументів, тож --help і помилки аргументів не платять за імпорт SQLAlchemy,
+# моделей і tabulate.
+
+# Скільки рядків за раз забирати з серверного курсора під час list
+LIST_CHUNK_SIZE = 1000
+
+def create_record(model_name, **kwargs):    
+    session = SessionLocal()
+    try:
+        model_class = get_model_class(model_name)
+        new_record = model_class(**kwargs)
+        session.add(new_record)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"Помилка під час створення {model_name}: {e}")
+    else:
+        print(f"{model_name} успішно створено з ID: {new_record.id}")
+        # Запис уже збережено: збій інвалідації не скасовує створення, лише скидає весь кеш звітів
+        try:
+            invalidate_record(session, model_name, new_record, created=True)
+        except Exception as e:
+            report_cache.clear()
+            print(f"Кеш звітів скинуто повністю: не вдалося оновити його після створення {model_name}: {e}")
+    finally:
+        session.close()
+
+def list_records(model_name, fmt='table', after_id=None, limit=None, page_size=None, related=False):
+    """Потоковий список записів: лише потрібні колонки, серверний курсор і пагінація за id.
+
+    Пам'ять не залежить від розміру таблиці: рядки читаються пачками по
+    LIST_CHUNK_SIZE, а таблиця виводиться сторінками по page_size рядків.
+    related=True - назви пов'язаних записів через JOIN у тому ж запиті.
+    """
+    session = ReadSessionLocal()
+    try:
+        model_class = get_model_class(model_name)
+        headers, columns, joins = get_list_columns(model_name, related)
+        query = select(*columns).select_from(model_class)
+        for relationship in joins:
+            query = query.outerjoin(relationship)
+        query = query.order_by(model_class.id)
+        if after_id is not None:
+            query = query.filter(model_class.id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
+        
+        rows = (tuple(row) for row in session.execute(query.execution_options(yield_per=LIST_CHUNK_SIZE)))
+        first_row = next(rows, None)
+        if first_row is None:
+            print(f"Немає жодного запису для моделі {model_name}")
+            return
+        
+        last_id = first_row[0]
+        def track_last_id(rows):
+            nonlocal last_id
+            for row in rows:
+                last_id = row[0]
+                yield row
+        
+        if fmt == 'table':
+            print(f"Список всіх {model_name}:")
+        count = write_rows(track_last_id(chain([first_row], rows)), headers, fmt, page_size=page_size)
+        
+        if limit is not None and count == limit:
+            # Службові повідомлення не змішуються з csv/jsonl/plain у stdout
+            info = sys.stdout if fmt == 'table' else sys.stderr
+            print(f"Наступна сторінка: --after-id {last_id}", file=info)
+        
+    except Exception as e:
+        print(f"Помилка під час отримання списку {model_name}: {e}")
+    finally:
+        session.close()
+
+def update_record(model_name, id, **kwargs):    
+    session = SessionLocal()
+    try:
+        model_class = get_model_class(model_name)
+        record = session.query(model_class).filter(model_class.id == id).first()
+        if not record:
+            print(f"{model_name} з ID {id} не знайдено")
+            return
+                
+        old_values = {}
+        for key in kwargs.keys():
+            if hasattr(record, key):
+                old_values[key] = getattr(record, key)
+        
+        # Звіти, що залежали від старих значень запису
+        invalidate_record(session, model_name, record)
+               
+        for key, value in kwargs.items():
+            if hasattr(record, key):
+                setattr(record, key, value)
+        
+        session.commit()
+        invalidate_record(session, model_name, record)
+                
+        print(f"{model_name} з ID {id} успішно оновлено")
+        print("Змінені поля:")
+        for key, old_value in old_values.items():
+            new_value = getattr(record, key)
+            print(f"  {key}: {old_value} -> {new_value}")
+            
+    except Exception as e:
+        session.rollback()
+        print(f"Помилка під час оновлення {model_name}: {e}")
+    finally:
+        session.close()
+
+def remove_record(model_name, id):    
+    session = SessionLocal()
+    try:
+        model_class = get_model_class(model_name)
+        # Зв'язки для показу і ті, що ORM читає при видаленні, - в одному-двох запитах
+        record = (session.query(model_class).options(*record_options(model_name))
+                  .filter(model_class.id == id).first())
+        if not record:
+            print(f"{model_name} з ID {id} не знайдено")
+            return
+                
+        print(f"Видалення {model_name} з ID {id}:")
+        headers, table_data = get_table_data(model_name, [record], related=True)
+        print_table(table_data, headers)
+        
+        invalidate_record(session, model_name, record)
+        session.delete(record)
+        session.commit()
+        print(f"{model_name} успішно видалено")
+    except Exception as e:
+        session.rollback()
+        print(f"Помилка під час видалення {model_name}: {e}")
+    finally:
+        session.close()
+
+def refresh_stats():
+    session = SessionLocal()
+    try:
+        upserted, deleted = refresh_grade_stats(session)
+        session.commit()
+        print(f"Таблицю grade_stats оновлено: змінено {upserted}, видалено {deleted} рядків")
+    except Exception as e:
+        session.rollback()
+        print(f"Помилка під час оновлення grade_stats: {e}")
+    finally:
+        session.close()
+
+def check_stats():
+    session = SessionLocal()
+    try:
+        mismatches = check_grade_stats(session)
+        if not mismatches:
+            print("Таблиця grade_stats узгоджена з grades")
+            return
+        print(f"Знайдено {len(mismatches)} розбіжностей між grade_stats і grades:")
+        print_table(mismatches, ["Студент", "Предмет", "Очікувана к-сть", "Очікувана сума", "К-сть", "Сума"])
+    except Exception as e:
+        print(f"Помилка під час перевірки grade_stats: {e}")
+    finally:
+        session.close()
+
+def run_batch(report_nums, out_dir, fmt, use_stats=False, verify=False):
+    session = ReadSessionLocal()
+    try:
+        started = time.perf_counter()
+        export_batch(session, report_nums, out_dir, fmt, use_stats)
+        print(f"Пакетний експорт завершено за {time.perf_counter() - started:.2f} с")
+        
+        if verify:
+            for report_num in report_nums:
+                mismatches = verify_batch(session, report_num, use_stats)
+                if mismatches:
+                    print(f"Звіт {report_num}: {len(mismatches)} розбіжностей, наприклад для параметрів {mismatches[:5]}")
+                else:
+                    print(f"Звіт {report_num}: рядки збігаються з викликами select_{report_num}")
+    except Exception as e:
+        print(f"Помилка під час пакетного виконання звітів: {e}")
+    finally:
+        session.close()
+
+def run_snapshot(out_dir, chunk_size=None, compression='none'):
+    # numpy і pyarrow - необов'язкові залежності, тож знімок імпортується лише тут
+    from columnar import snapshot_connection
+    from snapshot import DEFAULT_CHUNK_SIZE as SNAPSHOT_CHUNK_SIZE, export_snapshot
+    
+    session = ReadSessionLocal()
+    try:
+        started = time.perf_counter()
+        with snapshot_connection(session) as conn:
+            results = export_snapshot(conn, out_dir, chunk_size or SNAPSHOT_CHUNK_SIZE, compression)
+        print_table(
+            [(table, rows, f"{size / 2**20:.2f}", f"{seconds:.2f}") for table, rows, size, seconds in results],
+            ["Таблиця", "Рядків", "МіБ", "Секунд"],
+        )
+        print(f"Знімок записано в {out_dir} за {time.perf_counter() - started:.2f} с")
+    except Exception as e:
+        session.rollback()
+        print(f"Помилка під час створення знімка: {e}")
+    finally:
+        session.close()
+
+def show_leaderboard(subject_id=None, top=None, ties=False, rebuild=False, fmt='table'):
+    session = ReadSessionLocal()
+    try:
+        started = time.perf_counter()
+        boards = get_leaderboards(session, rebuild)
+        entries = leaderboard_entries(session, boards, subject_id, top, ties)
+        if fmt != 'table':
+            write_rows(entries, LeaderboardEntry._fields, fmt)
+            return
+        if subject_id is None:
+            print(f"Таблиця лідерів, топ-{top} за середнім балом з усіх предметів:")
+        else:
+            name = session.execute(select(Subject.name).filter(Subject.id == subject_id)).scalar()
+            if name is None:
+                print(f"Предмет з ID {subject_id} не знайдено")
+                return
+            print(f"Таблиця лідерів з предмета {name}, топ-{top}:")
+        print_table(
+            [(entry.rank, entry.full_name, entry.grade_count, f"{entry.avg_grade:.2f}") for entry in entries],
+            ["#", "Full Name", "Grades", "Average Grade"],
+        )
+        print(f"Студентів у таблиці: {len(boards.overall if subject_id is None else boards.subjects.get(subject_id, []))}, "
+              f"{(time.perf_counter() - started) * 1000:.1f} мс")
+    except Exception as e:
+        print(f"Помилка під час побудови таблиці лідерів: {e}")
+    finally:
+        session.close()
+
+def run_single_report(report_num, param_values, use_stats=False, fmt='table', engine='sql'):
+    session = ReadSessionLocal()
+    try:
+        run_report(session, report_num, param_values, use_stats, fmt, engine)
+    except Exception as e:
+        print(f"Помилка під час виконання звіту {report_num}: {e}")
+    finally:
+        session.close()
+
+def get_model_class(model_name):    
+    models = {
+        'Student': Student,
+        'Group': Group,
+        'Teacher': Teacher,
+        'Subject': Subject,
+        'Grade': Grade
+    }
+    
+    if model_name not in models:
+        raise ValueError(f"Невідома модель: {model_name}. Доступні моделі: {', '.join(models.keys())}")
+    
+    return models[model_name]
+
+def get_list_columns(model_name, related=False):
+    """Заголовки, колонки і зв'язки для JOIN у list - ті самі поля, що й у get_table_data, але без ORM-об'єктів.
+
+    З related=True замість зовнішніх ключів - назви пов'язаних записів, а для
+    викладачів і груп - їхні предмети і кількість студентів (корельовані
+    підзапити). Це все одно один запит на весь список, скільки б рядків не було.
+    """
+    if related:
+        if model_name == 'Student':
+            return (["ID", "Повне ім'я", "Email", "Телефон", "Група"],
+                    [Student.id, Student.full_name, Student.email, func.coalesce(Student.phone, ''), Group.name],
+                    [Student.group])
+        if model_name == 'Group':
+            students = select(func.count()).where(Student.group_id == Group.id).scalar_subquery()
+            return ["ID", "Назва", "Студентів"], [Group.id, Group.name, students], []
+        if model_name == 'Teacher':
+            subjects = select(func.aggregate_strings(Subject.name, ', ')).where(Subject.teacher_id == Teacher.id)
+            return (["ID", "Повне ім'я", "Email", "Телефон", "Предмети"],
+                    [Teacher.id, Teacher.full_name, Teacher.email, func.coalesce(Teacher.phone, ''),
+                     func.coalesce(subjects.scalar_subquery(), '')],
+                    [])
+        if model_name == 'Subject':
+            return ["ID", "Назва", "Викладач"], [Subject.id, Subject.name, Teacher.full_name], [Subject.teacher]
+        if model_name == 'Grade':
+            return (["ID", "Студент", "Предмет", "Оцінка", "Дата"],
+                    [Grade.id, Student.full_name, Subject.name, Grade.grade, Grade.date_received],
+                    [Grade.student, Grade.subject])
+    if model_name == 'Student':
+        return (["ID", "Повне ім'я", "Email", "Телефон", "Група"],
+                [Student.id, Student.full_name, Student.email, func.coalesce(Student.phone, ''), Student.group_id], [])
+    if model_name == 'Group':
+        return ["ID", "Назва"], [Group.id, Group.name], []
+    if model_name == 'Teacher':
+        return (["ID", "Повне ім'я", "Email", "Телефон"],
+                [Teacher.id, Teacher.full_name, Teacher.email, func.coalesce(Teacher.phone, '')], [])
+    if model_name == 'Subject':
+        return ["ID", "Назва", "Викладач"], [Subject.id, Subject.name, Subject.teacher_id], []
+    if model_name == 'Grade':
+        return (["ID", "Студент", "Предмет", "Оцінка", "Дата"],
+                [Grade.id, Grade.student_id, Grade.subject_id, Grade.grade, Grade.date_received], [])
+    model_class = get_model_class(model_name)
+    columns = list(model_class.__table__.columns)
+    return [column.name for column in columns], columns, []
+
+def get_table_data(model_name, records, related=False):
+    """Рядки таблиці з ORM-об'єктів; related=True читає зв'язки, тож записи
+    мають бути завантажені з models.loading.record_options(model_name)"""
+    if model_name == 'Student':
+        headers = ["ID", "Повне ім'я", "Email", "Телефон", "Група"]
+        data = [[r.id, r.full_name, r.email, r.phone or '', r.group.name if related else r.group_id] for r in records]
+    elif model_name == 'Group':
+        headers = ["ID", "Назва", "Студентів"] if related else ["ID", "Назва"]
+        data = [[r.id, r.name, len(r.students)] if related else [r.id, r.name] for r in records]
+    elif model_name == 'Teacher':
+        headers = ["ID", "Повне ім'я", "Email", "Телефон"] + (["Предмети"] if related else [])
+        data = [[r.id, r.full_name, r.email, r.phone or '']
+                + ([', '.join(subject.name for subject in r.subjects)] if related else []) for r in records]
+    elif model_name == 'Subject':
+        headers = ["ID", "Назва", "Викладач"]
+        data = [[r.id, r.name, r.teacher.full_name if related else r.teacher_id] for r in records]
+    elif model_name == 'Grade':
+        headers = ["ID", "Студент", "Предмет", "Оцінка", "Дата"]
+        data = [[r.id, r.student.full_name if related else r.student_id, r.subject.name if related else r.subject_id,
+                 r.grade, r.date_received] for r in records]
+    else:
+        
+        if not records:
+            return [], []
+        
+        sample_record = records[0]
+        headers = [attr for attr in dir(sample_record) 
+                  if not attr.startswith('_') and not callable(getattr(sample_record, attr))
+                  and attr not in ('group', 'grades', 'metadata', 'registry')]
+        data = [[getattr(r, attr) for attr in headers] for r in records]
+    
+    return headers, data
@@ -0,0 +1,58 @@
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from conf.db import (
+    MAX_OVERFLOW, POOL_PRE_PING, POOL_PROFILE, POOL_RECYCLE, POOL_SIZE, POOL_TIMEOUT, STATEMENT_TIMEOUT,
+    InstrumentedNullPool, TimedConnectMixin, instrument_pool, read_url,
+)
+
+# Асинхронний рушій потребує asyncpg (poetry install --extras async),
+# тому він винесений з conf/db.py і імпортується лише асинхронним кодом.
+# Асинхронний код лише читає звіти, тож база та сама, що й у ReadSessionLocal:
+# DB_URI або змінні .env, а з DB_REPLICA_URIS - здорова на момент старту репліка.
+
+
+class InstrumentedAsyncQueuePool(TimedConnectMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def async_engine_options():
+    connect_args = {}
+    if STATEMENT_TIMEOUT:
+        connect_args["server_settings"] = {"statement_timeout": str(STATEMENT_TIMEOUT)}
+
+    if POOL_PROFILE == "external":
+        # pgbouncer у режимі transaction може видати інше серверне з'єднання між
+        # prepare і execute, тому кеш prepared statements asyncpg вимикається,
+        # а імена statements робляться унікальними
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        return {"poolclass": InstrumentedNullPool, "connect_args": connect_args}
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+def async_uri():
+    url = read_url()
+    if url.get_backend_name() != "postgresql":
+        raise ValueError(f"Асинхронний рушій підтримує лише PostgreSQL, а база - {url.get_backend_name()}")
+    url = url.set(drivername="postgresql+asyncpg")
+    if POOL_PROFILE == "external":
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+    return url
+
+
+async_engine = create_async_engine(async_uri(), echo=False, **async_engine_options())
+instrument_pool(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
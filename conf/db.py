@@ -1,8 +1,13 @@
+import itertools
 import os
+import threading
+import time
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, make_url, text
+from sqlalchemy.orm import Session, raiseload, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.pool import NullPool, QueuePool
 
 load_dotenv()
 
@@ -12,8 +17,284 @@ host = os.getenv("HOST")
 port = os.getenv("PORT")
 db_name = os.getenv("DB_NAME")
 
-URI = f"postgresql://{user}:{password}@{host}:{port}/{db_name}"
+# DB_URI повністю замінює адресу основної бази (наприклад, sqlite:///primary.db для локальної перевірки)
+URI = os.getenv("DB_URI") or f"postgresql://{user}:{password}@{host}:{port}/{db_name}"
 
-engine = create_engine(URI, echo=False, pool_size=5, max_overflow=0)
+# Налаштування пулу з'єднань (необов'язкові змінні .env):
+#   DB_POOL_PROFILE       default - власний пул SQLAlchemy;
+#                         external - зовнішній пулер (pgbouncer у режимі transaction):
+#                         NullPool і без серверних prepared statements
+#   DB_POOL_SIZE          постійні з'єднання пулу (5)
+#   DB_MAX_OVERFLOW       додаткові тимчасові з'єднання понад DB_POOL_SIZE (0)
+#   DB_POOL_TIMEOUT       скільки секунд чекати на вільне з'єднання (30)
+#   DB_POOL_RECYCLE       перевідкривати з'єднання, старші за N секунд (-1 - ніколи)
+#   DB_POOL_PRE_PING      перевіряти з'єднання перед видачею з пулу (false)
+#   DB_STATEMENT_TIMEOUT  statement_timeout сервера в мілісекундах (0 - без обмеження)
+#   DB_PREPARE_STATEMENTS готувати запити звітів 1-12 на сервері (PREPARE/EXECUTE, false);
+#                         з DB_POOL_PROFILE=external не діє
+#   DB_STRICT_LOADING     суворе завантаження зв'язків для перевірок і розробки (false): ORM-запити
+#                         отримують raiseload("*"), тож ліниве завантаження зв'язку, не названого
+#                         в опціях запиту (models/loading.py), - помилка замість прихованого N+1
+#
+# Репліки для читання (звіти і list, див. ReadSessionLocal):
+#   DB_REPLICA_URIS         адреси реплік через кому (порожньо - все читається з основної бази)
+#   DB_REPLICA_CHECK_INTERVAL  як часто перевіряти доступність репліки, секунд (30)
+#   DB_PIN_READS_AFTER_WRITE   скільки секунд після запису в цьому процесі читати з основної
+#                              бази, щоб бачити власні зміни (0 - не закріплювати)
+POOL_PROFILE = os.getenv("DB_POOL_PROFILE", "default")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "0"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))
+PREPARE_STATEMENTS = os.getenv("DB_PREPARE_STATEMENTS", "false").lower() in ("1", "true", "yes")
+STRICT_LOADING = os.getenv("DB_STRICT_LOADING", "false").lower() in ("1", "true", "yes")
 
-SessionLocal = sessionmaker(bind=engine)
\ No newline at end of file
+REPLICA_URIS = [uri.strip() for uri in os.getenv("DB_REPLICA_URIS", "").split(",") if uri.strip()]
+REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "30"))
+PIN_READS_AFTER_WRITE = float(os.getenv("DB_PIN_READS_AFTER_WRITE", "0"))
+
+if POOL_PROFILE not in ("default", "external"):
+    raise ValueError(f"Невідомий DB_POOL_PROFILE: {POOL_PROFILE}. Доступні: default, external")
+
+
+class PoolStats:
+    """Лічильники пулу: видачі/повернення з'єднань, нові з'єднання і час очікування з'єднання"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.waits = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "wait_avg_ms": self.wait_total / self.waits * 1000 if self.waits else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+                "wait_total_ms": self.wait_total * 1000,
+            }
+
+
+pool_stats = PoolStats()
+
+
+class TimedConnectMixin:
+    # Pool.connect() - публічний метод, через який рушій (Engine.raw_connection) бере
+    # з'єднання: видача вільного, очікування на нього або відкриття нового, разом
+    # з обробниками подій checkout (і pre-ping, якщо DB_POOL_PRE_PING)
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_stats.record_wait(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(TimedConnectMixin, QueuePool):
+    pass
+
+
+class InstrumentedNullPool(TimedConnectMixin, NullPool):
+    pass
+
+
+def pool_options():
+    """Параметри create_engine для пулу відповідно до DB_POOL_PROFILE"""
+    if POOL_PROFILE == "external":
+        return {"poolclass": InstrumentedNullPool}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+
+
+def connect_args(uri):
+    if STATEMENT_TIMEOUT and make_url(uri).get_backend_name() == "postgresql":
+        return {"options": f"-c statement_timeout={STATEMENT_TIMEOUT}"}
+    return {}
+
+
+def instrument_pool(engine):
+    event.listen(engine, "connect", lambda *args: pool_stats.count("connects"))
+    event.listen(engine, "checkout", lambda *args: pool_stats.count("checkouts"))
+    event.listen(engine, "checkin", lambda *args: pool_stats.count("checkins"))
+
+
+# Рушій створюється при першому зверненні (get_engine(), conf.db.engine або
+# перший виклик SessionLocal()), а не під час імпорту модуля
+_engine = None
+
+
+def new_engine(uri):
+    engine = create_engine(uri, echo=False, connect_args=connect_args(uri), **pool_options())
+    instrument_pool(engine)
+    return engine
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = new_engine(URI)
+        event.listen(_engine, "after_cursor_execute", _track_writes)
+    return _engine
+
+
+# Час останнього запису в основну базу з цього процесу (для DB_PIN_READS_AFTER_WRITE)
+_last_write = None
+
+
+def _track_writes(conn, cursor, statement, parameters, context, executemany):
+    if context.isinsert or context.isupdate or context.isdelete:
+        mark_write()
+
+
+def mark_write():
+    global _last_write
+    _last_write = time.monotonic()
+
+
+def reads_pinned():
+    """Чи читати з основної бази, бо цей процес щойно писав у неї"""
+    return bool(PIN_READS_AFTER_WRITE) and _last_write is not None \
+        and time.monotonic() - _last_write < PIN_READS_AFTER_WRITE
+
+
+class Replica:
+    """Рушій репліки і стан її перевірки: SELECT 1 не частіше, ніж раз на check_interval"""
+
+    def __init__(self, uri, check_interval=REPLICA_CHECK_INTERVAL):
+        self.uri = uri
+        self.check_interval = check_interval
+        self.healthy = True
+        self.checked_at = None
+        self._engine = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = new_engine(self.uri)
+            # Розірване з'єднання виводить репліку з ротації до наступної перевірки
+            event.listen(self._engine, "handle_error", self._on_error)
+        return self._engine
+
+    def _on_error(self, context):
+        if context.is_disconnect:
+            self.mark_down()
+
+    def mark_down(self):
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+    def is_healthy(self):
+        now = time.monotonic()
+        if self.checked_at is None or now - self.checked_at >= self.check_interval:
+            try:
+                with self.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                self.healthy = True
+            except Exception:
+                self.healthy = False
+            self.checked_at = now
+        return self.healthy
+
+
+class ReplicaRouter:
+    """Циклічний вибір здорової репліки; None - жодна репліка недоступна"""
+
+    def __init__(self, uris):
+        self.replicas = [Replica(uri) for uri in uris]
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+
+    def choose(self):
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if replica.is_healthy():
+                return replica.engine
+        return None
+
+
+replicas = ReplicaRouter(REPLICA_URIS)
+
+
+def read_url():
+    """Адреса бази для читання, як у ReadSessionLocal: здорова репліка DB_REPLICA_URIS або основна база"""
+    return (replicas.choose() or get_engine()).url
+
+
+class RoutingSession(Session):
+    """Сесія для читання: запити транзакції йдуть на одну репліку, записи - в основну базу.
+
+    Після першого запису в транзакції, а також протягом DB_PIN_READS_AFTER_WRITE
+    секунд після запису в цьому процесі, читання теж іде в основну базу.
+    """
+
+    _read_bind = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self._read_bind = get_engine()
+        if self._read_bind is None:
+            self._read_bind = (None if reads_pinned() else replicas.choose()) or get_engine()
+        return self._read_bind
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_read_bind(session, transaction):
+    # Нова транзакція - новий вибір репліки
+    if transaction.parent is None:
+        session._read_bind = None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _strict_loading(orm_execute_state):
+    # Опції запиту з явними joinedload/selectinload мають перевагу над "*";
+    # запити самих завантажувачів зв'язків успадковують опції батьківського запиту
+    if STRICT_LOADING and orm_execute_state.is_select and not orm_execute_state.is_relationship_load:
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+class LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionmaker()
+
+# Звіти і list: читання з реплік DB_REPLICA_URIS, якщо вони задані
+ReadSessionLocal = sessionmaker(class_=RoutingSession)
+
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
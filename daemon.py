@@ -0,0 +1,124 @@
+import io
+import json
+import os
+import shlex
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from contextlib import redirect_stderr, redirect_stdout
+
+# Постійний режим main.py: інтерактивна оболонка або локальний Unix-сокет сервер.
+# Процес імпортує модулі, конфігурує mappers і відкриває пул один раз, тож
+# кожна наступна команда не платить за старт інтерпретатора, а кеш звітів
+# лишається теплим між командами.
+#
+# Протокол сервера: клієнт надсилає один рядок JSON зі списком аргументів
+# main.py і отримує один рядок JSON {"status": код виходу, "output": текст}.
+
+DEFAULT_SOCKET = os.getenv("DAEMON_SOCKET", "/tmp/goit-hw06.sock")
+
+
+def warm_up():
+    # Те, що main.py відкладає до першої команди, постійний режим робить одразу
+    import commands
+    from conf.db import get_engine
+    from sqlalchemy.orm import configure_mappers
+
+    configure_mappers()
+    with get_engine().connect():
+        pass
+
+
+def execute(run_command, argv, interactive):
+    """Виконує команду main.py; повертає код виходу (parser.error дає 2)"""
+    try:
+        run_command(argv, interactive=interactive)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    return 0
+
+
+def run_shell(run_command):
+    warm_up()
+    print("Оболонка main.py: вводьте аргументи як у командному рядку, напр. -a list -m Group; exit - вихід")
+    while True:
+        try:
+            line = input("main> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+        if line in ("exit", "quit"):
+            break
+        if not line:
+            continue
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            print(f"Помилка розбору команди: {e}")
+            continue
+        started = time.perf_counter()
+        execute(run_command, argv, interactive=True)
+        print(f"({(time.perf_counter() - started) * 1000:.1f} мс)")
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        started = time.perf_counter()
+        try:
+            argv = json.loads(self.rfile.readline())
+        except ValueError:
+            argv = None
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+            self.respond(2, "Некоректний запит: очікується JSON-список аргументів\n")
+            return
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output):
+            status = execute(self.server.run_command, argv, interactive=False)
+        self.respond(status, output.getvalue())
+        print(f"{shlex.join(argv)}: код {status}, {(time.perf_counter() - started) * 1000:.1f} мс", flush=True)
+
+    def respond(self, status, output):
+        self.wfile.write((json.dumps({"status": status, "output": output}, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class CommandServer(socketserver.UnixStreamServer):
+    # Команди виконуються по одній: redirect_stdout і сесії не розраховані на потоки
+
+    def __init__(self, socket_path, run_command):
+        self.run_command = run_command
+        super().__init__(socket_path, CommandHandler)
+
+
+def socket_in_use(socket_path):
+    """Чи слухає сокет інший сервер; файл, що лишився після аварійної зупинки, - ні"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        try:
+            conn.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+
+def serve(run_command, socket_path=DEFAULT_SOCKET):
+    if socket_in_use(socket_path):
+        print(f"Сокет {socket_path} уже слухає інший сервер main.py", file=sys.stderr)
+        sys.exit(1)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    warm_up()
+    with CommandServer(socket_path, run_command) as server:
+        # SIGTERM зупиняє цикл сервера після поточної команди, з видаленням файлу сокета.
+        # Виняток з обробника пройшов би крізь команду і був би прийнятий за її код виходу,
+        # а shutdown() чекає на вихід із serve_forever, тож викликається з окремого потоку
+        signal.signal(signal.SIGTERM, lambda *args: threading.Thread(target=server.shutdown).start())
+        print(f"Сервер main.py слухає {socket_path} (Ctrl+C - зупинка)", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+    print("Сервер зупинено", file=sys.stderr)
@@ -0,0 +1,88 @@
+from sqlalchemy import Numeric, and_, cast, delete, exists, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.models import Grade, GradeStat
+
+
+def stats_avg():
+    """Середній бал, обчислений з агрегатів grade_stats (sum / count)"""
+    return (cast(func.sum(GradeStat.grade_sum), Numeric) / func.sum(GradeStat.grade_count)).label("avg_grade")
+
+
+def grade_source(use_stats: bool):
+    """Повертає джерело оцінок і вираз середнього балу: сирі grades або агрегати grade_stats"""
+    if use_stats:
+        return GradeStat, stats_avg()
+    return Grade, func.avg(Grade.grade).label("avg_grade")
+
+
+def recompute_query():
+    return (
+        select(
+            Grade.student_id,
+            Grade.subject_id,
+            func.count().label("grade_count"),
+            func.sum(Grade.grade).label("grade_sum"),
+        )
+        .group_by(Grade.student_id, Grade.subject_id)
+    )
+
+
+def refresh_grade_stats(session: Session):
+    """Перебудовує grade_stats з таблиці grades.
+
+    Перебудова виконується як upsert змінених пар і видалення зниклих, тому читачі
+    таблиці не блокуються і до коміту бачать попередній узгоджений стан.
+    Повертає кількість оновлених і видалених рядків.
+    """
+    stmt = insert(GradeStat).from_select(
+        ["student_id", "subject_id", "grade_count", "grade_sum"], recompute_query()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GradeStat.student_id, GradeStat.subject_id],
+        set_={"grade_count": stmt.excluded.grade_count, "grade_sum": stmt.excluded.grade_sum},
+        where=tuple_(GradeStat.grade_count, GradeStat.grade_sum).is_distinct_from(
+            tuple_(stmt.excluded.grade_count, stmt.excluded.grade_sum)
+        ),
+    )
+    upserted = session.execute(stmt).rowcount
+
+    stale = delete(GradeStat).where(
+        ~exists().where(Grade.student_id == GradeStat.student_id, Grade.subject_id == GradeStat.subject_id)
+    )
+    deleted = session.execute(stale).rowcount
+    return upserted, deleted
+
+
+def check_grade_stats(session: Session):
+    """Порівнює grade_stats з повним перерахунком по grades.
+
+    Повертає розбіжності як рядки (student_id, subject_id, expected_count,
+    expected_sum, actual_count, actual_sum); порожній список означає узгодженість.
+    """
+    expected = recompute_query().subquery()
+    query = (
+        select(
+            func.coalesce(expected.c.student_id, GradeStat.student_id).label("student_id"),
+            func.coalesce(expected.c.subject_id, GradeStat.subject_id).label("subject_id"),
+            expected.c.grade_count,
+            expected.c.grade_sum,
+            GradeStat.grade_count,
+            GradeStat.grade_sum,
+        )
+        .select_from(expected)
+        .join(
+            GradeStat,
+            and_(GradeStat.student_id == expected.c.student_id, GradeStat.subject_id == expected.c.subject_id),
+            full=True,
+        )
+        .filter(
+            or_(
+                GradeStat.grade_count.is_distinct_from(expected.c.grade_count),
+                GradeStat.grade_sum.is_distinct_from(expected.c.grade_sum),
+            )
+        )
+        .order_by("student_id", "subject_id")
+    )
+    return session.execute(query).all()
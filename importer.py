@@ -0,0 +1,314 @@
+import csv
+import datetime
+import json
+import os
+import time
+from itertools import islice
+
+from sqlalchemy import Column, Integer, MetaData, Table, exists, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from conf.db import SessionLocal
+from models.models import Student, Group, Teacher, Subject, Grade
+from reports import report_cache
+from utils.bulk import load_rows, sync_sequence
+
+# Масовий імпорт записів з CSV/JSONL: файл читається потоково, рядки
+# перевіряються пачками, валідні рядки йдуть через COPY у тимчасову таблицю,
+# звідки одним INSERT ... ON CONFLICT потрапляють у цільову таблицю.
+# Кожна пачка - окрема транзакція, тож помилка в пачці не скасовує попередні;
+# пачку, яку відхилила база, write_chunk пише по рядку, і помилки отримують лише
+# рядки, що не записались.
+
+MODELS = {'Student': Student, 'Group': Group, 'Teacher': Teacher, 'Subject': Subject, 'Grade': Grade}
+
+# Природні ключі для upsert, якщо у файлі немає колонки id.
+# Для Grade природного ключа немає - рядки без id просто додаються.
+CONFLICT_KEYS = {'Student': ('email',), 'Teacher': ('email',), 'Group': ('name',), 'Subject': ('name',), 'Grade': None}
+
+# Зовнішні ключі, існування яких перевіряється для кожної пачки
+FOREIGN_KEYS = {
+    'Student': {'group_id': Group},
+    'Subject': {'teacher_id': Teacher},
+    'Grade': {'student_id': Student, 'subject_id': Subject},
+}
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_PRINTED_ERRORS = 20
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_rows(path):
+    """Генератор (номер рядка, словник значень) для .csv або .jsonl/.ndjson"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8", newline="") as source:
+        if extension in (".jsonl", ".ndjson"):
+            for line_no, line in enumerate(source, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, RowError(f"некоректний JSON: {e}")
+        else:
+            # Рядок 1 - заголовок
+            for line_no, row in enumerate(csv.DictReader(source), start=2):
+                yield line_no, row
+
+
+def convert_value(column, value):
+    if value is None or value == "":
+        if not column.nullable:
+            raise RowError(f"поле {column.name} обов'язкове")
+        return None
+    python_type = column.type.python_type
+    try:
+        if python_type is int:
+            if isinstance(value, float) and not value.is_integer():
+                raise ValueError
+            return int(value)
+        if python_type is datetime.datetime:
+            if isinstance(value, datetime.datetime):
+                return value
+            return datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        raise RowError(f"некоректне значення {column.name}: {value!r}")
+    value = str(value)
+    length = getattr(column.type, "length", None)
+    if length and len(value) > length:
+        raise RowError(f"поле {column.name} довше за {length} символів")
+    return value
+
+
+def import_columns(model_class, fieldnames):
+    """Колонки моделі, присутні у файлі; невідомі поля - помилка всього імпорту"""
+    table_columns = model_class.__table__.columns
+    unknown = [name for name in fieldnames if name not in table_columns]
+    if unknown:
+        raise ValueError(f"Невідомі поля для {model_class.__name__}: {', '.join(unknown)}")
+    # Без значення можна лише колонки, які заповнює база (послідовність id чи значення за замовчуванням)
+    missing = [
+        column.name for column in table_columns
+        if not column.nullable and column.name not in fieldnames
+        and column is not model_class.__table__.autoincrement_column and column.server_default is None
+    ]
+    if missing:
+        raise ValueError(f"У файлі бракує обов'язкових полів: {', '.join(missing)}")
+    return [column for column in table_columns if column.name in fieldnames]
+
+
+def validate_chunk(session: Session, model_name, columns, chunk):
+    """Перетворює пачку рядків; повертає (валідні кортежі з номером рядка, помилки)"""
+    valid, errors = [], []
+    for line_no, row in chunk:
+        try:
+            if isinstance(row, RowError):
+                raise row
+            if not isinstance(row, dict):
+                raise RowError("рядок має бути об'єктом")
+            unknown = set(row) - {column.name for column in columns}
+            if unknown:
+                raise RowError(f"невідомі поля: {', '.join(sorted(map(str, unknown)))}")
+            valid.append((*(convert_value(column, row.get(column.name)) for column in columns), line_no))
+        except RowError as e:
+            errors.append((line_no, str(e)))
+
+    # Зовнішні ключі: один запит на колонку для всієї пачки
+    for field, target in FOREIGN_KEYS.get(model_name, {}).items():
+        if not any(column.name == field for column in columns):
+            continue
+        position = next(i for i, column in enumerate(columns) if column.name == field)
+        ids = {row[position] for row in valid if row[position] is not None}
+        existing = set(session.execute(select(target.id).filter(target.id.in_(ids))).scalars()) if ids else set()
+        checked = []
+        for row in valid:
+            if row[position] is not None and row[position] not in existing:
+                errors.append((row[-1], f"{target.__name__} з ID {row[position]} не існує"))
+            else:
+                checked.append(row)
+        valid = checked
+    return valid, errors
+
+
+def staging_table(model_class, columns):
+    return Table(
+        f"import_{model_class.__tablename__}",
+        MetaData(),
+        *(Column(column.name, column.type) for column in columns),
+        Column("line_no", Integer),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+def conflict_columns(model_name, fieldnames):
+    """Колонки ключа upsert: id або природний ключ; None - лише вставка"""
+    if "id" in fieldnames:
+        return ("id",)
+    return CONFLICT_KEYS[model_name]
+
+
+def upsert_by_id_statements(model_class, staging, columns):
+    """UPDATE наявних id і INSERT решти - для таблиць, де id не має власного унікального індексу.
+
+    Первинний ключ секціонованої grades - (id, date_received), тож ON CONFLICT (id)
+    неможливий, а ON CONFLICT (id, date_received) пропустив би рядок з тим самим id
+    і іншою датою і вставив би другий рядок з цим id. UPDATE за id переносить такий
+    рядок у секцію нової дати, і id лишається унікальним.
+    """
+    target = model_class.__table__
+    names = [column.name for column in columns]
+    # Останній рядок файлу з тим самим id перемагає
+    latest = (
+        select(*(staging.c[name] for name in names))
+        .distinct(staging.c.id).order_by(staging.c.id, staging.c.line_no.desc())
+        .subquery()
+    )
+    update_existing = (
+        update(target).where(target.c.id == latest.c.id)
+        .values({name: latest.c[name] for name in names if name != "id"})
+    )
+    insert_missing = insert(target).from_select(
+        names,
+        select(*(latest.c[name] for name in names)).where(~exists().where(target.c.id == latest.c.id)),
+    )
+    return [update_existing, insert_missing]
+
+
+def upsert_statement(model_class, staging, columns, conflict_key):
+    target = model_class.__table__
+    names = [column.name for column in columns]
+    source = select(*(staging.c[name] for name in names))
+    if conflict_key is None:
+        return insert(target).from_select(names, source)
+    # Останній рядок файлу з тим самим ключем перемагає (DISTINCT ON ... ORDER BY line_no DESC)
+    key_columns = [staging.c[name] for name in conflict_key]
+    source = source.distinct(*key_columns).order_by(*key_columns, staging.c.line_no.desc())
+    statement = insert(target).from_select(names, source)
+    updates = {name: statement.excluded[name] for name in names if name not in conflict_key}
+    if not updates:
+        return statement.on_conflict_do_nothing(index_elements=list(conflict_key))
+    return statement.on_conflict_do_update(index_elements=list(conflict_key), set_=updates)
+
+
+def load_chunk(session: Session, model_class, columns, rows, conflict_key):
+    """COPY пачки у тимчасову таблицю і upsert у цільову; повертає кількість змінених рядків"""
+    staging = staging_table(model_class, columns)
+    conn = session.connection()
+    staging.create(conn)
+    load_rows(conn, staging, [column.name for column in columns] + ["line_no"], rows)
+    if conflict_key == ("id",) and len(model_class.__table__.primary_key.columns) > 1:
+        statements = upsert_by_id_statements(model_class, staging, columns)
+    else:
+        statements = [upsert_statement(model_class, staging, columns, conflict_key)]
+    count = sum(conn.execute(statement).rowcount for statement in statements)
+    if conflict_key is not None and "id" in conflict_key:
+        sync_sequence(conn, model_class.__table__)
+    # Тимчасова таблиця видаляється одразу: write_chunk може викликати load_chunk кілька разів за транзакцію
+    staging.drop(conn)
+    return count
+
+
+def db_error(e):
+    """Перший рядок повідомлення бази без SQL і параметрів"""
+    return str(getattr(e, "orig", e)).strip().splitlines()[0]
+
+
+def write_chunk(session: Session, model_class, columns, rows, conflict_key):
+    """Пише пачку; повертає (кількість записаних рядків, помилки).
+
+    Якщо база відхиляє пачку (дубль унікального поля, значення поза діапазоном), рядки
+    пишуться по одному, кожен у власній точці збереження, і помилку отримують лише ті
+    рядки, що не записались.
+    """
+    try:
+        with session.begin_nested():
+            return load_chunk(session, model_class, columns, rows, conflict_key), []
+    except DBAPIError:
+        pass
+    imported, errors = 0, []
+    for row in rows:
+        try:
+            with session.begin_nested():
+                imported += load_chunk(session, model_class, columns, [row], conflict_key)
+        except DBAPIError as e:
+            errors.append((row[-1], f"рядок не записано: {db_error(e)}"))
+    return imported, errors
+
+
+def import_records(model_name, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Імпортує файл; повертає (кількість записаних рядків, список помилок (номер рядка, текст))"""
+    model_class = MODELS[model_name]
+    rows = read_rows(path)
+    first = next(rows, None)
+    if first is None:
+        return 0, []
+    _, first_row = first
+    fieldnames = list(first_row) if isinstance(first_row, dict) else []
+    if not fieldnames:
+        raise ValueError("Не вдалося визначити поля з першого рядка файлу")
+    columns = import_columns(model_class, fieldnames)
+    conflict_key = conflict_columns(model_name, fieldnames)
+
+    def all_rows():
+        yield first
+        yield from rows
+
+    imported, errors = 0, []
+    source = all_rows()
+    session = SessionLocal()
+    try:
+        while chunk := list(islice(source, chunk_size)):
+            valid, chunk_errors = validate_chunk(session, model_name, columns, chunk)
+            errors.extend(chunk_errors)
+            if not valid:
+                continue
+            try:
+                count, chunk_errors = write_chunk(session, model_class, columns, valid, conflict_key)
+                session.commit()
+                imported += count
+                errors.extend(chunk_errors)
+            except Exception as e:
+                session.rollback()
+                first_line, last_line = chunk[0][0], chunk[-1][0]
+                errors.append((first_line, f"пачку рядків {first_line}-{last_line} не записано: {e}"))
+    finally:
+        session.close()
+    if imported:
+        # Імпорт може зачепити будь-які звіти, тож кеш звітів скидається повністю
+        report_cache.clear()
+    return imported, sorted(errors)
+
+
+def write_errors(path, errors):
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["line", "error"])
+        writer.writerows(errors)
+
+
+def run_import(model_name, path, chunk_size=DEFAULT_CHUNK_SIZE, errors_path=None):
+    started = time.perf_counter()
+    try:
+        imported, errors = import_records(model_name, path, chunk_size)
+    except (OSError, ValueError) as e:
+        print(f"Помилка під час імпорту {model_name}: {e}")
+        return
+    elapsed = time.perf_counter() - started
+
+    for line_no, message in errors[:MAX_PRINTED_ERRORS]:
+        print(f"Рядок {line_no}: {message}")
+    if len(errors) > MAX_PRINTED_ERRORS:
+        print(f"... і ще {len(errors) - MAX_PRINTED_ERRORS} помилок")
+    if errors_path and errors:
+        write_errors(errors_path, errors)
+        print(f"Усі помилки записано у {errors_path}")
+
+    rate = imported / elapsed if elapsed else float("inf")
+    print(f"{model_name}: імпортовано {imported} рядків, помилок {len(errors)}, "
+          f"{elapsed:.2f} с ({rate:,.0f} рядків/с)")
@@ -0,0 +1,203 @@
+"""Таблиці лідерів: топ-N студентів за середнім балом - загальна і для кожного предмета.
+
+    python main.py -a leaderboard [--subject_id 3] [--top 10] [--ties] [--rebuild]
+    python leaderboard.py --verify
+
+Таблиці будуються з поточних агрегатів (sum, count) - рядків grade_stats, а не
+з усіх оцінок, і живуть у кеші звітів процесу (shell/serve). Нова оцінка через
+main.py -a create лише додається до сум студента (reports.invalidate_record),
+тож читання таблиці не перебирає всіх студентів. Будь-яка інша зміна оцінок
+у тому ж процесі (update, remove, import, масові операції) скидає таблиці
+разом із кешем звітів, і наступне читання перебудовує їх з бази. Зміни з
+інших процесів - інший main.py, partitions.py --detach-before, пряма робота з
+базою - запущений shell / serve побачить лише після перебудови, не пізніше
+ніж через REPORT_CACHE_TTL.
+
+Кожна таблиця - max-купа (heapq з оберненим середнім) з лінивим видаленням:
+при зміні сум студента в купу додається новий запис, а старий лишається і
+відкидається, коли дійде до вершини (його count уже не збігається з поточним).
+Середні порівнюються точно (Fraction), нічиї впорядковуються за student_id, як
+ORDER BY avg_grade DESC, students.id у select_1 і select_2; ранг - як rank()
+у SQL (1, 2, 2, 4), а з ties=True до топу потрапляють усі, хто ділить N-те місце.
+"""
+import argparse
+import heapq
+import time
+from fractions import Fraction
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.models import GradeStat, Student, Subject
+from reports import ALL_GRADES_TAG, report_cache
+from utils.cache import MISSING
+
+DEFAULT_TOP = 10
+LEADERBOARDS_KEY = ("leaderboards",)
+
+
+class LeaderboardEntry(NamedTuple):
+    rank: int
+    student_id: int
+    full_name: str
+    grade_count: int
+    avg_grade: float
+
+
+class Leaderboard:
+    """Топ-N одного розрізу над сумами (sum, count) кожного студента"""
+
+    def __init__(self):
+        self.totals = {}  # student_id -> (sum, count)
+        self._heap = []  # (-середнє, student_id, count на момент запису)
+
+    def __len__(self):
+        return len(self.totals)
+
+    def load(self, student_id, grade_sum, grade_count):
+        """Додає готові агрегати студента; купа будується один раз у heapify()"""
+        total, count = self.totals.get(student_id, (0, 0))
+        self.totals[student_id] = (total + grade_sum, count + grade_count)
+
+    def heapify(self):
+        self._heap = [(-Fraction(total, count), student_id, count)
+                      for student_id, (total, count) in self.totals.items()]
+        heapq.heapify(self._heap)
+
+    def add(self, student_id, grade):
+        total, count = self.totals.get(student_id, (0, 0))
+        total, count = total + grade, count + 1
+        self.totals[student_id] = (total, count)
+        heapq.heappush(self._heap, (-Fraction(total, count), student_id, count))
+        # Застарілих записів не більше, ніж живих: інакше купа перебудовується
+        if len(self._heap) > 2 * len(self.totals) + 64:
+            self.heapify()
+
+    def top(self, n, ties=False):
+        """[(ранг, student_id, count, середнє)] для перших n студентів.
+
+        Записи знімаються з вершини купи і повертаються назад, тож читання коштує
+        O((n + застарілі) log розміру купи), а не сортування всіх студентів.
+        """
+        result, taken = [], []
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            neg_avg, student_id, count = entry
+            if self.totals[student_id][1] != count:
+                continue  # застарілий запис: середнє студента вже змінилось
+            taken.append(entry)
+            if len(result) >= n and not (ties and result and neg_avg == -result[-1][3]):
+                break
+            rank = result[-1][0] if result and neg_avg == -result[-1][3] else len(result) + 1
+            result.append((rank, student_id, count, -neg_avg))
+        for entry in taken:
+            heapq.heappush(self._heap, entry)
+        return result
+
+
+class Leaderboards:
+    """Загальна таблиця лідерів і по одній на кожен предмет"""
+
+    def __init__(self):
+        self.overall = Leaderboard()
+        self.subjects = {}  # subject_id -> Leaderboard
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, session: Session):
+        """Повна перебудова з агрегатів grade_stats (один рядок на пару студент-предмет)"""
+        boards = cls()
+        rows = session.execute(
+            select(GradeStat.student_id, GradeStat.subject_id, GradeStat.grade_sum, GradeStat.grade_count)
+        )
+        for student_id, subject_id, grade_sum, grade_count in rows:
+            boards.overall.load(student_id, grade_sum, grade_count)
+            boards.subject(subject_id).load(student_id, grade_sum, grade_count)
+        boards.overall.heapify()
+        for board in boards.subjects.values():
+            board.heapify()
+        return boards
+
+    def subject(self, subject_id):
+        if subject_id not in self.subjects:
+            self.subjects[subject_id] = Leaderboard()
+        return self.subjects[subject_id]
+
+    def add_grade(self, student_id, subject_id, grade):
+        self.overall.add(student_id, int(grade))
+        self.subject(subject_id).add(student_id, int(grade))
+
+    def top(self, subject_id=None, n=DEFAULT_TOP, ties=False):
+        board = self.overall if subject_id is None else self.subjects.get(subject_id, Leaderboard())
+        return board.top(n, ties)
+
+
+def get_leaderboards(session: Session, rebuild=False):
+    """Таблиці лідерів процесу з кешу звітів.
+
+    Запис позначено тегом усіх оцінок, як і колонковий знімок; інкрементні
+    оновлення перезаписують його, тож вік таблиць обмежується окремо - не
+    довше REPORT_CACHE_TTL від останньої повної перебудови, щоб побачити
+    зміни з інших процесів.
+    """
+    boards = report_cache.get(LEADERBOARDS_KEY)
+    if rebuild or boards is MISSING or time.monotonic() - boards.built_at > report_cache.ttl:
+        boards = Leaderboards.build(session)
+        report_cache.set(LEADERBOARDS_KEY, boards, {ALL_GRADES_TAG})
+    return boards
+
+
+def leaderboard_entries(session: Session, boards, subject_id=None, n=DEFAULT_TOP, ties=False):
+    """Рядки таблиці лідерів з іменами студентів (один запит за id з топу)"""
+    top = boards.top(subject_id, n, ties)
+    names = dict(session.execute(
+        select(Student.id, Student.full_name).filter(Student.id.in_([student_id for _, student_id, _, _ in top]))
+    ).all())
+    return [LeaderboardEntry(rank, student_id, names.get(student_id), count, float(avg))
+            for rank, student_id, count, avg in top]
+
+
+def verify(session: Session, boards):
+    """Звіряє топ-5 з select_1 і лідерів кожного предмета з select_2; повертає розбіжності"""
+    from my_select import select_1, select_2
+
+    def same(entries, rows):
+        return [(e.full_name, round(e.avg_grade, 9)) for e in entries] == \
+               [(row.full_name, round(float(row.avg_grade), 9)) for row in rows]
+
+    mismatches = []
+    if not same(leaderboard_entries(session, boards, None, 5), select_1(session)):
+        mismatches.append("select_1")
+    for subject_id in session.execute(select(Subject.id).order_by(Subject.id)).scalars():
+        if not same(leaderboard_entries(session, boards, subject_id, 1), select_2(session, subject_id)):
+            mismatches.append(f"select_2({subject_id})")
+    return mismatches
+
+
+def main():
+    from conf.db import ReadSessionLocal
+
+    parser = argparse.ArgumentParser(description="Таблиці лідерів: звірка з select_1 / select_2")
+    parser.add_argument("--verify", action="store_true", help="Звірити топ-5 з select_1 і лідерів предметів з select_2")
+    args = parser.parse_args()
+    if not args.verify:
+        parser.error("потрібна дія --verify")
+
+    session = ReadSessionLocal()
+    try:
+        started = time.perf_counter()
+        boards = get_leaderboards(session)
+        print(f"Таблиці лідерів побудовано за {(time.perf_counter() - started) * 1000:.1f} мс: "
+              f"{len(boards.overall)} студентів, {len(boards.subjects)} предметів")
+        mismatches = verify(session, boards)
+        if mismatches:
+            print(f"Розбіжності з SQL: {', '.join(mismatches)}")
+            raise SystemExit(1)
+        print("Таблиці лідерів збігаються з select_1 і select_2")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
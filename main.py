@@ -1,156 +1,145 @@
 import argparse
 
-from conf.db import SessionLocal
-from models.models import Student, Group, Teacher, Subject, Grade
-from utils.print_table import print_table
-from reports import main as reports_main
+from daemon import DEFAULT_SOCKET, run_shell, serve
+from utils.dates import parse_date_bound
 
+# main.py імпортує лише argparse і легкі модулі: SQLAlchemy, моделі, tabulate
+# і рушій бази підтягуються модулем commands вже після перевірки аргументів.
 
+# Аргументи командного рядка, які не є полями моделей
+SERVICE_ARGS = ['action', 'model', 'id', 'stats', 'format', 'batch', 'out', 'verify',
+                'after_id', 'limit', 'page_size', 'file', 'chunk_size', 'errors',
+                'ids', 'where', 'dry_run', 'report', 'socket', 'since', 'until',
+                'profile', 'slow_ms', 'explain', 'metrics_file', 'engine', 'compression',
+                'top', 'ties', 'rebuild', 'related']
 
+# Номери звітів reports.REPORTS
+REPORT_NUMBERS = range(1, 17)
 
-def create_record(model_name, **kwargs):    
-    session = SessionLocal()
-    try:
-        model_class = get_model_class(model_name)
-        new_record = model_class(**kwargs)
-        session.add(new_record)
-        session.commit()
-        print(f"{model_name} успішно створено з ID: {new_record.id}")
-    except Exception as e:
-        session.rollback()
-        print(f"Помилка під час створення {model_name}: {e}")
-    finally:
-        session.close()
-
-def list_records(model_name):    
-    session = SessionLocal()
+# Пакетний режим перебирає всі значення параметрів-ID; звіти за період (13-16) до нього не входять
+BATCH_REPORT_NUMBERS = range(1, 13)
+
+REQUIRED_FIELDS = {
+    'Student': ['first_name', 'last_name', 'email', 'phone', 'group_id'],
+    'Group': ['name'],
+    'Teacher': ['first_name', 'last_name', 'email', 'phone'],
+    'Subject': ['name', 'teacher_id'],
+    'Grade': ['student_id', 'subject_id', 'grade', 'date_received'],
+}
+
+def id_list(value):
+    """'1,2,5-10' -> [(1, 1), (2, 2), (5, 10)]; діапазони не розгортаються в окремі ID"""
+    ids = []
     try:
-        model_class = get_model_class(model_name)
-        records = session.query(model_class).all()
-        if not records:
-            print(f"Немає жодного запису для моделі {model_name}")
-            return
-        
-        print(f"Список всіх {model_name}:")        
-        
-        headers, table_data = get_table_data(model_name, records)
-        print_table(table_data, headers)
-        
-    except Exception as e:
-        print(f"Помилка під час отримання списку {model_name}: {e}")
-    finally:
-        session.close()
+        for part in filter(None, (part.strip() for part in value.split(","))):
+            start, sep, end = part.partition("-")
+            ids.append((int(start), int(end)) if sep else (int(part), int(part)))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"некоректний список ID: {value!r}")
+    if not ids:
+        raise argparse.ArgumentTypeError("порожній список ID")
+    empty = [f"{start}-{end}" for start, end in ids if start > end]
+    if empty:
+        raise argparse.ArgumentTypeError(f"порожній діапазон ID: {', '.join(empty)}")
+    return ids
 
-def update_record(model_name, id, **kwargs):    
-    session = SessionLocal()
+def report_list(value):
+    """'all' або номери звітів через кому -> список номерів звітів"""
+    if value == "all":
+        return list(BATCH_REPORT_NUMBERS)
     try:
-        model_class = get_model_class(model_name)
-        record = session.query(model_class).filter(model_class.id == id).first()
-        if not record:
-            print(f"{model_name} з ID {id} не знайдено")
-            return
-                
-        old_values = {}
-        for key in kwargs.keys():
-            if hasattr(record, key):
-                old_values[key] = getattr(record, key)
-               
-        for key, value in kwargs.items():
-            if hasattr(record, key):
-                setattr(record, key, value)
-        
-        session.commit()
-                
-        print(f"{model_name} з ID {id} успішно оновлено")
-        print("Змінені поля:")
-        for key, old_value in old_values.items():
-            new_value = getattr(record, key)
-            print(f"  {key}: {old_value} -> {new_value}")
-            
-    except Exception as e:
-        session.rollback()
-        print(f"Помилка під час оновлення {model_name}: {e}")
-    finally:
-        session.close()
-
-def remove_record(model_name, id):    
-    session = SessionLocal()
+        report_nums = [int(num) for num in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"некоректний список звітів: {value!r}")
+    unknown = [num for num in report_nums if num not in BATCH_REPORT_NUMBERS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"звіти {unknown} недоступні в пакетному режимі")
+    return report_nums
+
+def date_bound(value):
     try:
-        model_class = get_model_class(model_name)
-        record = session.query(model_class).filter(model_class.id == id).first()
-        if not record:
-            print(f"{model_name} з ID {id} не знайдено")
-            return
-                
-        print(f"Видалення {model_name} з ID {id}:")
-        headers, table_data = get_table_data(model_name, [record])
-        print_table(table_data, headers)
-        
-        session.delete(record)
-        session.commit()
-        print(f"{model_name} успішно видалено")
-    except Exception as e:
-        session.rollback()
-        print(f"Помилка під час видалення {model_name}: {e}")
-    finally:
-        session.close()
-
-def get_model_class(model_name):    
-    models = {
-        'Student': Student,
-        'Group': Group,
-        'Teacher': Teacher,
-        'Subject': Subject,
-        'Grade': Grade
-    }
-    
-    if model_name not in models:
-        raise ValueError(f"Невідома модель: {model_name}. Доступні моделі: {', '.join(models.keys())}")
-    
-    return models[model_name]
-
-def get_table_data(model_name, records):   
-    if model_name == 'Student':
-        headers = ["ID", "Повне ім'я", "Email", "Телефон", "Група"]
-        data = [[r.id, r.full_name, r.email, r.phone or '', r.group_id] for r in records]
-    elif model_name == 'Group':
-        headers = ["ID", "Назва"]
-        data = [[r.id, r.name] for r in records]
-    elif model_name == 'Teacher':
-        headers = ["ID", "Повне ім'я", "Email", "Телефон"]
-        data = [[r.id, r.full_name, r.email, r.phone or ''] for r in records]
-    elif model_name == 'Subject':
-        headers = ["ID", "Назва", "Викладач"]
-        data = [[r.id, r.name, r.teacher_id] for r in records]
-    elif model_name == 'Grade':
-        headers = ["ID", "Студент", "Предмет", "Оцінка", "Дата"]
-        data = [[r.id, r.student_id, r.subject_id, r.grade, r.date_received] for r in records]
-    else:
-        
-        if not records:
-            return [], []
-        
-        sample_record = records[0]
-        headers = [attr for attr in dir(sample_record) 
-                  if not attr.startswith('_') and not callable(getattr(sample_record, attr))
-                  and attr not in ('group', 'grades', 'metadata', 'registry')]
-        data = [[getattr(r, attr) for attr in headers] for r in records]
+        return parse_date_bound(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"очікується дата YYYY-MM-DD або Nd (N днів тому), отримано {value!r}")
+
+def model_fields(args):
+    # Видалення None значень та службових аргументів
+    return {k: v for k, v in vars(args).items() if v is not None and k not in SERVICE_ARGS}
+
+def validate_args(parser, args, interactive):
+    """Перевірки аргументів, яким не потрібні база і моделі"""
+    if args.action in ['shell', 'serve'] and not interactive:
+        parser.error(f"Операція {args.action} недоступна всередині постійного режиму")
     
-    return headers, data
+    if not args.profile and (args.explain or args.slow_ms is not None or args.metrics_file):
+        parser.error("Аргументи --explain, --slow-ms і --metrics-file використовуються лише з --profile")
+    if args.profile and args.action in ['shell', 'serve']:
+        parser.error("--profile вказується для окремих команд усередині shell або serve")
+    
+    if args.action == 'report':
+        if args.batch and not args.out:
+            parser.error("Пакетний режим потребує аргументу --out")
+        if args.report is None and not args.batch and not interactive:
+            parser.error("Діалоговий режим звітів недоступний через сервер, використайте --report або --batch")
+        if args.batch and args.engine != 'sql':
+            parser.error("Пакетний режим виконується лише рушієм sql")
+        if args.since and args.until and args.since > args.until:
+            parser.error(f"Початок періоду {args.since} пізніший за кінець {args.until}")
+    
+    if args.action == 'leaderboard' and args.top is not None and args.top < 1:
+        parser.error("--top має бути додатним числом")
+    
+    if args.action == 'snapshot' and not args.out:
+        parser.error("Операція snapshot потребує аргументу --out")
+    
+    if args.action == 'import' and (not args.model or not args.file):
+        parser.error("Операція import потребує аргументів -m та --file")
+    
+    if args.action in ['update', 'remove']:
+        bulk = args.ids is not None or bool(args.where)
+        if not args.model:
+            parser.error(f"Операція {args.action} потребує аргументу -m")
+        if bulk and args.id is not None:
+            parser.error("Аргумент --id не можна поєднувати з --ids або --where")
+        if not bulk and args.id is None:
+            parser.error(f"Операція {args.action} потребує аргументу --id, --ids або --where")
+    
+    if args.action == 'create':
+        # Перевірка наявності необхідних аргументів для створення запису
+        if not args.model:
+            parser.error("Операція create потребує аргументу -m")
+        kwargs = model_fields(args)
+        missing_fields = [field for field in REQUIRED_FIELDS[args.model] if field not in kwargs]
+        if missing_fields:
+            parser.error(f"Для створення {args.model} потрібні аргументи: {', '.join(['--' + f for f in missing_fields])}")
+    
+    if args.action == 'update' and not model_fields(args):
+        parser.error("Для операції update потрібно вказати хоча б один параметр для оновлення")
 
-def main():
+def build_parser():
     
     parser = argparse.ArgumentParser(description='CRUD операції та звіти для моделей бази даних')
     
     parser.add_argument('-a', '--action', required=True, 
-                        choices=['create', 'list', 'update', 'remove', 'report'],
-                        help='CRUD операція або звіт: create, list, update, remove, report')
+                        choices=['create', 'list', 'update', 'remove', 'import', 'report', 'refresh-stats', 'check-stats',
+                                 'leaderboard', 'snapshot', 'shell', 'serve'],
+                        help='CRUD операція, масовий імпорт, звіт, обслуговування агрегатів, таблиця лідерів, знімок бази '
+                             'або постійний режим: create, list, update, remove, import, report, refresh-stats, check-stats, '
+                             'leaderboard, snapshot, shell, serve')
     
     parser.add_argument('-m', '--model', choices=['Student', 'Group', 'Teacher', 'Subject', 'Grade'],
                         help='Модель, над якою виконується операція (тільки для CRUD)')
     
     # ID для операцій update та remove
     parser.add_argument('--id', type=int, help='ID запису для операцій update та remove')    
+    
+    # Масові update та remove: один UPDATE/DELETE ... WHERE для всіх вибраних записів
+    parser.add_argument('--ids', type=id_list, help='Список ID через кому, з діапазонами: 1,2,5-10 (для update та remove)')
+    parser.add_argument('--where', action='append', default=[],
+                        help='Умова поле<оператор>значення, напр. group_id=3 або grade<50; '
+                             'можна вказати кілька разів, умови об\'єднуються через AND (для update та remove)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Лише показати кількість записів, які буде змінено або видалено')
         
     # Параметри для Student, Teacher
     parser.add_argument('--first_name', help='Ім\'я (для Student або Teacher)')
@@ -171,60 +160,153 @@ def main():
     parser.add_argument('--grade', type=float, help='Оцінка (для Grade)')
     parser.add_argument('--date_received', help='Дата оцінки у форматі YYYY-MM-DD (для Grade)')
     
-    args = parser.parse_args()
+    # Параметри для звітів
+    parser.add_argument('--stats', action='store_true',
+                        help='Читати середні бали з таблиці grade_stats (для report)')
+    parser.add_argument('--format', choices=['table', 'csv', 'jsonl', 'plain'],
+                        help='Формат виводу звітів і list: table (типово), csv (типово для --batch), jsonl, plain')
+    parser.add_argument('--report', type=int, choices=REPORT_NUMBERS,
+                        help='Виконати один звіт без діалогу; параметри - --subject_id, --group_id, --teacher_id, --student_id, '
+                             '--since, --until')
+    parser.add_argument('--since', type=date_bound,
+                        help='Початок періоду для звітів 13-16: YYYY-MM-DD або Nd - N днів тому, напр. 30d')
+    parser.add_argument('--until', type=date_bound,
+                        help='Кінець періоду (включно) для звітів 13-16: YYYY-MM-DD або Nd, типово сьогодні')
+    parser.add_argument('--engine', choices=['sql', 'columnar'], default='sql',
+                        help='Рушій звітів 1-12: sql (типово) або columnar - знімок оцінок у NumPy, '
+                             'кешований разом зі звітами (для report)')
+    parser.add_argument('--batch', type=report_list,
+                        help='Пакетний режим: "all" або номери звітів через кому; всі комбінації параметрів одним запитом на звіт')
+    parser.add_argument('--out', help='Каталог для файлів пакетного режиму або знімка (snapshot)')
+    parser.add_argument('--verify', action='store_true',
+                        help='Після пакетного експорту звірити рядки з викликами select_N')
+    
+    
+    # Параметри для list
+    parser.add_argument('--after-id', type=int, help='Показати записи з ID, більшим за вказаний (для list)')
+    parser.add_argument('--limit', type=int, help='Максимальна кількість записів (для list)')
+    parser.add_argument('--page-size', type=int, default=500,
+                        help='Кількість рядків в одній таблиці для --format table (для list)')
+    parser.add_argument('--related', action='store_true',
+                        help='Назви пов\'язаних записів замість ID: група студента, викладач предмета, '
+                             'студент і предмет оцінки, предмети викладача, кількість студентів групи (для list)')
+    
+    # Параметри для import
+    parser.add_argument('--file', help='CSV або JSONL (.jsonl, .ndjson) файл із записами (для import)')
+    parser.add_argument('--chunk-size', type=int,
+                        help='Кількість рядків в одній пачці перевірки та запису, типово 5000 (для import) '
+                             'або читання довідників, типово 50000 (для snapshot)')
+    parser.add_argument('--errors', help='CSV файл для всіх помилок імпорту (для import)')
+    
+    # Параметри таблиці лідерів (--subject_id - таблиця предмета, без нього - загальна)
+    parser.add_argument('--top', type=int, help='Скільки студентів показати, типово 10 (для leaderboard)')
+    parser.add_argument('--ties', action='store_true',
+                        help='Показати всіх, хто ділить останнє місце топу (для leaderboard)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Перебудувати таблиці лідерів з grade_stats, а не брати з кешу процесу (для leaderboard)')
+    
+    # Параметри знімка
+    parser.add_argument('--compression', choices=['none', 'lz4', 'zstd'], default='none',
+                        help='Стиснення файлів Arrow; без стиснення (типово) знімок читається через '
+                             'memory map без копіювання (для snapshot)')
+    
+    # Параметри постійного режиму
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Шлях до Unix-сокета (для serve)')
+    
+    # Профілювання
+    parser.add_argument('--profile', action='store_true',
+                        help='Після команди вивести час звітів і SQL-запитів, рядки, очікування пулу і форматування')
+    parser.add_argument('--slow-ms', type=float,
+                        help='Поріг повільного запиту в мілісекундах, типово 100 (для --profile)')
+    parser.add_argument('--explain', action='store_true',
+                        help='Вивести EXPLAIN (ANALYZE, BUFFERS) для запитів, повільніших за --slow-ms (для --profile)')
+    parser.add_argument('--metrics-file',
+                        help='Записати метрики профілю у текстовому форматі Prometheus (для --profile)')
+    
+    return parser
+
+def run_command(argv=None, interactive=True):
+    """Розбирає аргументи і виконує команду; interactive=False - виклик через сервер, без stdin"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    validate_args(parser, args, interactive)
+    
+    if args.action == 'shell':
+        run_shell(run_command)
+        return
+    
+    if args.action == 'serve':
+        serve(run_command, args.socket)
+        return
+    
+    if not args.profile:
+        dispatch(parser, args)
+        return
+    
+    from utils.profiling import DEFAULT_SLOW_MS, profile_session, profiler
+    
+    slow_ms = DEFAULT_SLOW_MS if args.slow_ms is None else args.slow_ms
+    with profile_session(slow_ms, args.explain, args.metrics_file):
+        # Звіти відкривають власні вкладені прогони (report N); зовнішній - уся команда
+        with profiler.run(f"-a {args.action}"):
+            dispatch(parser, args)
 
-   
+def dispatch(parser, args):
+    import commands
+    
     if args.action == 'report':
-        reports_main()  
-        return    
+        if args.report is not None:
+            _, _, params = commands.REPORTS[args.report]
+            defaults = commands.PARAM_DEFAULTS
+            missing = [param for param in params if getattr(args, param) is None and param not in defaults]
+            if missing:
+                parser.error(f"Звіт {args.report} потребує аргументів: {', '.join('--' + p for p in missing)}")
+            param_values = [
+                defaults[param]() if getattr(args, param) is None else getattr(args, param) for param in params
+            ]
+            commands.run_single_report(args.report, param_values, args.stats, args.format or 'table', args.engine)
+        elif args.batch:
+            commands.run_batch(args.batch, args.out, args.format or 'csv', args.stats, args.verify)
+        else:
+            commands.reports_main(use_stats=args.stats, fmt=args.format or 'table', engine=args.engine)  
     
-    if args.action in ['update', 'remove'] and args.id is None:
-        parser.error(f"Операція {args.action} потребує аргументу --id")
+    elif args.action == 'refresh-stats':
+        commands.refresh_stats()
     
-    if args.action == 'create':
-        # Видалення None значень та службових аргументів
-        kwargs = {k: v for k, v in vars(args).items() 
-                if v is not None and k not in ['action', 'model', 'id']}
-        
-        # Перевірка наявності необхідних аргументів для створення запису
-        if args.model == 'Student':
-            required_fields = ['first_name', 'last_name', 'email', 'phone', 'group_id']
-            missing_fields = [field for field in required_fields if field not in kwargs]
-            if missing_fields:
-                parser.error(f"Для створення Student потрібні аргументи: {', '.join(['--' + f for f in missing_fields])}")
-        elif args.model == 'Group' and 'name' not in kwargs:
-            parser.error("Для створення Group потрібен аргумент --name")
-        elif args.model == 'Teacher':
-            required_fields = ['first_name', 'last_name', 'email', 'phone']
-            missing_fields = [field for field in required_fields if field not in kwargs]
-            if missing_fields:
-                parser.error(f"Для створення Teacher потрібні аргументи: {', '.join(['--' + f for f in missing_fields])}")
-        elif args.model == 'Subject' and ('name' not in kwargs or 'teacher_id' not in kwargs):
-            parser.error("Для створення Subject потрібні аргументи --name та --teacher_id")
-        elif args.model == 'Grade':
-            required_fields = ['student_id', 'subject_id', 'grade', 'date_received']
-            missing_fields = [field for field in required_fields if field not in kwargs]
-            if missing_fields:
-                parser.error(f"Для створення Grade потрібні аргументи: {', '.join(['--' + f for f in missing_fields])}")
+    elif args.action == 'check-stats':
+        commands.check_stats()
     
-        
-        create_record(args.model, **kwargs)
+    elif args.action == 'leaderboard':
+        commands.show_leaderboard(args.subject_id, args.top or commands.DEFAULT_TOP, args.ties, args.rebuild,
+                                  args.format or 'table')
+    
+    elif args.action == 'snapshot':
+        commands.run_snapshot(args.out, args.chunk_size, args.compression)
+    
+    elif args.action == 'import':
+        commands.run_import(args.model, args.file, args.chunk_size or commands.DEFAULT_CHUNK_SIZE, args.errors)
+    
+    elif args.action == 'create':
+        commands.create_record(args.model, **model_fields(args))
     
     elif args.action == 'list':
-        list_records(args.model)
+        commands.list_records(args.model, args.format or 'table', args.after_id, args.limit, args.page_size,
+                              args.related)
     
     elif args.action == 'update':
-        # Видалення None значень та службових аргументів
-        kwargs = {k: v for k, v in vars(args).items() 
-                if v is not None and k not in ['action', 'model', 'id']}
-        
-        if not kwargs:
-            parser.error("Для операції update потрібно вказати хоча б один параметр для оновлення")
-        
-        update_record(args.model, args.id, **kwargs)
+        if args.ids is not None or args.where:
+            commands.bulk_update(args.model, model_fields(args), args.ids, args.where, args.dry_run)
+        else:
+            commands.update_record(args.model, args.id, **model_fields(args))
     
     elif args.action == 'remove':
-        remove_record(args.model, args.id)
+        if args.ids is not None or args.where:
+            commands.bulk_remove(args.model, args.ids, args.where, args.dry_run)
+        else:
+            commands.remove_record(args.model, args.id)
+
+def main():
+    run_command()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
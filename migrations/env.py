@@ -1,3 +1,4 @@
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -31,6 +32,20 @@ target_metadata = Base.metadata
 # ADDED
 config.set_main_option('sqlalchemy.url', URI)
 
+# ADDED
+# Monthly partitions of grades are created by the partitioning migration and
+# partitions.py, not by the models, so autogenerate must not try to drop them
+PARTITION_PATTERN = re.compile(r"^grades_(y\d{4}m\d{2}|default)$")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and PARTITION_PATTERN.match(name):
+        return False
+    if type_ == "index" and PARTITION_PATTERN.match(object.table.name):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -49,6 +64,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -70,7 +86,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,124 @@
+"""partition grades by month
+
+Revision ID: 3bd9b5ad32c2
+Revises: ebc46e91501b
+Create Date: 2026-10-18 17:56:57.176677
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3bd9b5ad32c2'
+down_revision: Union[str, None] = 'ebc46e91501b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same statement-level triggers as ebc46e91501b; PostgreSQL allows transition tables
+# on a partitioned parent, and the tables contain rows from every partition.
+TRIGGERS = {
+    "grades_stats_insert": "AFTER INSERT ON grades REFERENCING NEW TABLE AS new_grades",
+    "grades_stats_update": "AFTER UPDATE ON grades REFERENCING OLD TABLE AS old_grades NEW TABLE AS new_grades",
+    "grades_stats_delete": "AFTER DELETE ON grades REFERENCING OLD TABLE AS old_grades",
+}
+
+GRADE_COLUMNS = "id, student_id, subject_id, grade, date_received"
+
+# One partition per month from the oldest grade up to three months ahead;
+# partitions.py keeps creating future months after that.
+CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    month date;
+    last_month date := (date_trunc('month', now()) + interval '3 months')::date;
+BEGIN
+    SELECT date_trunc('month', coalesce(min(date_received), now()))::date INTO month FROM grades_unpartitioned;
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF grades FOR VALUES FROM (%L) TO (%L)',
+            'grades_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+            month, (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+END
+$$
+"""
+
+
+def create_grade_indexes():
+    op.create_index('ix_grades_student_subject', 'grades', ['student_id', 'subject_id'], unique=False)
+    op.create_index('ix_grades_subject_date', 'grades', ['subject_id', 'date_received'], unique=False)
+    op.create_index('ix_grades_subject_student', 'grades', ['subject_id', 'student_id'], unique=False, postgresql_include=['grade'])
+
+
+def create_triggers():
+    for name, timing in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {timing} FOR EACH STATEMENT EXECUTE FUNCTION grade_stats_apply()")
+
+
+def rename_old_table(new_name):
+    # The old table goes away at the end; free the names the new table needs.
+    # grade_stats already matches its rows, so its triggers are dropped before the copy.
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON grades")
+    op.drop_index('ix_grades_subject_student', table_name='grades')
+    op.drop_index('ix_grades_subject_date', table_name='grades')
+    op.drop_index('ix_grades_student_subject', table_name='grades')
+    op.rename_table('grades', new_name)
+    op.execute(f"ALTER TABLE {new_name} RENAME CONSTRAINT grades_pkey TO {new_name}_pkey")
+
+
+def grade_columns():
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('grades_id_seq'::regclass)"), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('subject_id', sa.Integer(), nullable=False),
+        sa.Column('grade', sa.Integer(), nullable=False),
+        sa.Column('date_received', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ondelete='CASCADE'),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rename_old_table('grades_unpartitioned')
+    op.create_table(
+        'grades',
+        *grade_columns(),
+        sa.PrimaryKeyConstraint('id', 'date_received'),
+        postgresql_partition_by='RANGE (date_received)',
+    )
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+    # Rows outside the monthly partitions land here until partitions.py creates their month
+    op.execute("CREATE TABLE grades_default PARTITION OF grades DEFAULT")
+
+    op.execute(f"INSERT INTO grades ({GRADE_COLUMNS}) SELECT {GRADE_COLUMNS} FROM grades_unpartitioned")
+    # The sequence is owned by the old id column and would be dropped with it
+    op.execute("ALTER SEQUENCE grades_id_seq OWNED BY grades.id")
+    op.drop_table('grades_unpartitioned')
+
+    create_grade_indexes()
+    create_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    rename_old_table('grades_partitioned')
+    op.create_table(
+        'grades',
+        *grade_columns(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute(f"INSERT INTO grades ({GRADE_COLUMNS}) SELECT {GRADE_COLUMNS} FROM grades_partitioned")
+    op.execute("ALTER SEQUENCE grades_id_seq OWNED BY grades.id")
+    # Dropping the partitioned parent drops all of its partitions
+    op.drop_table('grades_partitioned')
+
+    create_grade_indexes()
+    create_triggers()
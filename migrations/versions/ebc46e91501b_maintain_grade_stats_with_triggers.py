@@ -0,0 +1,84 @@
+"""Maintain grade_stats with triggers
+
+Revision ID: ebc46e91501b
+Revises: 9932686ce64a
+Create Date: 2026-10-18 17:37:10.327848
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ebc46e91501b'
+down_revision: Union[str, None] = '9932686ce64a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Statement-level triggers with transition tables: one multi-row INSERT/UPDATE/DELETE
+# (COPY, bulk import, ON DELETE CASCADE) updates grade_stats with one set-based statement.
+APPLY_FUNCTION = """
+CREATE FUNCTION grade_stats_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE grade_stats gs
+        SET grade_count = gs.grade_count - d.grade_count,
+            grade_sum = gs.grade_sum - d.grade_sum
+        FROM (
+            SELECT student_id, subject_id, count(*) AS grade_count, sum(grade) AS grade_sum
+            FROM old_grades
+            GROUP BY student_id, subject_id
+        ) d
+        WHERE gs.student_id = d.student_id AND gs.subject_id = d.subject_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO grade_stats (student_id, subject_id, grade_count, grade_sum)
+        SELECT student_id, subject_id, count(*), sum(grade)
+        FROM new_grades
+        GROUP BY student_id, subject_id
+        ON CONFLICT (student_id, subject_id) DO UPDATE
+        SET grade_count = grade_stats.grade_count + EXCLUDED.grade_count,
+            grade_sum = grade_stats.grade_sum + EXCLUDED.grade_sum;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM grade_stats gs
+        USING (SELECT DISTINCT student_id, subject_id FROM old_grades) o
+        WHERE gs.student_id = o.student_id AND gs.subject_id = o.subject_id AND gs.grade_count <= 0;
+    END IF;
+
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = {
+    "grades_stats_insert": "AFTER INSERT ON grades REFERENCING NEW TABLE AS new_grades",
+    "grades_stats_update": "AFTER UPDATE ON grades REFERENCING OLD TABLE AS old_grades NEW TABLE AS new_grades",
+    "grades_stats_delete": "AFTER DELETE ON grades REFERENCING OLD TABLE AS old_grades",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(APPLY_FUNCTION)
+    for name, timing in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {timing} FOR EACH STATEMENT EXECUTE FUNCTION grade_stats_apply()")
+
+    # Writes made between the previous migration and now were not tracked, so resync once
+    op.execute("DELETE FROM grade_stats")
+    op.execute(
+        "INSERT INTO grade_stats (student_id, subject_id, grade_count, grade_sum) "
+        "SELECT student_id, subject_id, count(*), sum(grade) FROM grades GROUP BY student_id, subject_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON grades")
+    op.execute("DROP FUNCTION grade_stats_apply()")
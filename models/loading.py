@@ -0,0 +1,30 @@
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from models.models import Grade, Group, Student, Subject, Teacher
+
+# Стратегії завантаження зв'язків для кожного сценарію. Усі relationship у
+# моделях ліниві (select): прохід по зв'язку для списку записів - це окремий
+# запит на кожен рядок (N+1). Тому сценарій, що читає зв'язки, явно називає їх:
+#   - many-to-one (Student.group, Subject.teacher, Grade.student, Grade.subject) -
+#     joinedload, той самий запит з LEFT JOIN;
+#   - one-to-many (Teacher.subjects, Group.students) - selectinload, один
+#     додатковий запит WHERE ... IN на всю пачку батьківських записів;
+#   - решта зв'язків - raiseload: випадкове звернення до них - помилка, а не
+#     тихий запит.
+
+# Запис з назвами пов'язаних записів (remove, get_table_data(related=True)).
+# Group.students і Teacher.subjects ORM однаково читає при видаленні, щоб обнулити
+# зовнішні ключі дочірніх записів; Student.grades і Subject.grades не читаються
+# (passive_deletes - оцінки видаляє база)
+RECORD_OPTIONS = {
+    'Student': [joinedload(Student.group)],
+    'Group': [selectinload(Group.students)],
+    'Teacher': [selectinload(Teacher.subjects)],
+    'Subject': [joinedload(Subject.teacher)],
+    'Grade': [joinedload(Grade.student), joinedload(Grade.subject)],
+}
+
+
+def record_options(model_name):
+    """Опції запиту запису моделі: потрібні зв'язки заздалегідь, інші - raiseload"""
+    return [*RECORD_OPTIONS.get(model_name, []), raiseload("*")]
@@ -1,7 +1,7 @@
 import datetime
 from typing import List, Optional
 
-from sqlalchemy import ForeignKey, Integer, String, DateTime, func
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, PrimaryKeyConstraint, String, DateTime, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 
@@ -18,10 +18,11 @@ class Student(Base):
     last_name: Mapped[str] = mapped_column(String(100), nullable=False)
     email: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
     phone: Mapped[str | None] = mapped_column(String(20), nullable=True)
-    group_id: Mapped[Optional[int]] = mapped_column(ForeignKey("groups.id", ondelete="SET NULL"), nullable=False)
+    group_id: Mapped[Optional[int]] = mapped_column(ForeignKey("groups.id", ondelete="SET NULL"), nullable=False, index=True)
     
     group: Mapped["Group"] = relationship(back_populates="students")
-    grades: Mapped[List["Grade"]] = relationship(back_populates="student")
+    # Оцінки видаляє база (ON DELETE CASCADE), ORM не завантажує їх перед видаленням студента
+    grades: Mapped[List["Grade"]] = relationship(back_populates="student", cascade="all, delete-orphan", passive_deletes=True)
 
     @hybrid_property
     def full_name(self):
@@ -71,15 +72,29 @@ class Subject(Base):
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(250), nullable=False, unique=True)
-    teacher_id: Mapped[int] = mapped_column(ForeignKey("teachers.id", ondelete="SET NULL"), nullable=False)
+    teacher_id: Mapped[int] = mapped_column(ForeignKey("teachers.id", ondelete="SET NULL"), nullable=False, index=True)
     
     teacher: Mapped[Teacher] = relationship(back_populates="subjects")
-    grades: Mapped[List["Grade"]] = relationship(back_populates="subject", cascade="all, delete-orphan")
+    grades: Mapped[List["Grade"]] = relationship(back_populates="subject", cascade="all, delete-orphan", passive_deletes=True)
 
 class Grade(Base):
     __tablename__ = "grades"
+    __table_args__ = (
+        # select_2, select_3: оцінки з предмета по студентах, grade читається з індексу
+        Index("ix_grades_subject_student", "subject_id", "student_id", postgresql_include=["grade"]),
+        # select_9, select_10, select_11: оцінки конкретного студента
+        Index("ix_grades_student_subject", "student_id", "subject_id"),
+        # select_7, select_12: оцінки з предмета за датою
+        Index("ix_grades_subject_date", "subject_id", "date_received"),
+        # select_13, select_14, select_15: оцінки всіх предметів за період, без читання таблиці
+        Index("ix_grades_date_received", "date_received", postgresql_include=["student_id", "subject_id", "grade"]),
+        # Таблиця секціонована помісячно за date_received (секції створює partitions.py);
+        # первинний ключ секціонованої таблиці мусить містити ключ секціонування
+        PrimaryKeyConstraint("id", "date_received"),
+        {"postgresql_partition_by": "RANGE (date_received)"},
+    )
     
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, autoincrement=True)
     student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
     subject_id: Mapped[int] = mapped_column(ForeignKey("subjects.id", ondelete="CASCADE"), nullable=False)
     grade: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -87,3 +102,15 @@ class Grade(Base):
     
     student: Mapped[Student] = relationship(back_populates="grades")
     subject: Mapped[Subject] = relationship(back_populates="grades")
+
+    # Ідентичність об'єкта в ORM - лише id, як і до секціонування
+    __mapper_args__ = {"primary_key": [id]}
+
+class GradeStat(Base):
+    # Попередньо агреговані оцінки: кількість і сума для пари (студент, предмет)
+    __tablename__ = "grade_stats"
+
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    subject_id: Mapped[int] = mapped_column(ForeignKey("subjects.id", ondelete="CASCADE"), primary_key=True, index=True)
+    grade_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    grade_sum: Mapped[int] = mapped_column(BigInteger, nullable=False)
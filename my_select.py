@@ -1,293 +1,507 @@
-from tabulate import tabulate
-from sqlalchemy import select, func, desc
-from sqlalchemy.orm import Session, aliased
+import datetime
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+from sqlalchemy import Date, Numeric, and_, bindparam, cast, select, func, desc, literal, true, tuple_
+from sqlalchemy.orm import Session
 
 from models.models import Student, Grade, Teacher, Subject, Group
-from conf.db import SessionLocal
-from utils.print_table import print_table
+from conf.db import ReadSessionLocal
+from grade_stats import grade_source
+from utils.prepared import execute_statement
+
+# Рядки результатів звітів. Функції select_N лише виконують запит і повертають
+# список таких рядків; форматування і вивід - у report_views та utils.render.
+
+class StudentAverage(NamedTuple):
+    full_name: str
+    avg_grade: Decimal
+
+class SubjectBestStudent(NamedTuple):
+    full_name: str
+    subject_name: str
+    avg_grade: Decimal
+
+class GroupAverage(NamedTuple):
+    group_name: str
+    subject_name: str
+    avg_grade: Decimal
+
+class OverallAverage(NamedTuple):
+    avg_grade: Optional[Decimal]
+
+class TeacherCourse(NamedTuple):
+    teacher_name: str
+    subject_name: str
+
+class GroupStudent(NamedTuple):
+    group_name: str
+    full_name: str
+
+class GroupGrade(NamedTuple):
+    full_name: str
+    grade: int
+    group_name: str
+    subject_name: str
+    date_received: datetime.datetime
+
+class TeacherAverage(NamedTuple):
+    teacher_name: str
+    avg_grade: Decimal
+
+# subject_name = None означає, що студент існує, але не має жодного курсу
+class StudentCourse(NamedTuple):
+    student_name: str
+    subject_name: Optional[str]
+
+# None у student_name / teacher_name означає, що студента / викладача не знайдено
+class StudentTeacherCourse(NamedTuple):
+    student_name: Optional[str]
+    teacher_name: Optional[str]
+    subject_name: Optional[str]
+
+class TeacherStudentAverage(NamedTuple):
+    teacher_first_name: str
+    teacher_last_name: str
+    student_first_name: str
+    student_last_name: str
+    avg_grade: Decimal
+
+class LastLessonGrade(NamedTuple):
+    group_name: str
+    subject_name: str
+    first_name: str
+    last_name: str
+    grade: int
+    date_received: datetime.datetime
+
+class StudentPeriodAverage(NamedTuple):
+    full_name: str
+    grade_count: int
+    avg_grade: Decimal
+
+class GroupPeriodAverage(NamedTuple):
+    group_name: str
+    grade_count: int
+    avg_grade: Decimal
+
+# change - різниця з попереднім тижнем, у якому були оцінки з предмета (None для першого)
+class SubjectWeekTrend(NamedTuple):
+    subject_name: str
+    week_start: datetime.datetime
+    grade_count: int
+    avg_grade: Decimal
+    change: Optional[Decimal]
+
+class SubjectRollingAverage(NamedTuple):
+    subject_name: str
+    day: datetime.datetime
+    grade_count: int
+    avg_grade: Decimal
+    rolling_avg: Decimal
+
+ROW_TYPES = {
+    1: StudentAverage, 2: SubjectBestStudent, 3: GroupAverage, 4: OverallAverage,
+    5: TeacherCourse, 6: GroupStudent, 7: GroupGrade, 8: TeacherAverage,
+    9: StudentCourse, 10: StudentTeacherCourse, 11: TeacherStudentAverage, 12: LastLessonGrade,
+    13: StudentPeriodAverage, 14: GroupPeriodAverage, 15: SubjectWeekTrend, 16: SubjectRollingAverage,
+}
+
+# Порядок рядків кожного звіту повний (з розв'язанням нічиїх за id), тож повторні
+# виклики і пакетний режим report_batch дають однакові рядки в однаковому порядку.
+
+# Побудова запитів звітів винесена в query_N, щоб той самий запит виконували
+# синхронні select_N нижче та асинхронні версії в async_reports. Для звітів 1-12
+# запити будуються один раз (REPORT_STATEMENTS), а select_N лише передає значення.
 
 # 1. Знайти 5 студентів із найбільшим середнім балом з усіх предметів
-def select_1(session: Session):
-    query = (
-        select(Student, func.avg(Grade.grade).label("avg_grade"))
-        .join(Grade)
+def query_1(use_stats: bool = False):
+    grades, avg_grade = grade_source(use_stats)
+    return (
+        select(Student.full_name, avg_grade)
+        .join(grades, grades.student_id == Student.id)
         .group_by(Student.id)
-        .order_by(desc("avg_grade"))
+        .order_by(desc("avg_grade"), Student.id)
         .limit(5)
     )
-    results = session.execute(query).all()
-    
-    formatted_results = [(idx + 1, student.full_name, f"{avg_grade:.2f}") for idx, (student, avg_grade) in enumerate(results)]
-    print("1. 5 студентів із найбільшим середнім балом з усіх предметів:")
-    print_table(formatted_results, ["#", "Full Name", "Average Grade"])
+
+def select_1(session: Session, use_stats: bool = False):
+    return [StudentAverage._make(row) for row in execute_report(session, 1, use_stats)]
 
 # 2. Знайти студента із найвищим середнім балом з певного предмета
-def select_2(session: Session, subject_id: int):
-    query = (
-        select(Student, Subject.name, func.avg(Grade.grade).label("avg_grade"))
-        .join(Grade, Student.id == Grade.student_id) 
-        .join(Subject, Subject.id == Grade.subject_id) 
+def query_2(subject_id: int, use_stats: bool = False):
+    grades, avg_grade = grade_source(use_stats)
+    return (
+        select(Student.full_name, Subject.name, avg_grade)
+        .join(grades, Student.id == grades.student_id)
+        .join(Subject, Subject.id == grades.subject_id)
         .filter(Subject.id == subject_id)
         .group_by(Student.id, Subject.name)
-        .order_by(desc("avg_grade"))
+        .order_by(desc("avg_grade"), Student.id)
         .limit(1)
     )
-    result = session.execute(query).one_or_none()
-    if not result:
-        print("Немає даних для вказаного предмета.")
-        return    
-    
-    student, subject_name, avg_grade = result        
-        
-    print(f"2. Cтудент {student.full_name} має найвищий середній бал з предмета {subject_name}: {avg_grade: .2f} балів")
+
+def select_2(session: Session, subject_id: int, use_stats: bool = False):
+    return [SubjectBestStudent._make(row) for row in execute_report(session, 2, use_stats, subject_id=subject_id)]
 
 # 3. Знайти середній бал у групах з певного предмета
-def select_3(session: Session, subject_id: int):
-    query = (
-        select(Group.name, Subject.name, func.avg(Grade.grade).label("avg_grade"))
-        .join(Student, Student.group_id == Group.id)  
-        .join(Grade, Grade.student_id == Student.id)  
-        .join(Subject, Subject.id == Grade.subject_id)  
+def query_3(subject_id: int, use_stats: bool = False):
+    grades, avg_grade = grade_source(use_stats)
+    return (
+        select(Group.name, Subject.name, avg_grade)
+        .join(Student, Student.group_id == Group.id)
+        .join(grades, grades.student_id == Student.id)
+        .join(Subject, Subject.id == grades.subject_id)
         .filter(Subject.id == subject_id)
         .group_by(Group.name, Subject.name)
-        .order_by(desc("avg_grade"))
+        .order_by(desc("avg_grade"), Group.name)
     )
-    
-    results = session.execute(query).all()
-    if not results:
-        print("Немає даних для вказаного предмета.")
-        return
-    
-    formatted_results = [(group_name, f"{avg_grade:.2f}") for group_name, _, avg_grade in results]
-    
-    print(f"3. Середній бал у групах з предмета {results[0][1]}:")
-    print_table(formatted_results, ["Group Name", "Average Grade"])
+
+def select_3(session: Session, subject_id: int, use_stats: bool = False):
+    return [GroupAverage._make(row) for row in execute_report(session, 3, use_stats, subject_id=subject_id)]
 
 # 4. Знайти середній бал на потоці (по всій таблиці оцінок)
-def select_4(session: Session):
-    query = select(func.avg(Grade.grade).label("avg_grade"))
-    result = session.execute(query).scalar()
-    print(f"4. Середній бал на потоці (по всій таблиці оцінок): {result:.2f}")
+def query_4(use_stats: bool = False):
+    _, avg_grade = grade_source(use_stats)
+    return select(avg_grade)
+
+def select_4(session: Session, use_stats: bool = False):
+    return [OverallAverage(execute_report(session, 4, use_stats).scalar())]
 
 # 5. Знайти які курси читає певний викладач
-def select_5(session: Session, teacher_id: int):
-    query = (
+def query_5(teacher_id: int):
+    return (
         select(Teacher.full_name, Subject.name)
         .join(Subject, Subject.teacher_id == Teacher.id)
         .filter(Teacher.id == teacher_id)
+        .order_by(Subject.id)
     )
-    
-    results = session.execute(query).all()
-
-    if not results:
-        print("Немає даних для вказаного вчителя.")
-        return
-    
-    formatted_results = [(idx + 1, subject_name) for idx, (_, subject_name) in enumerate(results)]
-    
-    print(f"5. Викладач {results[0][0]} читає наступні курси:")
-    print_table(formatted_results, ["#", "Subject Name"])
+
+def select_5(session: Session, teacher_id: int):
+    return [TeacherCourse._make(row) for row in execute_report(session, 5, teacher_id=teacher_id)]
 
 # 6. Знайти список студентів у певній групі
-def select_6(session: Session, group_id: int):
-    query = (
+def query_6(group_id: int):
+    return (
         select(Group.name, Student.full_name)
         .join(Group)
         .filter(Student.group_id == group_id)
-        .order_by(Student.full_name.asc())
+        .order_by(Student.full_name.asc(), Student.id)
     )
 
-    results = session.execute(query).all()
-
-    if not results:
-        print("Немає даних для вказаної групи.")
-        return
-
-    formatted_results = [(idx + 1, student_name) for idx, (_, student_name) in enumerate(results)]
-    
-    print(f"6. Список студентів у групі {results[0][0]}:")
-    print_table(formatted_results, ["#", "Full Name"])
+def select_6(session: Session, group_id: int):
+    return [GroupStudent._make(row) for row in execute_report(session, 6, group_id=group_id)]
 
 # 7. Знайти оцінки студентів у окремій групі з певного предмета
-def select_7(session: Session, group_id: int, subject_id: int):
-    query = (
-        select(Student.full_name, Grade.grade, Group.name, Subject.name, Grade.date_received)  
-        .join(Group, Student.group_id == Group.id)  
-        .join(Grade, Grade.student_id == Student.id)  
-        .join(Subject, Grade.subject_id == Subject.id)  
-        .filter(Group.id == group_id, Subject.id == subject_id) 
-        .order_by(Grade.date_received.desc())  
+def query_7(group_id: int, subject_id: int):
+    return (
+        select(Student.full_name, Grade.grade, Group.name, Subject.name, Grade.date_received)
+        .join(Group, Student.group_id == Group.id)
+        .join(Grade, Grade.student_id == Student.id)
+        .join(Subject, Grade.subject_id == Subject.id)
+        .filter(Group.id == group_id, Subject.id == subject_id)
+        .order_by(Grade.date_received.desc(), Grade.id)
     )
-    results = session.execute(query).all()
-
-    if not results:
-        print("Немає даних для вказаних параметрів запиту.")
-        return
-    
-    formatted_results = [(idx + 1, student_name, grade, date_received.strftime("%d.%m.%Y")) 
-                         for idx, (student_name, grade, _, _, date_received) in enumerate(results)]
-    
-    print(f"7. Оцінки студентів у групі {results[0][2]} з предмета {results[0][3]}, відсортовані за датою виставлення оцінки:")
-    print_table(formatted_results, ["#", "Full Name", "Grade", "Date Received"])
+
+def select_7(session: Session, group_id: int, subject_id: int):
+    return [GroupGrade._make(row) for row in execute_report(session, 7, group_id=group_id, subject_id=subject_id)]
 
 # 8. Знайти середній бал, який ставить певний викладач зі своїх предметів.
-def select_8(session: Session, teacher_id: int):
-    query = (
+def query_8(teacher_id: int, use_stats: bool = False):
+    grades, avg_grade = grade_source(use_stats)
+    return (
         select(
             Teacher.full_name,
-            func.avg(Grade.grade).label("avg_grade")
+            avg_grade
         )
         .join(Subject, Subject.teacher_id == Teacher.id)
-        .join(Grade, Grade.subject_id == Subject.id)
+        .join(grades, grades.subject_id == Subject.id)
         .filter(Teacher.id == teacher_id)
-        .group_by(Teacher.full_name)
+        .group_by(Teacher.id)
     )
 
-    result = session.execute(query).first()
+def select_8(session: Session, teacher_id: int, use_stats: bool = False):
+    return [TeacherAverage._make(row) for row in execute_report(session, 8, use_stats, teacher_id=teacher_id)]
+
+# 9. Список курсів, які відвідує певний студент.
+# Один запит: студент без оцінок дає рядок (ім'я, NULL), неіснуючий студент - порожній результат
+def student_name_query(student_id: int):
+    return select(Student.full_name).filter(Student.id == student_id)
+
+def query_9(student_id: int):
+    return (
+        select(Student.full_name, Subject.name)
+        .distinct()
+        .outerjoin(Grade, Grade.student_id == Student.id)
+        .outerjoin(Subject, Subject.id == Grade.subject_id)
+        .filter(Student.id == student_id)
+        .order_by(Subject.name)
+    )
 
-    if not result:
-        print("Цей викладач ще не ставив оцінок.")
-        return
+def select_9(session: Session, student_id: int):
+    return [StudentCourse._make(row) for row in execute_report(session, 9, student_id=student_id)]
 
-    full_name, avg_grade = result
-    print(f"8. Середній бал, який ставить викладач {full_name}: {avg_grade:.2f}")
+# 10. Список курсів, які певному студенту читає певний викладач.
+# Один запит: імена студента і викладача - скалярні підзапити (NULL, якщо не знайдено),
+# курси приєднуються LEFT JOIN до рядка-якоря, тож результат завжди має хоча б один рядок
+def teacher_name_query(teacher_id: int):
+    return select(Teacher.full_name).filter(Teacher.id == teacher_id)
 
-# 9. Список курсів, які відвідує певний студент
-def select_9(session: Session, student_id: int):
-    
-    student = session.query(Student).filter(Student.id == student_id).one_or_none()
-    if student:        
-        query = (
-            select(Subject.name)
-            .distinct()  
-            .join(Grade, Grade.subject_id == Subject.id)  
-            .filter(Grade.student_id == student_id)  
-            .order_by(Subject.name)  
-        )
-       
-        results = session.execute(query).fetchall()
-       
-        formatted_results = [(index + 1, subject_name) for index, (subject_name,) in enumerate(results)]
-
-        print(f"9. Список курсів, які відвідує студент {student.full_name}:")
-        print_table(formatted_results, ["#", "Subject Name"])
-    else:
-        print(f"Студент з ID {student_id} не знайдений.")
-
-# 10. Список курсів, які певному студенту читає певний викладач
-def select_10(session: Session, student_id: int, teacher_id: int):    
-    
-    teacher = session.execute(select(Teacher.full_name).filter(Teacher.id == teacher_id)).scalar()
-    student = session.execute(select(Student.full_name).filter(Student.id == student_id)).scalar()
-    if not teacher:
-        print(f"Викладача з ID {teacher_id} не знайдено.")
-        return
-    if not student:
-        print(f"Студента з ID {student_id} не знайдено.")
-        return
-    query = (
+def teacher_courses_query(student_id: int, teacher_id: int):
+    return (
         select(Subject.name)
-        .distinct()  
-        .join(Teacher, Teacher.id == Subject.teacher_id) 
-        .join(Grade, Grade.subject_id == Subject.id)  
-        .join(Student, Student.id == Grade.student_id)  
-        .filter(Grade.student_id == student_id, Teacher.id == teacher_id)  
+        .distinct()
+        .join(Grade, Grade.subject_id == Subject.id)
+        .filter(Grade.student_id == student_id, Subject.teacher_id == teacher_id)
     )
 
-    results = session.execute(query).all()
-    
+def query_10(student_id: int, teacher_id: int):
+    anchor = select(literal(1).label("anchor")).subquery()
+    courses = teacher_courses_query(student_id, teacher_id).subquery()
+    return (
+        select(
+            student_name_query(student_id).scalar_subquery(),
+            teacher_name_query(teacher_id).scalar_subquery(),
+            courses.c.name,
+        )
+        .select_from(anchor)
+        .outerjoin(courses, true())
+        .order_by(courses.c.name)
+    )
 
-    if results:  
-        formatted_results = [
-            (index + 1, subject_name[0])
-            for index, subject_name in enumerate(results)
-        ]
-        print(f"10. Список курсів, які студенту {student} читає викладач {teacher}:")
-        print_table(formatted_results, ["#", "Subject Name"])
-    else:
-        print(f"Немає предметів, які викладає викладач {teacher} студенту {student}.")
+def select_10(session: Session, student_id: int, teacher_id: int):
+    return [StudentTeacherCourse._make(row) for row in execute_report(session, 10, student_id=student_id, teacher_id=teacher_id)]
 
 # 11. Середній бал, який певний викладач ставить певному студентові
-def select_11(session: Session, teacher_id: int, student_id: int):
-
-    query = (
+def query_11(teacher_id: int, student_id: int, use_stats: bool = False):
+    grades, avg_grade = grade_source(use_stats)
+    return (
         select(
             Teacher.first_name, Teacher.last_name,
             Student.first_name, Student.last_name,
-            func.avg(Grade.grade).label("avg_grade")
+            avg_grade
         )
         .join(Subject, Subject.teacher_id == Teacher.id)
-        .join(Grade, Grade.subject_id == Subject.id)
-        .join(Student, Student.id == Grade.student_id)
+        .join(grades, grades.subject_id == Subject.id)
+        .join(Student, Student.id == grades.student_id)
         .filter(Teacher.id == teacher_id, Student.id == student_id)
         .group_by(Teacher.id, Student.id)
     )
 
-    results = session.execute(query).all()
-
-    if not results:
-        print("Немає оцінок від цього викладача для цього студента.")
-        return
-
-    teacher_first, teacher_last, student_first, student_last, avg_grade = results[0]
+def select_11(session: Session, teacher_id: int, student_id: int, use_stats: bool = False):
+    return [TeacherStudentAverage._make(row) for row in execute_report(session, 11, use_stats, teacher_id=teacher_id, student_id=student_id)]
 
-    print(f"11. Середній бал, який {teacher_first} {teacher_last} поставив студенту {student_first} {student_last}: {avg_grade:.2f}")
+# 12. Оцінки студентів у певній групі з певного предмета на останньому занятті.
+# Останнє заняття визначає rank() у межах (група, предмет), тож звіт - один запит
+# і для однієї пари, і для багатьох пар одразу (select_12_many, report_batch).
+def last_lesson_query(pairs=None):
+    """Оцінки останнього заняття: group_id, subject_id, потім поля LastLessonGrade.
 
-# 12. Оцінки студентів у певній групі з певного предмета на останньому занятті
-def select_12(session: Session, group_id: int, subject_id: int):
-    last_lesson_date_query = (
-        select(func.max(Grade.date_received))
+    pairs - None (всі групи і предмети) або список пар (group_id, subject_id).
+    """
+    grades = (
+        select(
+            Student.group_id,
+            Grade.subject_id,
+            Grade.id.label("grade_id"),
+            Student.first_name,
+            Student.last_name,
+            Grade.grade,
+            Grade.date_received,
+            func.rank().over(
+                partition_by=(Student.group_id, Grade.subject_id),
+                order_by=Grade.date_received.desc(),
+            ).label("lesson_rank"),
+        )
         .join(Student, Student.id == Grade.student_id)
-        .filter(Student.group_id == group_id, Grade.subject_id == subject_id)
+    )
+    if pairs is not None and len(pairs) == 1:
+        # Для однієї пари - прості рівності, щоб планувальник використав індекси
+        (group_id, subject_id), = pairs
+        grades = grades.filter(Student.group_id == group_id, Grade.subject_id == subject_id)
+    elif pairs is not None:
+        grades = grades.filter(tuple_(Student.group_id, Grade.subject_id).in_(pairs))
+    ranked = grades.subquery()
+    return (
+        select(
+            ranked.c.group_id, ranked.c.subject_id,
+            Group.name, Subject.name, ranked.c.first_name, ranked.c.last_name, ranked.c.grade, ranked.c.date_received,
+        )
+        .join(Group, Group.id == ranked.c.group_id)
+        .join(Subject, Subject.id == ranked.c.subject_id)
+        .filter(ranked.c.lesson_rank == 1)
+        .order_by(ranked.c.group_id, ranked.c.subject_id, ranked.c.grade_id)
     )
 
-    last_lesson_date = session.execute(last_lesson_date_query).scalar()
+def select_12(session: Session, group_id: int, subject_id: int):
+    return [LastLessonGrade._make(row[2:]) for row in execute_report(session, 12, group_id=group_id, subject_id=subject_id)]
+
+def select_12_many(session: Session, pairs):
+    """select_12 для багатьох пар (group_id, subject_id) одним запитом: {пара: рядки}"""
+    pairs = list(pairs)
+    result = {pair: [] for pair in pairs}
+    if not pairs:
+        return result
+    for row in session.execute(last_lesson_query(pairs)):
+        result[(row[0], row[1])].append(LastLessonGrade._make(row[2:]))
+    return result
+
+# Запити звітів 1-12, побудовані один раз з bindparam замість значень параметрів.
+# select_N не перебудовує конструкцію select(...).join(...): ключ кешу SQLAlchemy
+# для готового об'єкта обчислюється один раз, скомпільований SQL береться з кешу
+# рушія, а з DB_PREPARE_STATEMENTS запит ще й готується на сервері (utils/prepared).
+# Ключ - (номер звіту, use_stats).
+def build_report_statements():
+    subject_id, teacher_id = bindparam("subject_id"), bindparam("teacher_id")
+    group_id, student_id = bindparam("group_id"), bindparam("student_id")
+    statements = {
+        (5, False): query_5(teacher_id),
+        (6, False): query_6(group_id),
+        (7, False): query_7(group_id, subject_id),
+        (9, False): query_9(student_id),
+        (10, False): query_10(student_id, teacher_id),
+        (12, False): last_lesson_query([(group_id, subject_id)]),
+    }
+    for use_stats in (False, True):
+        statements.update({
+            (1, use_stats): query_1(use_stats),
+            (2, use_stats): query_2(subject_id, use_stats),
+            (3, use_stats): query_3(subject_id, use_stats),
+            (4, use_stats): query_4(use_stats),
+            (8, use_stats): query_8(teacher_id, use_stats),
+            (11, use_stats): query_11(teacher_id, student_id, use_stats),
+        })
+    return statements
+
+REPORT_STATEMENTS = build_report_statements()
+
+def execute_report(session: Session, report_num: int, use_stats: bool = False, **params):
+    name = f"report_{report_num}_stats" if use_stats else f"report_{report_num}"
+    return execute_statement(session, name, REPORT_STATEMENTS[report_num, use_stats], params)
+
+# Звіти за період [since, until] (дати, обидві межі включно). Агрегація і вікна
+# рахуються в базі одним запитом; умова на date_received дає відсікання місячних
+# секцій grades і читання індексів ix_grades_date_received / ix_grades_subject_date.
+
+# Ширина вікна ковзного середнього звіту 16, днів
+ROLLING_WINDOW_DAYS = 7
+
+def period_filter(since: datetime.date, until: datetime.date):
+    return and_(Grade.date_received >= since, Grade.date_received < until + datetime.timedelta(days=1))
+
+# 13. Середній бал кожного студента за період
+def query_13(since: datetime.date, until: datetime.date):
+    return (
+        select(Student.full_name, func.count().label("grade_count"), func.avg(Grade.grade).label("avg_grade"))
+        .join(Grade, Grade.student_id == Student.id)
+        .filter(period_filter(since, until))
+        .group_by(Student.id)
+        .order_by(desc("avg_grade"), Student.id)
+    )
 
-    if not last_lesson_date:
-        print("Немає оцінок для цієї групи з цього предмета.")
-        return
+def select_13(session: Session, since: datetime.date, until: datetime.date):
+    return [StudentPeriodAverage._make(row) for row in session.execute(query_13(since, until))]
 
-    query = (
-        select(
-            Group.name, Subject.name, Student.first_name, Student.last_name, Grade.grade
-        )
+# 14. Середній бал кожної групи за період
+def query_14(since: datetime.date, until: datetime.date):
+    return (
+        select(Group.name, func.count().label("grade_count"), func.avg(Grade.grade).label("avg_grade"))
         .join(Student, Student.group_id == Group.id)
         .join(Grade, Grade.student_id == Student.id)
-        .join(Subject, Subject.id == Grade.subject_id)
-        .filter(Group.id == group_id, Subject.id == subject_id, Grade.date_received == last_lesson_date)
-        .order_by(desc(Grade.date_received))
+        .filter(period_filter(since, until))
+        .group_by(Group.id)
+        .order_by(desc("avg_grade"), Group.id)
     )
 
-    results = session.execute(query).all()
+def select_14(session: Session, since: datetime.date, until: datetime.date):
+    return [GroupPeriodAverage._make(row) for row in session.execute(query_14(since, until))]
 
-    if not results:
-        print("Немає оцінок для цієї групи з цього предмета.")
-        return
+# 15. Тижнева динаміка середнього балу для кожного предмета: date_trunc('week')
+# групує оцінки по тижнях, lag() порівнює тиждень з попереднім того ж предмета
+def query_15(since: datetime.date, until: datetime.date):
+    weeks = (
+        select(
+            Grade.subject_id,
+            func.date_trunc("week", Grade.date_received).label("week_start"),
+            func.count().label("grade_count"),
+            func.avg(Grade.grade).label("avg_grade"),
+        )
+        .filter(period_filter(since, until))
+        .group_by(Grade.subject_id, "week_start")
+        .subquery()
+    )
+    previous = func.lag(weeks.c.avg_grade).over(partition_by=weeks.c.subject_id, order_by=weeks.c.week_start)
+    return (
+        select(Subject.name, weeks.c.week_start, weeks.c.grade_count, weeks.c.avg_grade, weeks.c.avg_grade - previous)
+        .join(Subject, Subject.id == weeks.c.subject_id)
+        .order_by(weeks.c.subject_id, weeks.c.week_start)
+    )
 
-    group_name, subject_name = results[0][:2]  
-    formatted_date = last_lesson_date.strftime("%d.%m.%Y")
-    formatted_results = [
-        (idx + 1, f"{first_name} {last_name}", grade)
-        for idx, (_, _, first_name, last_name, grade) in enumerate(results)
-    ]
+def select_15(session: Session, since: datetime.date, until: datetime.date):
+    return [SubjectWeekTrend._make(row) for row in session.execute(query_15(since, until))]
 
-    print(f"12. Оцінки студентів групи {group_name} з предмета {subject_name} на останньому занятті ({formatted_date}):")
-    print_table(formatted_results, ["#", "Student Name", "Grade"])
+# 16. Денний середній бал з предмета і ковзне середнє за ROLLING_WINDOW_DAYS днів.
+# Вікно - календарні дні (RANGE по номеру дня), а не рядки, тож дні без оцінок
+# не розтягують його. Ковзне середнє зважене кількістю оцінок: sum / count у вікні.
+# Оцінки читаються з since - (вікно - 1) днів, щоб перші дні періоду мали повне вікно.
+def query_16(subject_id: int, since: datetime.date, until: datetime.date):
+    window_start = since - datetime.timedelta(days=ROLLING_WINDOW_DAYS - 1)
+    days = (
+        select(
+            Grade.subject_id,
+            func.date_trunc("day", Grade.date_received).label("day"),
+            func.count().label("grade_count"),
+            func.sum(Grade.grade).label("grade_sum"),
+        )
+        .filter(Grade.subject_id == subject_id, period_filter(window_start, until))
+        .group_by(Grade.subject_id, "day")
+        .subquery()
+    )
+    window = {
+        "order_by": cast(days.c.day, Date) - cast(literal(window_start), Date),
+        "range_": (-(ROLLING_WINDOW_DAYS - 1), 0),
+    }
+    rolling = (
+        select(
+            days.c.subject_id,
+            days.c.day,
+            days.c.grade_count,
+            (cast(days.c.grade_sum, Numeric) / days.c.grade_count).label("avg_grade"),
+            (cast(func.sum(days.c.grade_sum).over(**window), Numeric) / func.sum(days.c.grade_count).over(**window))
+            .label("rolling_avg"),
+        )
+        .subquery()
+    )
+    return (
+        select(Subject.name, rolling.c.day, rolling.c.grade_count, rolling.c.avg_grade, rolling.c.rolling_avg)
+        .join(Subject, Subject.id == rolling.c.subject_id)
+        .filter(rolling.c.day >= since)
+        .order_by(rolling.c.day)
+    )
 
+def select_16(session: Session, subject_id: int, since: datetime.date, until: datetime.date):
+    return [SubjectRollingAverage._make(row) for row in session.execute(query_16(subject_id, since, until))]
 
 if __name__ == "__main__":
-    session: Session = SessionLocal()
-
-    select_1(session)
-    select_2(session, 26)
-    select_3(session, 21)
-    select_4(session)
-    select_5(session, 8)
-    select_6(session, 16)
-    select_7(session, 16, 21)
-    select_8(session, 10)
-    select_9(session, 141)
-    select_10(session, 121, 9)
-    select_11(session, 9, 121)
-    select_12(session, 18, 29)
-    
\ No newline at end of file
+    from report_views import show_report
+
+    session: Session = ReadSessionLocal()
+
+    show_report(1, select_1(session))
+    show_report(2, select_2(session, 26), 26)
+    show_report(3, select_3(session, 21), 21)
+    show_report(4, select_4(session))
+    show_report(5, select_5(session, 8), 8)
+    show_report(6, select_6(session, 16), 16)
+    show_report(7, select_7(session, 16, 21), 16, 21)
+    show_report(8, select_8(session, 10), 10)
+    show_report(9, select_9(session, 141), 141)
+    show_report(10, select_10(session, 121, 9), 121, 9)
+    show_report(11, select_11(session, 9, 121), 9, 121)
+    show_report(12, select_12(session, 18, 29), 18, 29)
+    until = datetime.date.today()
+    since = until - datetime.timedelta(days=30)
+    show_report(13, select_13(session, since, until), since, until)
+    show_report(14, select_14(session, since, until), since, until)
+    show_report(15, select_15(session, since, until), since, until)
+    show_report(16, select_16(session, 1, since, until), 1, since, until)
@@ -0,0 +1,191 @@
+"""Обслуговування місячних секцій таблиці grades (RANGE по date_received).
+
+Запуск з кореня репозиторію:
+
+    python partitions.py --list
+    python partitions.py --ahead 3
+    python partitions.py --detach-before 2025-01 [--drop]
+
+--ahead створює секції від --from (або поточного місяця) до поточного місяця
+плюс N місяців наперед. Рядки, які до цього потрапили в grades_default,
+переносяться у нову секцію.
+
+--detach-before від'єднує секції, що повністю лежать раніше за вказаний місяць,
+і переносить їх у схему archive (або видаляє з --drop). Від'єднання не запускає
+тригери grades, тому grade_stats після нього перебудовується.
+
+Скрипт працює окремим процесом, тож кеш звітів запущених main.py -a shell /
+-a serve (звіти, колонковий знімок, таблиці лідерів) він не бачить: там
+результати лишаються старими, доки не мине REPORT_CACHE_TTL.
+"""
+import argparse
+import re
+from datetime import date
+
+from sqlalchemy import Connection, text
+from sqlalchemy.orm import Session
+
+from grade_stats import refresh_grade_stats
+from utils.print_table import print_table
+
+PARENT_TABLE = "grades"
+DEFAULT_PARTITION = "grades_default"
+ARCHIVE_SCHEMA = "archive"
+DEFAULT_MONTHS_AHEAD = 3
+PARTITION_PATTERN = re.compile(r"^grades_y(\d{4})m(\d{2})$")
+
+
+def month_start(day: date):
+    return day.replace(day=1)
+
+
+def add_months(month: date, count: int):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date):
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str):
+    """Місяць секції за її назвою; None для grades_default та чужих таблиць"""
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def list_partitions(conn: Connection):
+    """Секції grades: [(назва, межі секції)] у порядку назв"""
+    return conn.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+        ORDER BY child.relname
+    """), {"parent": PARENT_TABLE}).all()
+
+
+def create_partition(conn: Connection, month: date):
+    """Створює секцію місяця, переносячи в неї відповідні рядки з grades_default.
+
+    CREATE TABLE ... PARTITION OF відмовляє, якщо default-секція вже містить рядки
+    з нового діапазону, тому секція створюється окремою таблицею, рядки
+    переносяться в неї, а потім вона приєднується через ATTACH PARTITION.
+    Перенесення йде повз батьківську таблицю, тож тригери grade_stats не спрацьовують
+    і агрегати лишаються правильними.
+    """
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION}
+            WHERE date_received >= :start AND date_received < :end
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), bounds).rowcount
+    conn.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+    return moved
+
+
+def ensure_partitions(conn: Connection, start: date = None, months_ahead: int = DEFAULT_MONTHS_AHEAD):
+    """Створює відсутні секції від start (за замовчуванням - поточний місяць) до
+    поточного місяця + months_ahead. Повертає [(назва, перенесено рядків з default)]"""
+    existing = {name for name, _ in list_partitions(conn)}
+    current = month_start(date.today())
+    month = month_start(start or current)
+    last = add_months(current, months_ahead)
+    created = []
+    while month <= last:
+        if partition_name(month) not in existing:
+            created.append((partition_name(month), create_partition(conn, month)))
+        month = add_months(month, 1)
+    return created
+
+
+def detach_before(conn: Connection, before: date, drop: bool = False):
+    """Від'єднує секції, старші за місяць before: переносить у схему archive або видаляє.
+
+    DETACH PARTITION бере ACCESS EXCLUSIVE блокування grades до кінця транзакції.
+    Повертає назви від'єднаних секцій.
+    """
+    detached = [
+        name for name, _ in list_partitions(conn)
+        if partition_month(name) is not None and partition_month(name) < month_start(before)
+    ]
+    if not detached:
+        return detached
+    if not drop:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+    for name in detached:
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        else:
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+    # Рядки зникли з grades без DELETE, тож агрегати оновлюються повним перерахунком
+    refresh_grade_stats(Session(bind=conn))
+    return detached
+
+
+def print_partitions(conn: Connection):
+    rows = []
+    for name, bounds in list_partitions(conn):
+        count = conn.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+        rows.append((name, bounds, count))
+    print_table(rows, ["Секція", "Межі", "Рядків"])
+
+
+def month_arg(value: str):
+    try:
+        year, month = (int(part) for part in value.split("-"))
+        return date(year, month, 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"очікується місяць у форматі YYYY-MM, отримано {value!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обслуговування місячних секцій таблиці grades")
+    parser.add_argument("--ahead", type=int, default=None,
+                        help=f"Створити секції на N місяців наперед (звичайно {DEFAULT_MONTHS_AHEAD})")
+    parser.add_argument("--from", dest="start", type=month_arg, default=None,
+                        help="Перший місяць для --ahead, YYYY-MM (за замовчуванням - поточний)")
+    parser.add_argument("--detach-before", type=month_arg, default=None,
+                        help="Від'єднати секції, старші за місяць YYYY-MM")
+    parser.add_argument("--drop", action="store_true", help="Видаляти від'єднані секції замість перенесення в archive")
+    parser.add_argument("--list", action="store_true", help="Показати секції та кількість рядків")
+    args = parser.parse_args()
+
+    if args.ahead is None and args.start is None and args.detach_before is None and not args.list:
+        parser.error("потрібна хоча б одна дія: --ahead, --from, --detach-before або --list")
+    if args.drop and args.detach_before is None:
+        parser.error("--drop використовується лише разом з --detach-before")
+
+    from conf.db import engine
+
+    with engine.begin() as conn:
+        if args.ahead is not None or args.start is not None:
+            created = ensure_partitions(conn, args.start, DEFAULT_MONTHS_AHEAD if args.ahead is None else args.ahead)
+            for name, moved in created:
+                print(f"Створено секцію {name}, перенесено з {DEFAULT_PARTITION}: {moved}")
+            if not created:
+                print("Усі потрібні секції вже існують")
+        if args.detach_before is not None:
+            detached = detach_before(conn, args.detach_before, args.drop)
+            action = "видалено" if args.drop else f"перенесено в схему {ARCHIVE_SCHEMA}"
+            for name in detached:
+                print(f"Секцію {name} від'єднано і {action}")
+            if not detached:
+                print(f"Немає секцій, старших за {args.detach_before:%Y-%m}")
+        if args.list:
+            print_partitions(conn)
+
+
+if __name__ == "__main__":
+    main()
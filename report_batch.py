@@ -0,0 +1,203 @@
+import os
+import time
+from collections import defaultdict
+from itertools import groupby
+
+from sqlalchemy import and_, desc, func, select, true
+from sqlalchemy.orm import Session
+
+from grade_stats import grade_source
+from models.models import Student, Grade, Teacher, Subject, Group
+from my_select import ROW_TYPES, last_lesson_query, query_1, query_4
+from reports import REPORTS, STATS_REPORTS
+from utils.profiling import profiler
+from utils.render import write_rows
+
+# Пакетний режим: кожен звіт для всіх комбінацій параметрів одним запитом.
+# Рядок пакетного запиту - це значення параметрів (group_id, subject_id, ...),
+# за якими йдуть рівно ті поля і в тому порядку, що й у рядках select_N.
+
+FILE_EXTENSIONS = {"csv": "csv", "jsonl": "jsonl", "plain": "txt", "table": "txt"}
+
+def batch_query_1(use_stats: bool = False):
+    return query_1(use_stats)
+
+def batch_query_2(use_stats: bool = False):
+    grades, avg_grade = grade_source(use_stats)
+    ranked = (
+        select(
+            grades.subject_id,
+            Student.full_name,
+            Subject.name.label("subject_name"),
+            avg_grade,
+            func.row_number().over(
+                partition_by=grades.subject_id,
+                order_by=(avg_grade.element.desc(), Student.id),
+            ).label("place"),
+        )
+        .join(grades, Student.id == grades.student_id)
+        .join(Subject, Subject.id == grades.subject_id)
+        .group_by(grades.subject_id, Student.id, Subject.name)
+        .subquery()
+    )
+    return (
+        select(ranked.c.subject_id, ranked.c.full_name, ranked.c.subject_name, ranked.c.avg_grade)
+        .filter(ranked.c.place == 1)
+        .order_by(ranked.c.subject_id)
+    )
+
+def batch_query_3(use_stats: bool = False):
+    grades, avg_grade = grade_source(use_stats)
+    return (
+        select(Subject.id, Group.name, Subject.name, avg_grade)
+        .join(Student, Student.group_id == Group.id)
+        .join(grades, grades.student_id == Student.id)
+        .join(Subject, Subject.id == grades.subject_id)
+        .group_by(Subject.id, Group.name, Subject.name)
+        .order_by(Subject.id, desc("avg_grade"), Group.name)
+    )
+
+def batch_query_4(use_stats: bool = False):
+    return query_4(use_stats)
+
+def batch_query_5():
+    return (
+        select(Teacher.id, Teacher.full_name, Subject.name)
+        .join(Subject, Subject.teacher_id == Teacher.id)
+        .order_by(Teacher.id, Subject.id)
+    )
+
+def batch_query_6():
+    return (
+        select(Student.group_id, Group.name, Student.full_name)
+        .join(Group)
+        .order_by(Student.group_id, Student.full_name.asc(), Student.id)
+    )
+
+def batch_query_7():
+    return (
+        select(Group.id, Subject.id, Student.full_name, Grade.grade, Group.name, Subject.name, Grade.date_received)
+        .join(Group, Student.group_id == Group.id)
+        .join(Grade, Grade.student_id == Student.id)
+        .join(Subject, Grade.subject_id == Subject.id)
+        .order_by(Group.id, Subject.id, Grade.date_received.desc(), Grade.id)
+    )
+
+def batch_query_8(use_stats: bool = False):
+    grades, avg_grade = grade_source(use_stats)
+    return (
+        select(Teacher.id, Teacher.full_name, avg_grade)
+        .join(Subject, Subject.teacher_id == Teacher.id)
+        .join(grades, grades.subject_id == Subject.id)
+        .group_by(Teacher.id)
+        .order_by(Teacher.id)
+    )
+
+def batch_query_9():
+    # Студент без оцінок дає один рядок з subject_name = NULL, як і select_9
+    return (
+        select(Student.id, Student.full_name, Subject.name)
+        .distinct()
+        .select_from(Student)
+        .outerjoin(Grade, Grade.student_id == Student.id)
+        .outerjoin(Subject, Subject.id == Grade.subject_id)
+        .order_by(Student.id, Subject.name)
+    )
+
+def batch_query_10():
+    courses = (
+        select(Grade.student_id, Subject.teacher_id, Subject.name)
+        .distinct()
+        .join(Subject, Subject.id == Grade.subject_id)
+        .subquery()
+    )
+    return (
+        select(Student.id, Teacher.id, Student.full_name, Teacher.full_name, courses.c.name)
+        .select_from(Student)
+        .join(Teacher, true())
+        .outerjoin(courses, and_(courses.c.student_id == Student.id, courses.c.teacher_id == Teacher.id))
+        .order_by(Student.id, Teacher.id, courses.c.name)
+    )
+
+def batch_query_11(use_stats: bool = False):
+    grades, avg_grade = grade_source(use_stats)
+    return (
+        select(
+            Teacher.id, Student.id,
+            Teacher.first_name, Teacher.last_name,
+            Student.first_name, Student.last_name,
+            avg_grade
+        )
+        .join(Subject, Subject.teacher_id == Teacher.id)
+        .join(grades, grades.subject_id == Subject.id)
+        .join(Student, Student.id == grades.student_id)
+        .group_by(Teacher.id, Student.id)
+        .order_by(Teacher.id, Student.id)
+    )
+
+def batch_query_12():
+    return last_lesson_query()
+
+BATCH_QUERIES = {
+    1: batch_query_1, 2: batch_query_2, 3: batch_query_3, 4: batch_query_4, 5: batch_query_5, 6: batch_query_6,
+    7: batch_query_7, 8: batch_query_8, 9: batch_query_9, 10: batch_query_10, 11: batch_query_11, 12: batch_query_12,
+}
+
+def batch_query(report_num, use_stats=False):
+    options = {"use_stats": True} if use_stats and report_num in STATS_REPORTS else {}
+    return BATCH_QUERIES[report_num](**options)
+
+def batch_headers(report_num):
+    _, _, params = REPORTS[report_num]
+    return [*params, *ROW_TYPES[report_num]._fields]
+
+def stream_batch(session: Session, report_num, use_stats=False, yield_per=5000):
+    """Генератор рядків пакетного звіту: серверний курсор, без завантаження всього результату"""
+    query = batch_query(report_num, use_stats).execution_options(yield_per=yield_per)
+    for row in session.execute(query):
+        yield tuple(row)
+
+def export_batch(session: Session, report_nums, out_dir, fmt="csv", use_stats=False):
+    """Записує кожен звіт у файл out_dir/report_N.<ext>; повертає {номер звіту: кількість рядків}"""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    for report_num in report_nums:
+        path = os.path.join(out_dir, f"report_{report_num}.{FILE_EXTENSIONS[fmt]}")
+        started = time.perf_counter()
+        with open(path, "w", encoding="utf-8", newline="") as out, profiler.run(f"batch {report_num}"):
+            counts[report_num] = write_rows(stream_batch(session, report_num, use_stats), batch_headers(report_num), fmt, out)
+        print(f"Звіт {report_num}: {counts[report_num]} рядків -> {path} ({time.perf_counter() - started:.2f} с)")
+    return counts
+
+PARAM_SOURCES = {
+    "group_id": Group.id,
+    "subject_id": Subject.id,
+    "teacher_id": Teacher.id,
+    "student_id": Student.id,
+}
+
+def verify_batch(session: Session, report_num, use_stats=False):
+    """Порівнює пакетний результат з викликами select_N для кожної комбінації параметрів.
+
+    Повертає список комбінацій параметрів, для яких рядки відрізняються.
+    """
+    _, func, params = REPORTS[report_num]
+    options = {"use_stats": True} if use_stats and report_num in STATS_REPORTS else {}
+    row_type = ROW_TYPES[report_num]
+    key_size = len(params)
+
+    batch_rows = defaultdict(list)
+    for key, rows in groupby(stream_batch(session, report_num, use_stats), key=lambda row: row[:key_size]):
+        batch_rows[key] = [row_type._make(row[key_size:]) for row in rows]
+
+    combinations = [()]
+    for param in params:
+        ids = session.execute(select(PARAM_SOURCES[param]).order_by(PARAM_SOURCES[param])).scalars().all()
+        combinations = [key + (value,) for key in combinations for value in ids]
+
+    mismatches = []
+    for key in combinations:
+        expected = func(session, *key, **options)
+        if expected != batch_rows.get(key, []):
+            mismatches.append(key)
+    return mismatches
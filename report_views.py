@@ -0,0 +1,171 @@
+from my_select import (
+    StudentAverage, SubjectBestStudent, GroupAverage, OverallAverage, TeacherCourse, GroupStudent,
+    GroupGrade, TeacherAverage, StudentCourse, StudentTeacherCourse, TeacherStudentAverage, LastLessonGrade,
+    StudentPeriodAverage, GroupPeriodAverage, SubjectWeekTrend, SubjectRollingAverage, ROLLING_WINDOW_DAYS, ROW_TYPES,
+)
+from utils.print_table import print_table
+from utils.render import write_rows
+
+# Інтерактивне представлення звітів: заголовки, нумерація і формат чисел/дат.
+# Кожна функція show_N отримує рядки select_N і параметри, з якими його викликали.
+
+def show_1(rows: list[StudentAverage]):
+    formatted_results = [(idx + 1, full_name, f"{avg_grade:.2f}") for idx, (full_name, avg_grade) in enumerate(rows)]
+    print("1. 5 студентів із найбільшим середнім балом з усіх предметів:")
+    print_table(formatted_results, ["#", "Full Name", "Average Grade"])
+
+def show_2(rows: list[SubjectBestStudent], subject_id: int):
+    if not rows:
+        print("Немає даних для вказаного предмета.")
+        return
+    full_name, subject_name, avg_grade = rows[0]
+    print(f"2. Cтудент {full_name} має найвищий середній бал з предмета {subject_name}: {avg_grade: .2f} балів")
+
+def show_3(rows: list[GroupAverage], subject_id: int):
+    if not rows:
+        print("Немає даних для вказаного предмета.")
+        return
+    formatted_results = [(group_name, f"{avg_grade:.2f}") for group_name, _, avg_grade in rows]
+    print(f"3. Середній бал у групах з предмета {rows[0].subject_name}:")
+    print_table(formatted_results, ["Group Name", "Average Grade"])
+
+def show_4(rows: list[OverallAverage]):
+    avg_grade = rows[0].avg_grade
+    if avg_grade is None:
+        print("Немає жодної оцінки.")
+        return
+    print(f"4. Середній бал на потоці (по всій таблиці оцінок): {avg_grade:.2f}")
+
+def show_5(rows: list[TeacherCourse], teacher_id: int):
+    if not rows:
+        print("Немає даних для вказаного вчителя.")
+        return
+    formatted_results = [(idx + 1, subject_name) for idx, (_, subject_name) in enumerate(rows)]
+    print(f"5. Викладач {rows[0].teacher_name} читає наступні курси:")
+    print_table(formatted_results, ["#", "Subject Name"])
+
+def show_6(rows: list[GroupStudent], group_id: int):
+    if not rows:
+        print("Немає даних для вказаної групи.")
+        return
+    formatted_results = [(idx + 1, full_name) for idx, (_, full_name) in enumerate(rows)]
+    print(f"6. Список студентів у групі {rows[0].group_name}:")
+    print_table(formatted_results, ["#", "Full Name"])
+
+def show_7(rows: list[GroupGrade], group_id: int, subject_id: int):
+    if not rows:
+        print("Немає даних для вказаних параметрів запиту.")
+        return
+    formatted_results = [(idx + 1, full_name, grade, date_received.strftime("%d.%m.%Y"))
+                         for idx, (full_name, grade, _, _, date_received) in enumerate(rows)]
+    print(f"7. Оцінки студентів у групі {rows[0].group_name} з предмета {rows[0].subject_name}, відсортовані за датою виставлення оцінки:")
+    print_table(formatted_results, ["#", "Full Name", "Grade", "Date Received"])
+
+def show_8(rows: list[TeacherAverage], teacher_id: int):
+    if not rows:
+        print("Цей викладач ще не ставив оцінок.")
+        return
+    full_name, avg_grade = rows[0]
+    print(f"8. Середній бал, який ставить викладач {full_name}: {avg_grade:.2f}")
+
+def show_9(rows: list[StudentCourse], student_id: int):
+    if not rows:
+        print(f"Студент з ID {student_id} не знайдений.")
+        return
+    subject_names = [row.subject_name for row in rows if row.subject_name is not None]
+    formatted_results = [(index + 1, subject_name) for index, subject_name in enumerate(subject_names)]
+    print(f"9. Список курсів, які відвідує студент {rows[0].student_name}:")
+    print_table(formatted_results, ["#", "Subject Name"])
+
+def show_10(rows: list[StudentTeacherCourse], student_id: int, teacher_id: int):
+    student, teacher, _ = rows[0]
+    if not teacher:
+        print(f"Викладача з ID {teacher_id} не знайдено.")
+        return
+    if not student:
+        print(f"Студента з ID {student_id} не знайдено.")
+        return
+    subject_names = [row.subject_name for row in rows if row.subject_name is not None]
+    if subject_names:
+        formatted_results = [(index + 1, subject_name) for index, subject_name in enumerate(subject_names)]
+        print(f"10. Список курсів, які студенту {student} читає викладач {teacher}:")
+        print_table(formatted_results, ["#", "Subject Name"])
+    else:
+        print(f"Немає предметів, які викладає викладач {teacher} студенту {student}.")
+
+def show_11(rows: list[TeacherStudentAverage], teacher_id: int, student_id: int):
+    if not rows:
+        print("Немає оцінок від цього викладача для цього студента.")
+        return
+    teacher_first, teacher_last, student_first, student_last, avg_grade = rows[0]
+    print(f"11. Середній бал, який {teacher_first} {teacher_last} поставив студенту {student_first} {student_last}: {avg_grade:.2f}")
+
+def show_12(rows: list[LastLessonGrade], group_id: int, subject_id: int):
+    if not rows:
+        print("Немає оцінок для цієї групи з цього предмета.")
+        return
+    group_name, subject_name = rows[0][:2]
+    formatted_date = rows[0].date_received.strftime("%d.%m.%Y")
+    formatted_results = [
+        (idx + 1, f"{first_name} {last_name}", grade)
+        for idx, (_, _, first_name, last_name, grade, _) in enumerate(rows)
+    ]
+    print(f"12. Оцінки студентів групи {group_name} з предмета {subject_name} на останньому занятті ({formatted_date}):")
+    print_table(formatted_results, ["#", "Student Name", "Grade"])
+
+def period(since, until):
+    return f"{since.strftime('%d.%m.%Y')} - {until.strftime('%d.%m.%Y')}"
+
+def show_13(rows: list[StudentPeriodAverage], since, until):
+    if not rows:
+        print(f"Немає оцінок за період {period(since, until)}.")
+        return
+    formatted_results = [(idx + 1, full_name, grade_count, f"{avg_grade:.2f}")
+                         for idx, (full_name, grade_count, avg_grade) in enumerate(rows)]
+    print(f"13. Середній бал студентів за період {period(since, until)}:")
+    print_table(formatted_results, ["#", "Full Name", "Grades", "Average Grade"])
+
+def show_14(rows: list[GroupPeriodAverage], since, until):
+    if not rows:
+        print(f"Немає оцінок за період {period(since, until)}.")
+        return
+    formatted_results = [(group_name, grade_count, f"{avg_grade:.2f}") for group_name, grade_count, avg_grade in rows]
+    print(f"14. Середній бал груп за період {period(since, until)}:")
+    print_table(formatted_results, ["Group Name", "Grades", "Average Grade"])
+
+def show_15(rows: list[SubjectWeekTrend], since, until):
+    if not rows:
+        print(f"Немає оцінок за період {period(since, until)}.")
+        return
+    formatted_results = [
+        (subject_name, week_start.strftime("%d.%m.%Y"), grade_count, f"{avg_grade:.2f}",
+         "-" if change is None else f"{change:+.2f}")
+        for subject_name, week_start, grade_count, avg_grade, change in rows
+    ]
+    print(f"15. Тижнева динаміка середнього балу з предметів за період {period(since, until)}:")
+    print_table(formatted_results, ["Subject Name", "Week", "Grades", "Average Grade", "Change"])
+
+def show_16(rows: list[SubjectRollingAverage], subject_id: int, since, until):
+    if not rows:
+        print(f"Немає оцінок з предмета за період {period(since, until)}.")
+        return
+    formatted_results = [
+        (day.strftime("%d.%m.%Y"), grade_count, f"{avg_grade:.2f}", f"{rolling_avg:.2f}")
+        for _, day, grade_count, avg_grade, rolling_avg in rows
+    ]
+    print(f"16. Середній бал з предмета {rows[0].subject_name} по днях і ковзне середнє за {ROLLING_WINDOW_DAYS} днів, "
+          f"{period(since, until)}:")
+    print_table(formatted_results, ["Day", "Grades", "Average Grade", "Rolling Average"])
+
+VIEWS = {
+    1: show_1, 2: show_2, 3: show_3, 4: show_4, 5: show_5, 6: show_6,
+    7: show_7, 8: show_8, 9: show_9, 10: show_10, 11: show_11, 12: show_12,
+    13: show_13, 14: show_14, 15: show_15, 16: show_16,
+}
+
+def show_report(report_num, rows, *param_values, fmt="table"):
+    """Виводить результат звіту: інтерактивне представлення (table) або сирі рядки (csv, jsonl, plain)"""
+    if fmt == "table":
+        VIEWS[report_num](rows, *param_values)
+        return
+    write_rows(rows, ROW_TYPES[report_num]._fields, fmt)
@@ -1,5 +1,12 @@
+import os
+from datetime import date
+
 from my_select import *
-from conf.db import SessionLocal
+from conf.db import ReadSessionLocal
+from report_views import show_report
+from utils.cache import MISSING, TTLCache
+from utils.dates import parse_date_bound
+from utils.profiling import profiler
 
 # Список звітів
 REPORTS = {
@@ -15,8 +22,107 @@ REPORTS = {
     10: ("Курси, які студенту читає викладач", select_10, ["student_id", "teacher_id"]),
     11: ("Середній бал студента у викладача", select_11, ["teacher_id", "student_id"]),
     12: ("Оцінки студентів групи на останньому занятті з предмету", select_12, ["group_id", "subject_id"]),
+    13: ("Середній бал студентів за період", select_13, ["since", "until"]),
+    14: ("Середній бал груп за період", select_14, ["since", "until"]),
+    15: ("Тижнева динаміка середнього балу з предметів", select_15, ["since", "until"]),
+    16: (f"Ковзне середнє за {ROLLING_WINDOW_DAYS} днів з предмета", select_16, ["subject_id", "since", "until"]),
 }
 
+# Межі періоду звітів 13-16: дата YYYY-MM-DD або Nd (N днів тому); until без значення - сьогодні
+PARAM_PARSERS = {"since": parse_date_bound, "until": parse_date_bound}
+PARAM_DEFAULTS = {"until": date.today}
+
+# Звіти, які можуть читати середні бали з попередньо агрегованої таблиці grade_stats
+STATS_REPORTS = {1, 2, 3, 4, 8, 11}
+
+# Рушії звітів: sql - запити my_select, columnar - знімок оцінок у NumPy (звіти 1-12, columnar.py)
+ENGINES = ("sql", "columnar")
+
+# Кеш результатів звітів: ключ - (номер звіту, параметри, use_stats, рушій)
+report_cache = TTLCache(
+    maxsize=int(os.getenv("REPORT_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("REPORT_CACHE_TTL", "60")),
+)
+
+# Тег запису кешу за назвою параметра звіту
+PARAM_TAGS = {
+    "subject_id": "subject",
+    "group_id": "group",
+    "student_id": "student",
+    "teacher_id": "teacher",
+}
+
+# Звіти без параметрів-ID (зокрема звіти лише за період) агрегують всю таблицю оцінок
+ALL_GRADES_TAG = ("all",)
+
+def report_tags(report_num, param_values):
+    _, _, params = REPORTS[report_num]
+    tags = {(PARAM_TAGS[param], value) for param, value in zip(params, param_values) if param in PARAM_TAGS}
+    return tags or {ALL_GRADES_TAG}
+
+def fetch_report(session, report_num, param_values, use_stats=False, engine="sql"):
+    """Повертає рядки звіту з кешу або виконує запит і кешує результат"""
+    _, func, _ = REPORTS[report_num]
+    if engine == "columnar":
+        from columnar import COLUMNAR_REPORTS
+        # Звіти за період колонковий рушій не рахує - вони йдуть у SQL
+        engine = "columnar" if report_num in COLUMNAR_REPORTS else "sql"
+    use_stats = use_stats and report_num in STATS_REPORTS and engine == "sql"
+    key = (report_num, tuple(param_values), use_stats, engine)
+
+    rows = report_cache.get(key)
+    if rows is MISSING:
+        if engine == "columnar":
+            from columnar import get_snapshot
+            rows = get_snapshot(session).report(report_num, param_values)
+        else:
+            options = {"use_stats": True} if use_stats else {}
+            rows = func(session, *param_values, **options)
+        report_cache.set(key, rows, report_tags(report_num, param_values))
+    return rows
+
+def run_report(session, report_num, param_values, use_stats=False, fmt="table", engine="sql"):
+    """Виконує звіт через кеш результатів і виводить його"""
+    with profiler.run(f"report {report_num}"):
+        rows = fetch_report(session, report_num, param_values, use_stats, engine)
+        with profiler.phase("format"):
+            show_report(report_num, rows, *param_values, fmt=fmt)
+
+def run_snapshot_report(snapshot, report_num, param_values, fmt="table"):
+    """Виконує звіт 1-12 над знімком snapshot.py, без сесії бази"""
+    with profiler.run(f"report {report_num}"):
+        rows = snapshot.report(report_num, param_values)
+        with profiler.phase("format"):
+            show_report(report_num, rows, *param_values, fmt=fmt)
+
+def invalidate_grade(session, student_id, subject_id):
+    """Видаляє з кешу звіти, які залежать від оцінки студента з предмета"""
+    group_id = session.execute(select(Student.group_id).filter(Student.id == student_id)).scalar()
+    teacher_id = session.execute(select(Subject.teacher_id).filter(Subject.id == subject_id)).scalar()
+    return report_cache.invalidate_tags({
+        ALL_GRADES_TAG,
+        ("student", student_id),
+        ("subject", subject_id),
+        ("group", group_id),
+        ("teacher", teacher_id),
+    })
+
+def invalidate_record(session, model_name, record, created=False):
+    """Інвалідація кешу після запису моделі через main.py"""
+    if model_name == "Grade":
+        from leaderboard import LEADERBOARDS_KEY
+        boards = report_cache.get(LEADERBOARDS_KEY) if created else MISSING
+        count = invalidate_grade(session, record.student_id, record.subject_id)
+        if boards is not MISSING:
+            # Нова оцінка лише додається до сум студента: таблиці лідерів оновлюються без перебудови
+            boards.add_grade(record.student_id, record.subject_id, record.grade)
+            report_cache.set(LEADERBOARDS_KEY, boards, {ALL_GRADES_TAG})
+        return count
+    # Зміни студентів, груп, викладачів і предметів рідкісні: скидаємо кеш повністю
+    count = len(report_cache)
+    report_cache.clear()
+    return count
+
 def show_reports():
     """Виводить список доступних звітів"""
     print("\nДоступні звіти:")
@@ -24,8 +130,17 @@ def show_reports():
         param_list = ", ".join(params) if params else "Без параметрів"
         print(f"{num}. {desc} ({param_list})")
 
-def main():
-    session = SessionLocal()
+def main(use_stats=False, fmt="table", engine="sql", snapshot_dir=None):
+    """Діалог звітів; зі snapshot_dir звіти 1-12 рахуються з файлів знімка без з'єднання з базою"""
+    if snapshot_dir:
+        from columnar import COLUMNAR_REPORTS
+        from snapshot import open_snapshot
+        snapshot = open_snapshot(snapshot_dir)
+        print(f"Знімок {snapshot_dir} від {snapshot.exported_at}: {snapshot.grade_count} оцінок, "
+              f"відкрито за {snapshot.load_seconds * 1000:.1f} мс")
+        session = None
+    else:
+        session = ReadSessionLocal()
     while True:
         show_reports()
         try:
@@ -36,21 +151,54 @@ def main():
             if report_num not in REPORTS:
                 print("Невірний номер звіту. Спробуйте ще раз.")
                 continue
+            if session is None and report_num not in COLUMNAR_REPORTS:
+                print("Звіти за період потребують бази даних, у знімку доступні звіти 1-12.")
+                continue
 
             desc, func, params = REPORTS[report_num]
             param_values = []
             
             for param in params:
-                value = input(f"Введіть {param}: ")
-                param_values.append(int(value))  
+                if param in PARAM_PARSERS:
+                    value = input(f"Введіть {param} (YYYY-MM-DD або Nd): ")
+                else:
+                    value = input(f"Введіть {param}: ")
+                if not value and param in PARAM_DEFAULTS:
+                    param_values.append(PARAM_DEFAULTS[param]())
+                else:
+                    param_values.append(PARAM_PARSERS.get(param, int)(value))
             
             print(f"\nВиконується звіт: {desc}\n")
-            func(session, *param_values)  
+            if session is None:
+                run_snapshot_report(snapshot, report_num, param_values, fmt)
+            else:
+                run_report(session, report_num, param_values, use_stats, fmt, engine)
             
         except ValueError:
             print("Помилка введення! Введіть коректний номер.")
 
-    session.close()
+    if session is not None:
+        session.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    from utils.profiling import DEFAULT_SLOW_MS, profile_session
+
+    parser = argparse.ArgumentParser(description="Діалоговий режим звітів")
+    parser.add_argument("--profile", action="store_true",
+                        help="Після виходу вивести час звітів і SQL-запитів, рядки, очікування пулу і форматування")
+    parser.add_argument("--slow-ms", type=float, default=DEFAULT_SLOW_MS, help="Поріг повільного запиту, мс")
+    parser.add_argument("--explain", action="store_true",
+                        help="Вивести EXPLAIN (ANALYZE, BUFFERS) для запитів, повільніших за --slow-ms")
+    parser.add_argument("--metrics-file", help="Записати метрики профілю у текстовому форматі Prometheus")
+    parser.add_argument("--engine", choices=ENGINES, default="sql",
+                        help="Рушій звітів 1-12: sql (типово) або columnar - знімок оцінок у пам'яті (потребує numpy)")
+    parser.add_argument("--snapshot", metavar="DIR",
+                        help="Рахувати звіти 1-12 з файлів знімка (main.py -a snapshot) без з'єднання з базою")
+    args = parser.parse_args()
+
+    if args.profile:
+        with profile_session(args.slow_ms, args.explain, args.metrics_file):
+            main(engine=args.engine, snapshot_dir=args.snapshot)
+    else:
+        main(engine=args.engine, snapshot_dir=args.snapshot)
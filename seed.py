@@ -1,29 +1,42 @@
+import argparse
 import random
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
 
 from faker import Faker
+from sqlalchemy import create_engine, func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 
-from conf.db import SessionLocal
+from conf.db import SessionLocal, URI, engine
 from models.models import Student, Grade, Subject, Teacher, Group
+from partitions import ensure_partitions
+from utils.bulk import load_rows, sync_sequence
 
 fake = Faker("uk_UA")
 Faker.seed(42)
 
-def seed_database():
+STUDENT_COLUMNS = ("id", "first_name", "last_name", "email", "phone", "group_id")
+GRADE_COLUMNS = ("student_id", "subject_id", "grade", "date_received")
+HISTORY_DAYS = 180
+
+def seed_database(students_count=100, grades_per_student=(10, 20), history_days=HISTORY_DAYS):
     # Create a session
     session: Session = SessionLocal()
     try:
-        
+        # grades is partitioned by month; make sure every seeded month has its own partition
+        ensure_partitions(session.connection(), date.today() - timedelta(days=history_days))
+
         groups = create_group(session)
        
         teachers = create_teacher(session)
         
         subjects = create_subject(session, teachers)
         
-        students = create_student(session, groups)
+        students = create_student(session, groups, students_count)
         
-        create_grades(session, students, subjects)
+        create_grades(session, students, subjects, grades_per_student, history_days)
         
         session.commit()
 
@@ -85,9 +98,9 @@ def create_subject(session: Session, teachers: list):
     session.flush()
     return subjects
 
-def create_student(session: Session, groups: list):
+def create_student(session: Session, groups: list, count: int = 100):
     students = []
-    for i in range(100):
+    for i in range(count):
         student = Student(
             first_name=fake.first_name(),
             last_name=fake.last_name(),
@@ -100,12 +113,12 @@ def create_student(session: Session, groups: list):
     session.flush()
     return students
 
-def create_grades(session: Session, students: list, subjects: list):
-    start_date = datetime.now() - timedelta(days=180)
+def create_grades(session: Session, students: list, subjects: list, grades_per_student=(10, 20), history_days=HISTORY_DAYS):
+    start_date = datetime.now() - timedelta(days=history_days)
     end_date = datetime.now()
 
     for student in students:
-        num_grades = random.randint(10, 20)
+        num_grades = random.randint(*grades_per_student)
         for _ in range(num_grades):
             subject = random.choice(subjects)
             grade = Grade(
@@ -117,5 +130,175 @@ def create_grades(session: Session, students: list, subjects: list):
             session.add(grade)
     session.flush()
 
+# Bulk mode: rows are generated as tuples and streamed straight into COPY / executemany,
+# so memory stays flat no matter how many students are requested.
+def unique_email(fake: Faker, idx: int):
+    # The numeric suffix makes the address unique by construction, without fake.unique bookkeeping
+    return f"{fake.user_name()}.{idx}@{fake.free_email_domain()}"
+
+def generate_students(fake: Faker, rng: random.Random, id_start: int, id_end: int, group_ids: list):
+    for student_id in range(id_start, id_end):
+        yield (
+            student_id,
+            fake.first_name(),
+            fake.last_name(),
+            unique_email(fake, student_id),
+            fake.phone_number(),
+            rng.choice(group_ids),
+        )
+
+def generate_grades(rng: random.Random, id_start: int, id_end: int, subject_ids: list, grades_per_student, start_date: date,
+                    history_days: int = HISTORY_DAYS):
+    low, high = grades_per_student
+    for student_id in range(id_start, id_end):
+        for _ in range(rng.randint(low, high)):
+            yield (
+                student_id,
+                rng.choice(subject_ids),
+                rng.randint(40, 100),
+                start_date + timedelta(days=rng.randint(0, history_days)),
+            )
+
+def report_throughput(table: str, count: int, elapsed: float):
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"{table}: {count} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+
+def timed_load(conn, table, columns, rows, mode, batch_size):
+    started = time.perf_counter()
+    count = load_rows(conn, table, columns, rows, mode, batch_size)
+    return count, time.perf_counter() - started
+
+def seed_reference_data():
+    # Groups, teachers and subjects are tiny, so they still go through the ORM
+    session: Session = SessionLocal()
+    try:
+        groups = create_group(session)
+        teachers = create_teacher(session)
+        subjects = create_subject(session, teachers)
+        session.commit()
+        return [g.id for g in groups], [s.id for s in subjects]
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def partition_ids(id_start: int, count: int, workers: int):
+    # Disjoint, contiguous student-ID ranges, one per worker
+    base, extra = divmod(count, workers)
+    ranges = []
+    for worker in range(workers):
+        size = base + (1 if worker < extra else 0)
+        ranges.append((id_start, id_start + size))
+        id_start += size
+    return ranges
+
+def worker_seed(seed: int, worker: int):
+    # String seeds are hashed deterministically by random.Random, unlike hash(tuple)
+    return f"{seed}-{worker}"
+
+def init_worker():
+    # Forked workers must not reuse the parent's pooled connections
+    engine.dispose(close=False)
+
+def seed_partition(worker, id_range, group_ids, subject_ids, grades_per_student, mode, seed, batch_size, start_date, history_days):
+    id_start, id_end = id_range
+    worker_fake = Faker("uk_UA")
+    worker_fake.seed_instance(worker_seed(seed, worker))
+    rng = random.Random(worker_seed(seed, worker))
+
+    worker_engine = create_engine(URI, poolclass=NullPool)
+    try:
+        with worker_engine.begin() as conn:
+            students = generate_students(worker_fake, rng, id_start, id_end, group_ids)
+            students_stats = timed_load(conn, Student.__table__, STUDENT_COLUMNS, students, mode, batch_size)
+
+            grades = generate_grades(rng, id_start, id_end, subject_ids, grades_per_student, start_date, history_days)
+            grades_stats = timed_load(conn, Grade.__table__, GRADE_COLUMNS, grades, mode, batch_size)
+    finally:
+        worker_engine.dispose()
+    return students_stats, grades_stats
+
+def seed_bulk(students_count, grades_per_student, mode="copy", seed=42, batch_size=5000, workers=1, history_days=HISTORY_DAYS):
+    started = time.perf_counter()
+    try:
+        group_ids, subject_ids = seed_reference_data()
+        start_date = date.today() - timedelta(days=history_days)
+
+        with engine.begin() as conn:
+            # Rows outside every monthly partition would pile up in grades_default
+            ensure_partitions(conn, start_date)
+            id_start = conn.execute(select(func.coalesce(func.max(Student.id), 0))).scalar() + 1
+        ranges = partition_ids(id_start, students_count, workers)
+        tasks = [
+            (worker, id_range, group_ids, subject_ids, grades_per_student, mode, seed, batch_size, start_date, history_days)
+            for worker, id_range in enumerate(ranges)
+        ]
+
+        if workers == 1:
+            results = [seed_partition(*tasks[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+                results = list(pool.map(seed_partition, *zip(*tasks)))
+
+        with engine.begin() as conn:
+            sync_sequence(conn, Student.__table__)
+
+        for worker, ((students, students_time), (grades, grades_time)) in enumerate(results):
+            if workers > 1:
+                print(f"worker {worker}:")
+            report_throughput("students", students, students_time)
+            report_throughput("grades", grades, grades_time)
+
+        elapsed = time.perf_counter() - started
+        if workers > 1:
+            print("total:")
+            report_throughput("students", sum(r[0][0] for r in results), elapsed)
+            report_throughput("grades", sum(r[1][0] for r in results), elapsed)
+        print(f"Database seeded successfully in {elapsed:.2f}s.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+def grade_range(value: str):
+    low, _, high = value.partition("-")
+    try:
+        low, high = int(low), int(high or low)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected N or MIN-MAX, e.g. 10-20")
+    if low < 0 or low > high:
+        raise argparse.ArgumentTypeError("expected 0 <= MIN <= MAX")
+    return low, high
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with fake data")
+    parser.add_argument("--mode", choices=["orm", "copy", "insert"], default="orm",
+                        help="orm: one ORM object per row; copy: COPY FROM STDIN; insert: executemany batches")
+    parser.add_argument("--students", type=int, default=100, help="Number of students to generate")
+    parser.add_argument("--grades-per-student", type=grade_range, default=(10, 20),
+                        help="Grades per student, N or MIN-MAX")
+    parser.add_argument("--seed", type=int, default=42, help="Faker/random seed")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per executemany batch (insert mode)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Generator processes for copy/insert mode, each with its own student-ID range")
+    parser.add_argument("--history-days", type=int, default=HISTORY_DAYS,
+                        help="Spread grade dates over this many days back from today (e.g. 1095 for three years)")
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.history_days < 0:
+        parser.error("--history-days must not be negative")
+    if args.workers > 1 and args.mode == "orm":
+        parser.error("--workers requires --mode copy or --mode insert")
+
+    Faker.seed(args.seed)
+    random.seed(args.seed)
+
+    if args.mode == "orm":
+        seed_database(args.students, args.grades_per_student, args.history_days)
+    else:
+        seed_bulk(args.students, args.grades_per_student, args.mode, args.seed, args.batch_size, args.workers,
+                  args.history_days)
+
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""Локальний знімок бази у файлах Arrow IPC для звітів без звернення до Postgres.
+
+    python main.py -a snapshot --out snap/ [--compression zstd] [--chunk-size 50000]
+    python reports.py --snapshot snap/
+
+Кожна таблиця (groups, teachers, students, subjects, grades) пишеться в окремий
+файл <таблиця>.arrow в одній транзакції REPEATABLE READ (на репліці читання, якщо вона є).
+Довідники читаються серверним курсором пачками по --chunk-size рядків і
+пишуться пачками записів, до students, groups і subjects додається колонка
+name_rank - порядок імен у колації бази. Оцінки йдуть бінарним COPY у
+масиви тих самих вузьких типів, що й у columnar.py, і пишуться одним записом,
+щоб при читанні кожна колонка була суцільним буфером.
+
+Файли відкриваються через memory map: без стиснення (типово) масиви оцінок -
+це представлення NumPy прямо над сторінками файлу, без копіювання і розбору,
+тож відкриття знімка майже не залежить від його розміру. --compression lz4
+або zstd зменшує файли, але тоді буфери розпаковуються в пам'ять при читанні.
+Потрібні numpy і pyarrow (poetry install --extras columnar).
+"""
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+from sqlalchemy import BigInteger, Connection, Date, DateTime, Integer, String
+
+from columnar import (
+    GRADE_COLUMNS, LOOKUP_COLUMNS, LOOKUP_MODELS, ColumnarSnapshot, grade_dtypes, load_grade_columns, name_rank,
+)
+from models.models import Grade
+
+# Порядок експорту; оцінки останні, як і в seed.py
+TABLES = ["groups", "teachers", "students", "subjects", "grades"]
+COMPRESSIONS = ["none", "lz4", "zstd"]
+DEFAULT_CHUNK_SIZE = 50000
+SUFFIX = ".arrow"
+
+ARROW_TYPES = [
+    (BigInteger, pa.int64()),
+    (Integer, pa.int32()),
+    (DateTime, pa.timestamp("us")),
+    (Date, pa.date32()),
+    (String, pa.string()),
+]
+
+
+def arrow_type(column):
+    for sql_type, arrow in ARROW_TYPES:
+        if isinstance(column.type, sql_type):
+            return arrow
+    raise TypeError(f"Немає типу Arrow для колонки {column} ({column.type})")
+
+
+def table_path(directory, table_name):
+    return os.path.join(directory, table_name + SUFFIX)
+
+
+def write_batches(path, schema, batches, compression):
+    """Пише пачки у файл Arrow IPC атомарно (через тимчасовий файл); повертає кількість рядків"""
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    rows = 0
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    os.replace(tmp_path, path)
+    return rows
+
+
+def lookup_batches(conn, table_name, schema, chunk_size):
+    model = LOOKUP_MODELS[table_name]
+    extra = [name_rank(table_name)] if "name_rank" in schema.names else []
+    result = conn.execution_options(yield_per=chunk_size).execute(
+        model.__table__.select().add_columns(*extra).order_by(model.__table__.c.id)
+    )
+    for rows in result.partitions():
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)], schema=schema
+        )
+
+
+def lookup_schema(table_name, metadata):
+    model = LOOKUP_MODELS[table_name]
+    fields = [pa.field(column.name, arrow_type(column), column.nullable) for column in model.__table__.columns]
+    if "name_rank" in LOOKUP_COLUMNS[table_name]:
+        fields.append(pa.field("name_rank", pa.int32(), False))
+    return pa.schema(fields, metadata=metadata)
+
+
+def grades_batch(conn, metadata):
+    count, dtypes = grade_dtypes(conn)
+    arrays = load_grade_columns(conn, count, {"id": np.int32, **dtypes})
+    schema = pa.schema(
+        [pa.field(name, pa.from_numpy_dtype(array.dtype), False) for name, array in arrays.items()],
+        metadata=metadata,
+    )
+    return schema, pa.RecordBatch.from_arrays([pa.array(array) for array in arrays.values()], schema=schema)
+
+
+def export_snapshot(conn: Connection, directory, chunk_size=DEFAULT_CHUNK_SIZE, compression="none"):
+    """Пише всі таблиці в directory через conn (див. columnar.snapshot_connection).
+
+    Повертає [(таблиця, рядків, байт, секунд)].
+    """
+    os.makedirs(directory, exist_ok=True)
+    metadata = {"exported_at": datetime.now().isoformat(timespec="seconds")}
+    results = []
+    for table_name in TABLES:
+        started = time.perf_counter()
+        path = table_path(directory, table_name)
+        if table_name == Grade.__tablename__:
+            schema, batch = grades_batch(conn, metadata)
+            rows = write_batches(path, schema, [batch], compression)
+        else:
+            schema = lookup_schema(table_name, metadata)
+            batches = lookup_batches(conn, table_name, schema, chunk_size)
+            rows = write_batches(path, schema, batches, compression)
+        results.append((table_name, rows, os.path.getsize(path), time.perf_counter() - started))
+    return results
+
+
+def read_table(directory, table_name):
+    """Таблиця з файлу через memory map; буфери без стиснення посилаються прямо на сторінки файлу"""
+    with pa.memory_map(table_path(directory, table_name)) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def column_array(table, name):
+    """NumPy-представлення колонки без копіювання, якщо вона лежить одним буфером"""
+    column = table.column(name)
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only=True)
+    return column.to_numpy()
+
+
+def open_snapshot(directory):
+    """ColumnarSnapshot над файлами знімка; exported_at - час експорту"""
+    started = time.perf_counter()
+    lookups = {}
+    for name, columns in LOOKUP_COLUMNS.items():
+        table = read_table(directory, name)
+        lookups[name] = list(zip(*(table.column(column).to_pylist() for column in columns)))
+    grades = read_table(directory, Grade.__tablename__)
+    snapshot = ColumnarSnapshot(lookups, {name: column_array(grades, name) for name in GRADE_COLUMNS})
+    snapshot.load_seconds = time.perf_counter() - started
+    snapshot.exported_at = grades.schema.metadata[b"exported_at"].decode()
+    return snapshot
@@ -0,0 +1,138 @@
+"""Колонковий рушій звітів 1-12: відомі відповіді на синтетичних масивах і звірка з SQL"""
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from columnar import COLUMNAR_REPORTS, ColumnarSnapshot, load_snapshot, verify  # noqa: E402
+
+# Група 3 без студентів, викладач 3 без предметів, предмет 4 без оцінок, студент 4 без оцінок.
+# name_rank - порядок імен, як його дав би dense_rank() у базі.
+LOOKUPS = {
+    "students": [
+        (1, "Anna", "Bilyk", 1, 1),
+        (2, "Bohdan", "Chornyi", 1, 2),
+        (3, "Vira", "Dub", 2, 4),
+        (4, "Denys", "Zhuk", 2, 3),
+    ],
+    "groups": [(1, "A-1", 1), (2, "B-2", 2), (3, "C-3", 3)],
+    "subjects": [(1, "Math", 1, 4), (2, "Art", 1, 1), (3, "Chem", 2, 2), (4, "Draw", 2, 3)],
+    "teachers": [(1, "Ivan", "Petrenko"), (2, "Olha", "Koval"), (3, "Nina", "Bez")],
+}
+
+# Оцінки в порядку grades.id: (student_id, subject_id, grade, date_received)
+GRADES = [
+    (1, 1, 90, datetime(2026, 1, 10)),
+    (2, 1, 80, datetime(2026, 1, 10)),
+    (3, 1, 85, datetime(2026, 1, 12)),
+    (2, 2, 90, datetime(2026, 1, 11)),
+    (3, 3, 80, datetime(2026, 1, 13)),
+    (1, 3, 80, datetime(2026, 1, 13)),
+]
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    student_ids, subject_ids, grades, dates = zip(*GRADES)
+    return ColumnarSnapshot(LOOKUPS, {
+        "student_id": np.array(student_ids, dtype=np.int32),
+        "subject_id": np.array(subject_ids, dtype=np.int16),
+        "grade": np.array(grades, dtype=np.int16),
+        "date_received": np.array(dates, dtype="datetime64[us]"),
+    })
+
+
+def test_select_1_ties_by_student_id(snapshot):
+    # Anna і Bohdan мають по 85: вище той, у кого менший id; студент без оцінок відсутній
+    assert snapshot.select_1() == [("Anna Bilyk", 85.0), ("Bohdan Chornyi", 85.0), ("Vira Dub", 82.5)]
+
+
+def test_select_2(snapshot):
+    assert snapshot.select_2(1) == [("Anna Bilyk", "Math", 90.0)]
+    # Нічия 80 / 80 - менший id
+    assert snapshot.select_2(3) == [("Anna Bilyk", "Chem", 80.0)]
+    assert snapshot.select_2(4) == []
+
+
+def test_select_3_ties_by_group_name(snapshot):
+    assert snapshot.select_3(1) == [("A-1", "Math", 85.0), ("B-2", "Math", 85.0)]
+    assert snapshot.select_3(4) == []
+
+
+def test_select_4(snapshot):
+    [(average,)] = snapshot.select_4()
+    assert average == pytest.approx(505 / 6)
+
+
+def test_select_5(snapshot):
+    assert snapshot.select_5(1) == [("Ivan Petrenko", "Math"), ("Ivan Petrenko", "Art")]
+    assert snapshot.select_5(3) == []
+
+
+def test_select_6_orders_by_name(snapshot):
+    assert snapshot.select_6(1) == [("A-1", "Anna Bilyk"), ("A-1", "Bohdan Chornyi")]
+    assert snapshot.select_6(2) == [("B-2", "Denys Zhuk"), ("B-2", "Vira Dub")]
+    assert snapshot.select_6(3) == []
+
+
+def test_select_7_same_date_by_grade_id(snapshot):
+    date = datetime(2026, 1, 10)
+    assert snapshot.select_7(1, 1) == [
+        ("Anna Bilyk", 90, "A-1", "Math", date),
+        ("Bohdan Chornyi", 80, "A-1", "Math", date),
+    ]
+    assert snapshot.select_7(3, 1) == []
+    assert snapshot.select_7(1, 4) == []
+
+
+def test_select_8(snapshot):
+    assert snapshot.select_8(1) == [("Ivan Petrenko", 86.25)]
+    assert snapshot.select_8(3) == []
+
+
+def test_select_9(snapshot):
+    assert snapshot.select_9(1) == [("Anna Bilyk", "Chem"), ("Anna Bilyk", "Math")]
+    # Студент без оцінок - рядок з NULL, неіснуючий - порожній результат
+    assert snapshot.select_9(4) == [("Denys Zhuk", None)]
+    assert snapshot.select_9(99) == []
+
+
+def test_select_10(snapshot):
+    assert snapshot.select_10(1, 1) == [("Anna Bilyk", "Ivan Petrenko", "Math")]
+    assert snapshot.select_10(4, 3) == [("Denys Zhuk", "Nina Bez", None)]
+    assert snapshot.select_10(99, 99) == [(None, None, None)]
+
+
+def test_select_11(snapshot):
+    assert snapshot.select_11(1, 2) == [("Ivan", "Petrenko", "Bohdan", "Chornyi", 85.0)]
+    assert snapshot.select_11(3, 1) == []
+
+
+def test_select_12_all_grades_of_last_date(snapshot):
+    date = datetime(2026, 1, 10)
+    assert snapshot.select_12(1, 1) == [
+        ("A-1", "Math", "Anna", "Bilyk", 90, date),
+        ("A-1", "Math", "Bohdan", "Chornyi", 80, date),
+    ]
+    assert snapshot.select_12(3, 1) == []
+
+
+def test_empty_snapshot():
+    empty = ColumnarSnapshot({name: [] for name in LOOKUPS}, {
+        "student_id": np.array([], dtype=np.int32),
+        "subject_id": np.array([], dtype=np.int16),
+        "grade": np.array([], dtype=np.int16),
+        "date_received": np.array([], dtype="datetime64[us]"),
+    })
+    assert empty.select_1() == []
+    assert empty.select_4() == [(None,)]
+
+
+@pytest.mark.integration
+def test_matches_sql(db_session):
+    """Усі 12 звітів для всіх комбінацій параметрів збігаються з select_N"""
+    snapshot = load_snapshot(db_session.connection())
+    results = verify(db_session, snapshot)
+    assert [num for num, *_ in results] == sorted(COLUMNAR_REPORTS)
+    assert {num: mismatches[:5] for num, _, mismatches, _, _ in results if mismatches} == {}
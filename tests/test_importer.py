@@ -0,0 +1,63 @@
+"""Імпорт: upsert оцінок за id у секціонованій таблиці grades і помилки окремих рядків"""
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from importer import conflict_columns, import_columns, load_chunk, validate_chunk, write_chunk
+from models.models import Grade, GradeStat, Student
+
+pytestmark = pytest.mark.integration
+
+
+def stats(session, student_id, subject_id):
+    return session.execute(
+        select(GradeStat.grade_count, GradeStat.grade_sum)
+        .filter(GradeStat.student_id == student_id, GradeStat.subject_id == subject_id)
+    ).one()
+
+
+def test_reimport_existing_id_with_new_date_keeps_one_row(db_session):
+    grade = db_session.scalars(select(Grade).order_by(Grade.id).limit(1)).one()
+    grade_id, student_id, subject_id = grade.id, grade.student_id, grade.subject_id
+    old_grade, new_date = grade.grade, grade.date_received - timedelta(days=40)
+    count_before, sum_before = stats(db_session, student_id, subject_id)
+    db_session.expunge_all()
+
+    fieldnames = ["id", "student_id", "subject_id", "grade", "date_received"]
+    row = {"id": grade_id, "student_id": student_id, "subject_id": subject_id,
+           "grade": old_grade + 1, "date_received": new_date.isoformat()}
+    columns = import_columns(Grade, fieldnames)
+    valid, errors = validate_chunk(db_session, "Grade", columns, [(2, row)])
+    assert errors == []
+
+    assert load_chunk(db_session, Grade, columns, valid, conflict_columns("Grade", fieldnames)) == 1
+    rows = db_session.execute(select(Grade.grade, Grade.date_received).filter(Grade.id == grade_id)).all()
+    assert rows == [(old_grade + 1, new_date)]
+    # Оцінку перенесено, а не додано вдруге: кількість та сама, сума більша на 1
+    assert stats(db_session, student_id, subject_id) == (count_before, sum_before + 1)
+    assert db_session.scalar(select(func.count()).select_from(Grade)) == \
+        db_session.scalar(select(func.count(func.distinct(Grade.id))))
+
+
+def test_rejected_row_does_not_reject_chunk(db_session):
+    first, second = db_session.scalars(select(Student).order_by(Student.id).limit(2)).all()
+    fieldnames = ["id", "first_name", "last_name", "email", "phone", "group_id"]
+    rows = [
+        # Email іншого студента - порушення унікальності лише цього рядка
+        (2, {"id": first.id, "first_name": first.first_name, "last_name": first.last_name,
+             "email": second.email, "phone": first.phone, "group_id": first.group_id}),
+        (3, {"id": second.id, "first_name": "Змінене", "last_name": second.last_name,
+             "email": second.email, "phone": second.phone, "group_id": second.group_id}),
+    ]
+    first_id, first_email, second_id = first.id, first.email, second.id
+    db_session.expunge_all()
+    columns = import_columns(Student, fieldnames)
+    valid, errors = validate_chunk(db_session, "Student", columns, rows)
+    assert errors == []
+
+    imported, errors = write_chunk(db_session, Student, columns, valid, conflict_columns("Student", fieldnames))
+    assert imported == 1
+    assert [line_no for line_no, _ in errors] == [2]
+    assert db_session.scalar(select(Student.email).filter(Student.id == first_id)) == first_email
+    assert db_session.scalar(select(Student.first_name).filter(Student.id == second_id)) == "Змінене"
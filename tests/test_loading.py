@@ -0,0 +1,63 @@
+"""Стратегії завантаження зв'язків: суворий режим і сталі кількості запитів"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+
+import commands
+from conf import db
+from models.loading import record_options
+from models.models import Student
+from utils.explain import capture_statements
+
+pytestmark = pytest.mark.integration
+
+MODELS = ["Student", "Group", "Teacher", "Subject", "Grade"]
+
+
+@pytest.fixture
+def strict_loading(monkeypatch):
+    monkeypatch.setattr(db, "STRICT_LOADING", True)
+
+
+def test_strict_mode_raises_on_lazy_load(db_session, strict_loading):
+    student = db_session.scalars(select(Student).limit(1)).one()
+    with pytest.raises(InvalidRequestError):
+        student.group
+
+
+def test_lazy_load_without_strict_mode(db_session, db_engine):
+    student = db_session.scalars(select(Student).limit(1)).one()
+    with capture_statements(db_engine) as statements:
+        assert student.group.name
+    assert len(statements) == 1
+
+
+def table_data_statements(session, engine, model_name, limit):
+    model_class = commands.get_model_class(model_name)
+    with capture_statements(engine) as statements:
+        records = session.scalars(
+            select(model_class).options(*record_options(model_name)).order_by(model_class.id).limit(limit)
+        ).unique().all()
+        _, data = commands.get_table_data(model_name, records, related=True)
+    assert len(data) == len(records)
+    session.expunge_all()
+    return len(statements)
+
+
+@pytest.mark.parametrize("model_name", MODELS)
+def test_table_data_related_constant_statements(db_session, db_engine, strict_loading, model_name):
+    # Суворий режим: будь-який зв'язок поза record_options - InvalidRequestError
+    few = table_data_statements(db_session, db_engine, model_name, 2)
+    many = table_data_statements(db_session, db_engine, model_name, 100)
+    assert few == many <= 2
+
+
+@pytest.mark.parametrize("model_name", MODELS)
+def test_list_related_single_statement(db_engine, strict_loading, capsys, model_name):
+    counts = []
+    for limit in (2, 100):
+        with capture_statements(db_engine) as statements:
+            commands.list_records(model_name, 'csv', limit=limit, related=True)
+        assert "Помилка" not in capsys.readouterr().out
+        counts.append(len(statements))
+    assert counts == [1, 1]
@@ -0,0 +1,88 @@
+import io
+from itertools import islice
+
+from sqlalchemy import Connection, Table, insert, text
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if not isinstance(value, str):
+        return str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class IteratorFile(io.TextIOBase):
+    """Файлоподібна обгортка над генератором рядків для COPY FROM STDIN"""
+
+    def __init__(self, rows):
+        self._lines = ("\t".join(_copy_value(v) for v in row) + "\n" for row in rows)
+        self._buffer = ""
+        self.count = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+            self.count += 1
+        if size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+def supports_copy(conn: Connection):
+    return conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+
+
+def copy_rows(conn: Connection, table: Table, columns, rows):
+    """Завантажує рядки через COPY FROM STDIN (psycopg2), повертає кількість рядків"""
+    source = IteratorFile(rows)
+    column_list = ", ".join(columns)
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({column_list}) FROM STDIN", source, size=65536)
+    finally:
+        cursor.close()
+    return source.count
+
+
+def insert_rows(conn: Connection, table: Table, columns, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Завантажує рядки пакетами insert().values() у режимі executemany"""
+    total = 0
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        conn.execute(insert(table), [dict(zip(columns, row)) for row in batch])
+        total += len(batch)
+    return total
+
+
+def load_rows(conn: Connection, table: Table, columns, rows, mode="copy", batch_size=DEFAULT_BATCH_SIZE):
+    if mode == "copy" and supports_copy(conn):
+        return copy_rows(conn, table, columns, rows)
+    return insert_rows(conn, table, columns, rows, batch_size)
+
+
+def sync_sequence(conn: Connection, table: Table):
+    """Підтягує послідовність id після вставки рядків з явними id"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"(SELECT coalesce(max(id), 1) FROM {table.name}))"
+        ))
@@ -0,0 +1,9 @@
+from datetime import date, timedelta
+
+
+def parse_date_bound(value: str) -> date:
+    """Межа періоду звіту: дата YYYY-MM-DD або Nd - N днів тому (30d, 0d - сьогодні)"""
+    value = value.strip()
+    if value.endswith("d") and value[:-1].isdigit():
+        return date.today() - timedelta(days=int(value[:-1]))
+    return date.fromisoformat(value)
@@ -0,0 +1,35 @@
+import json
+from contextlib import contextmanager
+
+from sqlalchemy import Connection, Engine, event
+
+
+@contextmanager
+def capture_statements(engine: Engine):
+    """Збирає SQL-запити (текст і параметри), виконані через engine у межах блоку"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain_analyze(conn: Connection, statement, parameters=None, buffers=False):
+    """Виконує EXPLAIN ANALYZE і повертає план у вигляді словника (FORMAT JSON)"""
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if buffers else "ANALYZE, FORMAT JSON"
+    result = conn.exec_driver_sql(f"EXPLAIN ({options}) {statement}", parameters or {}).scalar()
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]
+
+
+def explain_text(conn: Connection, statement, parameters=None, buffers=False):
+    """Виконує EXPLAIN ANALYZE і повертає план як рядки тексту (FORMAT TEXT)"""
+    options = "ANALYZE, BUFFERS" if buffers else "ANALYZE"
+    return conn.exec_driver_sql(f"EXPLAIN ({options}) {statement}", parameters or {}).scalars().all()
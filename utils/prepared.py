@@ -0,0 +1,57 @@
+from sqlalchemy import Connection
+from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2
+from sqlalchemy.orm import Session
+
+from conf.db import POOL_PROFILE, PREPARE_STATEMENTS
+
+# Серверні prepared statements для готових запитів (DB_PREPARE_STATEMENTS).
+# psycopg2 не вміє протокольного prepare, тож запит один раз на з'єднання
+# готується через PREPARE ... AS з параметрами $n, а далі виконується через
+# EXECUTE: сервер не розбирає і не планує його заново (після кількох виконань
+# Postgres може перейти на загальний план). asyncpg готує запити сам (кеш
+# prepared statements драйвера), тож асинхронний шлях цього не потребує.
+# Через pgbouncer у режимі transaction prepare вимкнено, як і в conf/async_db.py.
+
+ENABLED = PREPARE_STATEMENTS and POOL_PROFILE != "external"
+
+_dialect = PGDialect_psycopg2(paramstyle="numeric_dollar")
+
+
+class PreparedStatement:
+    """SQL для PREPARE і порядок його параметрів; компілюється один раз"""
+
+    def __init__(self, name, statement):
+        compiled = statement.compile(dialect=_dialect)
+        self.name = name
+        self.positions = list(compiled.positiontup or [])
+        # Значення параметрів, що задані в самому запиті (LIMIT, літерали)
+        self.defaults = {key: compiled.params[key] for key in self.positions if compiled.params[key] is not None}
+        types = ", ".join(compiled.binds[key].type.compile(dialect=_dialect) for key in self.positions)
+        self.prepare_sql = f"PREPARE {name}{f' ({types})' if types else ''} AS {compiled.string}"
+        placeholders = ", ".join(["%s"] * len(self.positions))
+        self.execute_sql = f"EXECUTE {name}({placeholders})" if placeholders else f"EXECUTE {name}"
+
+    def execute(self, conn: Connection, params):
+        # info пулу живе стільки ж, скільки з'єднання DBAPI, а з ним і PREPARE на сервері
+        prepared = conn.connection.info.setdefault("prepared_statements", set())
+        if self.name not in prepared:
+            conn.exec_driver_sql(self.prepare_sql)
+            prepared.add(self.name)
+        values = tuple(params[key] if key in params else self.defaults[key] for key in self.positions)
+        return conn.exec_driver_sql(self.execute_sql, values)
+
+
+_prepared = {}
+
+
+def execute_statement(session: Session, name, statement, params):
+    """Виконує готовий запит: на psycopg2 з DB_PREPARE_STATEMENTS - через PREPARE/EXECUTE,
+    інакше звичайним session.execute з кешем компіляції SQLAlchemy"""
+    if not ENABLED:
+        return session.execute(statement, params)
+    conn = session.connection(bind_arguments={"clause": statement})
+    if conn.dialect.driver != "psycopg2":
+        return session.execute(statement, params)
+    if name not in _prepared:
+        _prepared[name] = PreparedStatement(name, statement)
+    return _prepared[name].execute(conn, params)
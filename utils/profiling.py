@@ -0,0 +1,229 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import NamedTuple, Optional
+
+from sqlalchemy import Engine, event
+
+from conf.db import get_engine, pool_stats
+from utils.explain import explain_text
+from utils.print_table import print_table
+
+# Профілювання команд і звітів (--profile у main.py та reports.py).
+# Слухачі before/after_cursor_execute вішаються на клас Engine лише на час
+# профілювання, тож вони бачать і основну базу, і репліки, а без --profile
+# не коштують нічого. Запити записуються у поточний "прогін" - звіт або
+# команду, відкриту через profiler.run().
+
+METRIC_PREFIX = "hw06_profile"
+DEFAULT_SLOW_MS = 100.0
+TOP_STATEMENTS = 10
+
+
+class StatementRecord(NamedTuple):
+    label: str
+    statement: str
+    parameters: object
+    elapsed_ms: float
+    rows: Optional[int]
+
+
+class RunRecord:
+    """Один прогін: звіт або команда з її запитами, фазами і очікуванням пулу"""
+
+    def __init__(self, label):
+        self.label = label
+        self.statements = []
+        self.phases = {}  # назва фази -> мс
+        self.wall_ms = 0.0
+        self.wait_ms = 0.0
+
+    @property
+    def db_ms(self):
+        return sum(record.elapsed_ms for record in self.statements)
+
+    @property
+    def rows(self):
+        return sum(record.rows or 0 for record in self.statements)
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.slow_ms = DEFAULT_SLOW_MS
+        self.runs = []
+        # Накопичені за життя процесу лічильники для Prometheus: {мітка: {метрика: значення}}
+        self.totals = {}
+        self._current = ContextVar("profile_run", default=None)
+
+    def enable(self, slow_ms=DEFAULT_SLOW_MS):
+        self.enabled = True
+        self.slow_ms = slow_ms
+        self.runs = []
+        if not event.contains(Engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def disable(self):
+        self.enabled = False
+        if event.contains(Engine, "before_cursor_execute", self._before_cursor_execute):
+            event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+
+    @contextmanager
+    def run(self, label):
+        """Прогін звіту або команди; вкладений прогін забирає запити собі"""
+        if not self.enabled:
+            yield None
+            return
+        run = RunRecord(label)
+        token = self._current.set(run)
+        wait_before = pool_stats.snapshot()["wait_total_ms"]
+        started = time.perf_counter()
+        try:
+            yield run
+        finally:
+            run.wall_ms = (time.perf_counter() - started) * 1000
+            run.wait_ms = pool_stats.snapshot()["wait_total_ms"] - wait_before
+            self._current.reset(token)
+            self.runs.append(run)
+            self._accumulate(run)
+
+    @contextmanager
+    def phase(self, name):
+        """Час фази поточного прогону, напр. format - форматування результату (tabulate)"""
+        run = self._current.get() if self.enabled else None
+        if run is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            run.phases[name] = run.phases.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["profile_started"].pop()) * 1000
+        run = self._current.get()
+        if run is None:
+            return
+        # Серверний курсор (yield_per) ще не знає кількості рядків: rowcount = -1
+        rows = cursor.rowcount if cursor.rowcount >= 0 else None
+        run.statements.append(StatementRecord(run.label, statement, parameters, elapsed_ms, rows))
+
+    def _accumulate(self, run):
+        totals = self.totals.setdefault(run.label, {
+            "runs": 0, "wall_ms": 0.0, "db_ms": 0.0, "wait_ms": 0.0, "format_ms": 0.0,
+            "rows": 0, "statements": 0, "slow_statements": 0, "max_statement_ms": 0.0,
+        })
+        totals["runs"] += 1
+        totals["wall_ms"] += run.wall_ms
+        totals["db_ms"] += run.db_ms
+        totals["wait_ms"] += run.wait_ms
+        totals["format_ms"] += run.phases.get("format", 0.0)
+        totals["rows"] += run.rows
+        totals["statements"] += len(run.statements)
+        totals["slow_statements"] += sum(record.elapsed_ms >= self.slow_ms for record in run.statements)
+        totals["max_statement_ms"] = max([totals["max_statement_ms"], *(r.elapsed_ms for r in run.statements)])
+
+    def slow_statements(self):
+        return sorted(
+            (record for run in self.runs for record in run.statements if record.elapsed_ms >= self.slow_ms),
+            key=lambda record: record.elapsed_ms, reverse=True,
+        )
+
+
+profiler = Profiler()
+
+
+def short_sql(statement, width=90):
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= width else statement[:width - 3] + "..."
+
+
+def print_summary(runs):
+    print("\nПрофіль виконання:")
+    print_table(
+        [(run.label, f"{run.wall_ms:.1f}", f"{run.db_ms:.1f}", len(run.statements), run.rows,
+          f"{run.wait_ms:.2f}", f"{run.phases.get('format', 0.0):.1f}") for run in runs],
+        ["Прогін", "Загалом, мс", "SQL, мс", "Запитів", "Рядків з бази", "Очікування пулу, мс", "Форматування, мс"],
+    )
+    statements = sorted((record for run in runs for record in run.statements),
+                        key=lambda record: record.elapsed_ms, reverse=True)[:TOP_STATEMENTS]
+    if statements:
+        print(f"Найповільніші запити (до {TOP_STATEMENTS}):")
+        print_table(
+            [(record.label, f"{record.elapsed_ms:.2f}", "-" if record.rows is None else record.rows,
+              short_sql(record.statement)) for record in statements],
+            ["Прогін", "мс", "Рядків", "SQL"],
+        )
+
+
+def explain_slow(records):
+    """EXPLAIN (ANALYZE, BUFFERS) повільних SELECT на основній базі; запити виконуються
+    повторно, тому кожен - у транзакції, яка відкочується"""
+    with get_engine().connect() as conn:
+        for record in records:
+            if not record.statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                continue
+            print(f"\nEXPLAIN (ANALYZE, BUFFERS) для {record.label}, {record.elapsed_ms:.1f} мс:")
+            print(short_sql(record.statement, width=400))
+            with conn.begin() as trans:
+                for line in explain_text(conn, record.statement, record.parameters, buffers=True):
+                    print(f"  {line}")
+                trans.rollback()
+
+
+def label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# (метрика, тип, опис, ключ у totals, множник)
+METRICS = [
+    ("runs_total", "counter", "Кількість профільованих прогонів", "runs", 1),
+    ("duration_seconds_total", "counter", "Сумарний час прогонів", "wall_ms", 0.001),
+    ("db_seconds_total", "counter", "Сумарний час SQL-запитів", "db_ms", 0.001),
+    ("pool_wait_seconds_total", "counter", "Сумарне очікування з'єднання з пулу", "wait_ms", 0.001),
+    ("format_seconds_total", "counter", "Сумарний час форматування результату", "format_ms", 0.001),
+    ("rows_total", "counter", "Рядків, повернутих базою", "rows", 1),
+    ("statements_total", "counter", "Виконаних SQL-запитів", "statements", 1),
+    ("slow_statements_total", "counter", "SQL-запитів, повільніших за поріг", "slow_statements", 1),
+    ("statement_max_seconds", "gauge", "Найдовший SQL-запит", "max_statement_ms", 0.001),
+]
+
+
+def write_metrics(path, totals):
+    """Метрики у текстовому форматі Prometheus для node_exporter textfile collector.
+
+    Файл записується через тимчасовий і os.replace, щоб колектор не прочитав його наполовину.
+    """
+    lines = []
+    for name, kind, help_text, key, scale in METRICS:
+        metric = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for label, values in sorted(totals.items()):
+            lines.append(f'{metric}{{name="{label_value(label)}"}} {values[key] * scale:g}')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def profile_session(slow_ms=DEFAULT_SLOW_MS, explain=False, metrics_file=None):
+    """Профілює блок: після нього - зведення, EXPLAIN повільних запитів і файл метрик"""
+    profiler.enable(slow_ms)
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        print_summary(profiler.runs)
+        if explain:
+            explain_slow(profiler.slow_statements())
+        if metrics_file:
+            write_metrics(metrics_file, profiler.totals)
@@ -0,0 +1,62 @@
+import csv
+import datetime
+import json
+import sys
+from decimal import Decimal
+from itertools import islice
+
+from tabulate import tabulate
+
+FORMATS = ("table", "csv", "jsonl", "plain")
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _plain(value):
+    return "" if value is None else str(value)
+
+
+def write_rows(rows, headers, fmt="table", out=None, page_size=None):
+    """Виводить рядки у вибраному форматі: table (tabulate), csv, jsonl або plain.
+
+    csv, jsonl і plain пишуть рядки по одному, тож rows може бути генератором
+    будь-якої довжини; table спершу збирає всі рядки в пам'яті, а з page_size -
+    лише по page_size рядків, виводячи окрему таблицю на кожну сторінку.
+    Повертає кількість виведених рядків.
+    """
+    out = out or sys.stdout
+    count = 0
+    if fmt == "table" and page_size:
+        rows = iter(rows)
+        while page := list(islice(rows, page_size)):
+            out.write(tabulate(page, headers=headers, tablefmt="grid") + "\n")
+            count += len(page)
+        return count
+    if fmt == "table":
+        rows = list(rows)
+        out.write(tabulate(rows, headers=headers, tablefmt="grid") + "\n")
+        return len(rows)
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(dict(zip(headers, row)), ensure_ascii=False, default=_json_default) + "\n")
+            count += 1
+    elif fmt == "plain":
+        out.write("\t".join(headers) + "\n")
+        for row in rows:
+            out.write("\t".join(map(_plain, row)) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"Невідомий формат: {fmt}. Доступні формати: {', '.join(FORMATS)}")
+    return count